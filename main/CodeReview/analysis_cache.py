@@ -0,0 +1,186 @@
+# analysis_cache.py
+"""
+Persistent cache of code review analyzer results.
+
+Entries are keyed by (file content hash, tool, tool version, options) and hold the tool's parsed
+result as JSON, so an unchanged file is never re-analyzed by the same tool configuration. The cache
+is a single SQLite file shared by CodeReviewTool (and its gen_ai_dashboard/Gen_AI_Framework copies)
+and the FastAPI /analyze endpoint; least recently used entries are evicted once it grows past
+max_bytes.
+
+Both producers store the result shapes of analyzer_outputs. Tool output names the file it was run
+on, and the same content is often analyzed at another path (every API upload lands in a new
+temporary directory). With file_path given, the file name is part of the key and the path is
+stored as a placeholder, which a hit replaces with the path of the file being analyzed.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import subprocess
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+CACHE_PATH = os.environ.get(
+    "CODE_REVIEW_CACHE_PATH", os.path.join(os.path.expanduser("~"), ".code_review_cache.db"))
+CACHE_MAX_BYTES = int(os.environ.get("CODE_REVIEW_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+# Part of every key; bumped when the stored result shape changes, so older entries are never read
+RESULT_FORMAT = 2
+
+# Stands for the analyzed file's path in stored results; tool output never contains NUL
+PATH_PLACEHOLDER = "\0path\0"
+
+
+def file_digest(file_path: str) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+@lru_cache(maxsize=None)
+def tool_version(tool: str) -> str:
+    """`<tool> --version` output, looked up once per process; upgrading a tool invalidates its entries."""
+    try:
+        result = subprocess.run([tool, "--version"], capture_output=True, text=True, timeout=30)
+        return (result.stdout or result.stderr).strip() or "unknown"
+    except (OSError, subprocess.TimeoutExpired):
+        return "unknown"
+
+
+def replace_path(value: Any, old: str, new: str) -> Any:
+    """value with old replaced by new in every string, dict keys included (flake8 keys by file)."""
+    if isinstance(value, str):
+        return value.replace(old, new)
+    if isinstance(value, dict):
+        return {replace_path(key, old, new): replace_path(item, old, new) for key, item in value.items()}
+    if isinstance(value, list):
+        return [replace_path(item, old, new) for item in value]
+    return value
+
+
+class AnalysisCache:
+    def __init__(self, db_path: str = CACHE_PATH, max_bytes: int = CACHE_MAX_BYTES):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        # Analyzer threads share the connection; the desktop app and the API server share the file
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        with self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_cache (
+                    content_hash TEXT NOT NULL,
+                    tool TEXT NOT NULL,
+                    tool_version TEXT NOT NULL,
+                    options TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (content_hash, tool, tool_version, options)
+                )
+            """)
+            # Eviction walks entries oldest access first
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_analysis_cache_last_access "
+                              "ON analysis_cache (last_access)")
+
+    @staticmethod
+    def _key(content_hash, tool, version, options):
+        return content_hash, tool, version, json.dumps(options, sort_keys=True)
+
+    def get(self, content_hash: str, tool: str, version: str, options) -> Optional[Dict]:
+        key = self._key(content_hash, tool, version, options)
+        with self.lock, self.conn:
+            row = self.conn.execute(
+                "SELECT result FROM analysis_cache "
+                "WHERE content_hash = ? AND tool = ? AND tool_version = ? AND options = ?", key).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.conn.execute(
+                "UPDATE analysis_cache SET last_access = ? "
+                "WHERE content_hash = ? AND tool = ? AND tool_version = ? AND options = ?", (time.time(), *key))
+        return json.loads(row[0])
+
+    def put(self, content_hash: str, tool: str, version: str, options, result: Dict):
+        data = json.dumps(result)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache "
+                "(content_hash, tool, tool_version, options, result, size, last_access) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*self._key(content_hash, tool, version, options), data, len(data), time.time()))
+            self._evict()
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM analysis_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evict = []
+        for rowid, size in self.conn.execute("SELECT rowid, size FROM analysis_cache ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            evict.append((rowid,))
+            total -= size
+        self.conn.executemany("DELETE FROM analysis_cache WHERE rowid = ?", evict)
+
+    def fetch(self, content_hash: str, tool: str, options, compute: Callable[[], Dict],
+              force_refresh: bool = False, file_path: Optional[str] = None) -> Dict:
+        """
+        Cached result of one tool on one file content, computing and storing it on a miss.
+
+        Parameters:
+        - options: Anything JSON-serialisable that changes the tool's output (e.g. its command line).
+        - compute: Runs the tool; results carrying an 'error' key (timeouts, crashes) are not cached.
+        - force_refresh: Ignore a cached entry and overwrite it with a fresh run.
+        - file_path: The path the tool is run on; a hit reports this path instead of the stored one.
+
+        Returns:
+        - The result; a cache hit is returned with 'cached': True added.
+        """
+        version = tool_version(tool)
+        options = [RESULT_FORMAT, options, os.path.basename(file_path) if file_path else None]
+        if not force_refresh:
+            cached = self.get(content_hash, tool, version, options)
+            if cached is not None:
+                if file_path:
+                    cached = replace_path(cached, PATH_PLACEHOLDER, file_path)
+                return {**cached, 'cached': True}
+        result = compute()
+        if 'error' not in result:
+            self.put(content_hash, tool, version, options,
+                     replace_path(result, file_path, PATH_PLACEHOLDER) if file_path else result)
+        return result
+
+    def clear(self):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM analysis_cache")
+
+    def stats(self) -> Dict:
+        with self.lock:
+            entries, total = self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM analysis_cache").fetchone()
+        return {"entries": entries, "bytes": total, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        self.conn.close()
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Process-wide cache instance at CACHE_PATH."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = AnalysisCache()
+        return _shared_cache
@@ -0,0 +1,46 @@
+# analyzer_outputs.py
+"""
+Command lines of the code review analyzers and the result each one's output becomes.
+
+CodeReviewTool and the FastAPI service run the same commands and build the same result dicts, so
+an entry in the shared analysis cache reads the same whichever of them stored it:
+- pylint, flake8, bandit, mypy, vulture: {'data': parsed JSON or None, 'raw': stdout}
+- radon: {'complexity': cc JSON, 'maintainability': mi JSON, 'raw': both outputs}
+"""
+import json
+from typing import Dict, List
+
+# Command lines per tool, without the file path; they are also the options part of the cache key
+ANALYZER_COMMANDS = {
+    "pylint": [["pylint", "--output-format=json"]],
+    "flake8": [["flake8", "--format=json"]],
+    "radon": [["radon", "cc", "-j"], ["radon", "mi", "-j"]],
+    "bandit": [["bandit", "-f", "json", "-r"]],
+    "mypy": [["mypy", "--json"]],
+    "vulture": [["vulture"]],
+}
+
+# Tools whose output is plain text
+TEXT_OUTPUT = {"vulture"}
+
+
+def parse_outputs(tool: str, outputs: List[str]) -> Dict:
+    """Result dict of one tool from the stdout of each of its ANALYZER_COMMANDS."""
+    if tool == "radon":
+        cc_stdout, mi_stdout = outputs
+        try:
+            return {
+                'complexity': json.loads(cc_stdout),
+                'maintainability': json.loads(mi_stdout),
+                'raw': f"Complexity:\n{cc_stdout}\nMaintainability:\n{mi_stdout}"
+            }
+        except json.JSONDecodeError:
+            return {'data': None, 'raw': f"{cc_stdout}\n{mi_stdout}"}
+
+    stdout, = outputs
+    if tool in TEXT_OUTPUT:
+        return {'data': None, 'raw': stdout}
+    try:
+        return {'data': json.loads(stdout), 'raw': stdout}
+    except json.JSONDecodeError:
+        return {'data': None, 'raw': stdout}
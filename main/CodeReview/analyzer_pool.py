@@ -0,0 +1,298 @@
+# analyzer_pool.py
+"""
+Pool of long-lived analyzer processes.
+
+Running each analyzer as a fresh subprocess pays interpreter startup plus the import of pylint,
+mypy, ... on every call, which on small files costs more than the analysis itself. Pool workers
+import the analyzers once (pylint's Run, flake8's Application, radon's cc_visit/mi_visit, bandit's
+manager, mypy.api, Vulture) and then take jobs over a pipe. A job is the same command list the CLI
+would run (e.g. [["pylint", "--output-format=json"]]); the worker returns one stdout string per
+command, so callers parse the output exactly as before. Tools that are not importable in the
+worker fall back to a subprocess.
+
+Workers exit after max_jobs_per_worker jobs (pylint/astroid and mypy keep per-process caches) and
+are replaced on demand; a worker whose job times out or is cancelled is killed and replaced. On
+POSIX each worker leads its own process group, so the kill also takes the analyzer subprocesses
+it started.
+"""
+import atexit
+import io
+import json
+import multiprocessing
+import os
+import queue
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import List, Optional
+
+MAX_JOBS_PER_WORKER = int(os.environ.get("ANALYZER_MAX_JOBS_PER_WORKER", 50))
+
+# How often a waiting caller checks for cancellation
+POLL_INTERVAL = 0.1
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class AnalyzerError(RuntimeError):
+    pass
+
+
+class _CapturedStdout:
+    """Swap sys.stdout for a buffer; some tools write to sys.stdout.buffer directly."""
+
+    def __enter__(self):
+        self.saved = sys.stdout
+        self.buffer = io.TextIOWrapper(io.BytesIO(), encoding="utf-8", newline="")
+        sys.stdout = self.buffer
+        return self
+
+    def __exit__(self, *exc_info):
+        sys.stdout = self.saved
+
+    def getvalue(self) -> str:
+        self.buffer.flush()
+        return self.buffer.buffer.getvalue().decode("utf-8")
+
+
+def _run_subprocess(command, file_path) -> str:
+    return subprocess.run(command + [file_path], capture_output=True, text=True).stdout
+
+
+def _run_pylint(command, file_path) -> str:
+    from astroid import MANAGER
+    from pylint.lint import Run
+    # astroid caches module ASTs by name; a re-analyzed file must not be served from that cache
+    MANAGER.clear_cache()
+    with _CapturedStdout() as output:
+        Run(command[1:] + [file_path], exit=False)
+    return output.getvalue()
+
+
+def _run_flake8(command, file_path) -> str:
+    from flake8.main.application import Application
+    with _CapturedStdout() as output:
+        Application().run(command[1:] + [file_path])
+    return output.getvalue()
+
+
+def _run_radon(command, file_path) -> str:
+    from radon.cli.tools import cc_to_dict
+    from radon.complexity import cc_visit, sorted_results
+    from radon.metrics import mi_rank, mi_visit
+    with open(file_path, encoding="utf-8") as f:
+        code = f.read()
+    # Same JSON shapes as `radon cc -j` / `radon mi -j`
+    if command[1] == "cc":
+        return json.dumps({file_path: [cc_to_dict(block) for block in sorted_results(cc_visit(code))]})
+    mi = mi_visit(code, multi=True)
+    return json.dumps({file_path: {"mi": mi, "rank": mi_rank(mi)}})
+
+
+def _run_bandit(command, file_path) -> str:
+    from bandit.core import config as bandit_config
+    from bandit.core import manager as bandit_manager
+    manager = bandit_manager.BanditManager(bandit_config.BanditConfig(), "file")
+    manager.discover_files([file_path], True)
+    manager.run_tests()
+    # The JSON formatter closes the file it is given, so it writes to a temp file
+    fd, report_path = tempfile.mkstemp(suffix=".json")
+    try:
+        with os.fdopen(fd, "w") as report:
+            manager.output_results(-1, "LOW", "LOW", report, "json")
+        with open(report_path) as report:
+            return report.read()
+    finally:
+        os.remove(report_path)
+
+
+def _run_mypy(command, file_path) -> str:
+    from mypy import api
+    stdout, _, _ = api.run(command[1:] + [file_path])
+    return stdout
+
+
+def _run_vulture(command, file_path) -> str:
+    from vulture import Vulture
+    vulture = Vulture()
+    vulture.scavenge([file_path])
+    with _CapturedStdout() as output:
+        vulture.report()
+    return output.getvalue()
+
+
+IN_PROCESS_RUNNERS = {
+    "pylint": (("pylint.lint", "astroid"), _run_pylint),
+    "flake8": (("flake8.main.application",), _run_flake8),
+    "radon": (("radon.complexity", "radon.metrics", "radon.cli.tools"), _run_radon),
+    "bandit": (("bandit.core.manager", "bandit.core.config"), _run_bandit),
+    "mypy": (("mypy.api",), _run_mypy),
+    "vulture": (("vulture",), _run_vulture),
+}
+
+
+def _load_runners():
+    """Import every available analyzer up front; that import cost is what the pool amortises."""
+    runners = {}
+    for tool, (modules, runner) in IN_PROCESS_RUNNERS.items():
+        try:
+            for module in modules:
+                __import__(module)
+        except ImportError:
+            continue
+        runners[tool] = runner
+    return runners
+
+
+def _worker_main(conn, max_jobs):
+    if os.name == 'posix':
+        # Subprocess fallbacks (and anything they fork) join this group and die with the worker
+        os.setsid()
+    runners = _load_runners()
+    jobs = 0
+    while jobs < max_jobs:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        commands, file_path = job
+        jobs += 1
+        try:
+            outputs = [runners.get(command[0], _run_subprocess)(command, file_path) for command in commands]
+            conn.send((True, outputs, jobs >= max_jobs))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}", jobs >= max_jobs))
+    conn.close()
+
+
+class _Worker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+
+    def kill(self):
+        if os.name == 'posix':
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                # Killed before it called setsid(), so it has not started any analyzer yet
+                self.process.kill()
+        else:
+            self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.kill()
+
+
+class AnalyzerPool:
+    def __init__(self, size: Optional[int] = None, max_jobs_per_worker: int = MAX_JOBS_PER_WORKER):
+        self.size = size or os.cpu_count() or 1
+        self.max_jobs = max_jobs_per_worker
+        # fork() from a process that already runs Qt or uvicorn threads is unsafe
+        self.context = multiprocessing.get_context("spawn")
+        self.busy = set()
+        self.lock = threading.Lock()
+        # One slot per worker; None marks a slot whose worker has not been started (or was retired)
+        self.idle = queue.Queue()
+        for _ in range(self.size):
+            self.idle.put(None)
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(target=_worker_main, args=(child_conn, self.max_jobs), daemon=True)
+        process.start()
+        child_conn.close()
+        return _Worker(process, parent_conn)
+
+    def run(self, commands: List[List[str]], file_path: str, timeout: Optional[float] = None,
+            cancel_event: Optional[threading.Event] = None) -> List[str]:
+        """
+        Run one analyzer job on a warm worker.
+
+        Parameters:
+        - commands: Command lines without the file path, e.g. [["radon", "cc", "-j"], ["radon", "mi", "-j"]].
+        - timeout: Seconds before the worker is killed and subprocess.TimeoutExpired is raised.
+        - cancel_event: Setting it kills the worker and raises JobCancelled.
+
+        Returns:
+        - One stdout string per command.
+        """
+        worker = self.idle.get()
+        try:
+            if worker is None:
+                worker = self._spawn()
+            with self.lock:
+                self.busy.add(worker)
+            worker.conn.send((commands, file_path))
+            deadline = time.monotonic() + timeout if timeout is not None else None
+            while not worker.conn.poll(POLL_INTERVAL):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise JobCancelled()
+                if deadline is not None and time.monotonic() > deadline:
+                    raise subprocess.TimeoutExpired(commands[0][0], timeout)
+            ok, payload, retiring = worker.conn.recv()
+        except BaseException:
+            if worker is not None:
+                self._discard(worker)
+                worker.kill()
+            worker = None
+            raise
+        finally:
+            if worker is not None:
+                self._discard(worker)
+                if retiring:
+                    worker.process.join()
+                    worker.conn.close()
+                    worker = None
+            self.idle.put(worker)
+
+        if not ok:
+            raise AnalyzerError(payload)
+        return payload
+
+    def _discard(self, worker):
+        with self.lock:
+            self.busy.discard(worker)
+
+    def close(self):
+        """Stop idle workers and kill the ones still running a job."""
+        while True:
+            try:
+                worker = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None:
+                worker.stop()
+        with self.lock:
+            busy, self.busy = list(self.busy), set()
+        for worker in busy:
+            worker.kill()
+
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def get_analyzer_pool() -> AnalyzerPool:
+    """Process-wide pool sized to the core count; workers start on first use."""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = AnalyzerPool()
+            atexit.register(_shared_pool.close)
+        return _shared_pool
@@ -0,0 +1,164 @@
+# code_preview.py
+"""
+Read-only code preview for files of any size.
+
+LazyCodePreview keeps only a window of the file in its QPlainTextEdit: the visible lines plus
+MARGIN_LINES on each side, read from a LineIndex (mmap + line offsets) and highlighted by a
+RegexHighlighter seeded with the block state the window starts in. An outer scrollbar spans the
+whole file; scrolling within the margin only moves the view, scrolling past it reloads the window.
+goto_line() is an offset lookup plus one window load, whatever the file size.
+
+The file stays open and mapped while it is shown. Windows refuses to replace such a file, so code
+that rewrites the previewed file does it inside released().
+"""
+import os
+from contextlib import contextmanager
+from typing import Optional
+
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QFont, QTextCursor, QTextFormat
+from PyQt5.QtWidgets import QHBoxLayout, QPlainTextEdit, QScrollBar, QTextEdit, QWidget
+
+from main.CodeReview.highlight_engine import PYTHON_ENGINE, HighlightEngine
+from main.CodeReview.line_index import BlockStates, LineIndex
+from main.CodeReview.syntax_highlighter import RegexHighlighter
+
+# Lines kept above and below the visible ones
+MARGIN_LINES = 300
+
+PYTHON_COLORS = {'keyword': "#CC7832", 'string': "#6A8759", 'comment': "#808080"}
+
+
+class LazyCodePreview(QWidget):
+    # 1-based line now at the top of the view
+    line_changed = pyqtSignal(int)
+
+    def __init__(self, parent=None, engine: HighlightEngine = PYTHON_ENGINE, colors=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.index: Optional[LineIndex] = None
+        self.states: Optional[BlockStates] = None
+        self.window_start = 0
+        self.window_stop = 0
+        self._syncing = False
+
+        self.editor = QPlainTextEdit()
+        self.editor.setReadOnly(True)
+        self.editor.setLineWrapMode(QPlainTextEdit.NoWrap)
+        self.editor.setFont(QFont("Consolas", 10))
+        # The editor only holds the window; the outer scrollbar stands for the whole file
+        self.editor.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.editor.verticalScrollBar().valueChanged.connect(self._editor_scrolled)
+        self.highlighter = RegexHighlighter(engine, colors or PYTHON_COLORS, self.editor.document())
+
+        self.scrollbar = QScrollBar(Qt.Vertical)
+        self.scrollbar.setRange(0, 0)
+        self.scrollbar.valueChanged.connect(self._scrolled)
+
+        layout = QHBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+        layout.addWidget(self.editor)
+        layout.addWidget(self.scrollbar)
+        self.setLayout(layout)
+
+    def setFont(self, font):
+        self.editor.setFont(font)
+
+    def setStyleSheet(self, style):
+        # Existing QTextEdit styles target the text area
+        self.editor.setStyleSheet(style.replace("QTextEdit", "QPlainTextEdit"))
+
+    def load(self, path: str):
+        """Show path from its first line; replaces the previous file."""
+        self.close_file()
+        self.index = LineIndex(path)
+        self.states = BlockStates(self.index, self.engine)
+        self.window_start = self.window_stop = 0
+        self.scrollbar.setRange(0, max(0, self.index.line_count - 1))
+        self.scrollbar.setPageStep(self.visible_lines())
+        self.scrollbar.setValue(0)
+        self._show(0)
+
+    def close_file(self):
+        if self.index is not None:
+            self.index.close()
+        self.index = self.states = None
+        self.editor.clear()
+
+    @contextmanager
+    def released(self):
+        """Close the shown file for the duration of the block, then show it again at the same line."""
+        path = self.index.path if self.index is not None else None
+        top = self.scrollbar.value()
+        self.close_file()
+        try:
+            yield
+        finally:
+            if path is not None and os.path.exists(path):
+                self.load(path)
+                self.scrollbar.setValue(min(top, self.scrollbar.maximum()))
+
+    def clear(self):
+        self.close_file()
+        self.scrollbar.setRange(0, 0)
+
+    def visible_lines(self) -> int:
+        return max(1, self.editor.viewport().height() // max(1, self.editor.fontMetrics().lineSpacing()))
+
+    def goto_line(self, line: int):
+        """Scroll so 1-based line is near the top and mark it."""
+        if self.index is None or not self.index.line_count:
+            return
+        top = max(0, min(line - 1, self.index.line_count - 1))
+        self.scrollbar.setValue(max(0, top - 3))
+        self._show(max(0, top - 3))
+        self._mark(top)
+
+    def _scrolled(self, value):
+        if not self._syncing:
+            self._show(value)
+
+    def _editor_scrolled(self, value):
+        # Wheel and keyboard scrolling inside the window
+        if self._syncing or self.index is None:
+            return
+        self._syncing = True
+        try:
+            self.scrollbar.setValue(self.window_start + value)
+        finally:
+            self._syncing = False
+        self._show(self.window_start + value)
+
+    def _show(self, top: int):
+        if self.index is None:
+            return
+        visible = self.visible_lines()
+        if not (self.window_start <= top and top + visible <= self.window_stop) or self.window_stop == 0:
+            self._load_window(top, visible)
+        self._syncing = True
+        try:
+            self.editor.verticalScrollBar().setValue(top - self.window_start)
+        finally:
+            self._syncing = False
+        self.line_changed.emit(top + 1)
+
+    def _load_window(self, top: int, visible: int):
+        start = max(0, top - MARGIN_LINES)
+        stop = min(self.index.line_count, top + visible + MARGIN_LINES)
+        self.window_start, self.window_stop = start, stop
+        self.highlighter.initial_state = self.states.state_before(start)
+        self.editor.setPlainText(self.index.read(start, stop).rstrip("\n"))
+
+    def _mark(self, line: int):
+        selection = QTextEdit.ExtraSelection()
+        selection.format.setBackground(QColor("#FFF3B0"))
+        selection.format.setProperty(QTextFormat.FullWidthSelection, True)
+        selection.cursor = QTextCursor(self.editor.document().findBlockByNumber(line - self.window_start))
+        self.editor.setExtraSelections([selection])
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.index is not None:
+            self.scrollbar.setPageStep(self.visible_lines())
+            self._show(self.scrollbar.value())
@@ -0,0 +1,115 @@
+"""
+Syntax highlighting benchmark.
+
+Highlights a large Python file block by block with the previous PythonSyntaxHighlighter rules
+(one re.compile() + finditer() per rule per block) and with the single-pass HighlightEngine, and
+reports milliseconds per pass. With PyQt5 installed it also times a full rehighlight() of a
+QTextDocument, which includes Qt's setFormat() cost.
+
+Usage (from the repository root):
+    python -m main.CodeReview.highlight_benchmark [file.py] [--lines 10000] [--repeat 3]
+
+Without a file, a synthetic module of --lines lines (defs, docstrings, strings, comments) is used.
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+from main.CodeReview.highlight_engine import PYTHON_ENGINE, PYTHON_KEYWORDS
+
+# The rules PythonSyntaxHighlighter used to run, for comparison
+LEGACY_RULES = ([rf'\b{word}\b' for word in PYTHON_KEYWORDS] +
+                [r'"[^"\\]*(\\.[^"\\]*)*"', r"'[^'\\]*(\\.[^'\\]*)*'", r'#[^\n]*'])
+
+SAMPLE = '''class Worker{n}(object):
+    """Worker number {n}.
+
+    Holds 'state' and "results" for a job.
+    """
+
+    def run(self, items, limit=None):
+        # Process every item that is not None
+        results = []
+        for item in items:
+            if item is not None and item not in results:
+                results.append("item: %s" % item)
+            elif limit and len(results) >= limit:
+                break
+        return results
+
+'''
+
+
+def synthetic_source(lines: int) -> str:
+    block_lines = SAMPLE.count("\n")
+    return "".join(SAMPLE.format(n=n) for n in range(lines // block_lines + 1))
+
+
+def legacy_pass(lines):
+    for text in lines:
+        for pattern in LEGACY_RULES:
+            expression = re.compile(pattern)
+            for match in expression.finditer(text):
+                match.start(), match.end()
+
+
+def engine_pass(lines):
+    PYTHON_ENGINE.highlight_lines(lines)
+
+
+def best_of(repeat, function, *args):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return round(min(timings), 1)
+
+
+def qt_rehighlight(source, repeat):
+    """Full-document rehighlight through PythonSyntaxHighlighter, or None without PyQt5."""
+    try:
+        from PyQt5.QtGui import QGuiApplication, QTextDocument
+    except ImportError:
+        return None
+    from main.CodeReview.syntax_highlighter import RegexHighlighter
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QGuiApplication.instance() or QGuiApplication([])
+    document = QTextDocument()
+    document.setPlainText(source)
+    highlighter = RegexHighlighter(PYTHON_ENGINE, {'keyword': "#CC7832", 'string': "#6A8759",
+                                                   'comment': "#808080"}, document)
+    result = best_of(repeat, highlighter.rehighlight)
+    del app
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time syntax highlighting of a large Python file.")
+    parser.add_argument("file", nargs="?", help="Python file to highlight (default: synthetic source)")
+    parser.add_argument("--lines", type=int, default=10000, help="Size of the synthetic source")
+    parser.add_argument("--repeat", type=int, default=3, help="Passes per measurement; the best is reported")
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, encoding="utf-8") as f:
+            source = f.read()
+    else:
+        source = synthetic_source(args.lines)
+    lines = source.splitlines()
+
+    report = {
+        "lines": len(lines),
+        "legacy_ms": best_of(args.repeat, legacy_pass, lines),
+        "engine_ms": best_of(args.repeat, engine_pass, lines),
+        "qt_rehighlight_ms": qt_rehighlight(source, args.repeat),
+    }
+    report["speedup"] = round(report["legacy_ms"] / max(report["engine_ms"], 0.1), 1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+# highlight_engine.py
+"""
+Single-pass syntax highlighting engine, independent of Qt.
+
+All token rules of a language are compiled once into one alternation of named groups, so each
+block (line) is scanned by a single finditer() instead of one regex per keyword. Tokens that can
+span lines (triple-quoted strings, /* */ comments) carry over through an integer block state, the
+same integer QSyntaxHighlighter keeps with setCurrentBlockState(): 0 (or Qt's default -1) means
+"outside any multi-line token", n > 0 means "inside the (n-1)th entry of `multiline`".
+
+syntax_highlighter.RegexHighlighter feeds Qt from this engine; it is kept Qt-free so it can be
+tested and benchmarked without a display.
+"""
+import re
+from typing import Iterable, List, Sequence, Tuple
+
+Span = Tuple[int, int, str]
+
+PYTHON_KEYWORDS = [
+    'and', 'as', 'assert', 'async', 'await', 'break', 'class', 'continue', 'def',
+    'del', 'elif', 'else', 'except', 'False', 'finally', 'for', 'from', 'global',
+    'if', 'import', 'in', 'is', 'lambda', 'None', 'nonlocal', 'not', 'or', 'pass',
+    'raise', 'return', 'True', 'try', 'while', 'with', 'yield'
+]
+
+# Python plus the keywords shared by the other languages the test script generator emits
+SCRIPT_KEYWORDS = PYTHON_KEYWORDS + [
+    'public', 'private', 'protected', 'static', 'void', 'const',
+    'function', 'var', 'let', 'new', 'this', 'null', 'true', 'false'
+]
+
+DOUBLE_QUOTED = r'"[^"\\]*(?:\\.[^"\\]*)*"'
+SINGLE_QUOTED = r"'[^'\\]*(?:\\.[^'\\]*)*'"
+
+# Opening and closing delimiter of each token that may span blocks, with the format it gets
+PYTHON_MULTILINE = [('"""', '"""', 'string'), ("'''", "'''", 'string')]
+
+
+class HighlightEngine:
+    def __init__(self, keywords: Iterable[str], line_comments: Sequence[str] = ('#',),
+                 multiline: Sequence[Tuple[str, str, str]] = tuple(PYTHON_MULTILINE)):
+        """
+        Parameters:
+        - keywords: Whole words highlighted as 'keyword'.
+        - line_comments: Prefixes that comment out the rest of the block.
+        - multiline: (open, close, kind) delimiters of tokens that may continue on later blocks.
+        """
+        self.multiline = list(multiline)
+        # A backslash escapes the next character inside a multi-line string, not inside a comment
+        self.closers = [
+            re.compile(r'(?:[^\\]|\\.)*?' + re.escape(close) if kind == 'string' else
+                       r'.*?' + re.escape(close), re.DOTALL)
+            for _, close, kind in self.multiline
+        ]
+
+        alternatives = [rf'(?P<ml{index}>{re.escape(open_)})' for index, (open_, _, _) in enumerate(self.multiline)]
+        if line_comments:
+            alternatives.append(rf"(?P<comment>(?:{'|'.join(map(re.escape, line_comments))}).*)")
+        # Multi-line openers come first so '"""' is not read as an empty '""' string
+        alternatives.append(rf'(?P<string>{DOUBLE_QUOTED}|{SINGLE_QUOTED})')
+        words = sorted(set(keywords), key=len, reverse=True)
+        if words:
+            alternatives.append(rf"(?P<keyword>\b(?:{'|'.join(map(re.escape, words))})\b)")
+        self.pattern = re.compile('|'.join(alternatives))
+
+    def highlight(self, text: str, state: int = 0) -> Tuple[List[Span], int]:
+        """
+        Spans of one block and the state to hand to the next block.
+
+        Parameters:
+        - text: The block's text, without its line terminator.
+        - state: The previous block's returned state (Qt's previousBlockState()).
+
+        Returns:
+        - ([(start, length, kind)], next state); kind is 'keyword', 'string', 'comment' or a
+          multiline entry's kind.
+        """
+        spans = []
+        position = 0
+        if state > 0:
+            position, state = self._continue(text, 0, state - 1, spans)
+            if state:
+                return spans, state
+
+        pattern = self.pattern
+        while True:
+            match = pattern.search(text, position)
+            if match is None:
+                return spans, 0
+            kind = match.lastgroup
+            if kind.startswith('ml'):
+                position, state = self._continue(text, match.start(), int(kind[2:]), spans, match.end())
+                if state:
+                    return spans, state
+            else:
+                spans.append((match.start(), match.end() - match.start(), kind))
+                position = match.end()
+
+    def _continue(self, text, start, index, spans, body_start=None):
+        """Extend multi-line token `index` from `start`; returns (resume position, state)."""
+        closed = self.closers[index].match(text, start if body_start is None else body_start)
+        end = closed.end() if closed else len(text)
+        spans.append((start, end - start, self.multiline[index][2]))
+        return end, 0 if closed else index + 1
+
+    def highlight_lines(self, lines: Iterable[str]) -> List[List[Span]]:
+        """Highlight consecutive blocks, threading the state the way QSyntaxHighlighter does."""
+        state = 0
+        result = []
+        for line in lines:
+            spans, state = self.highlight(line, state)
+            result.append(spans)
+        return result
+
+
+# Shared engines; compiling them once per process is the point
+PYTHON_ENGINE = HighlightEngine(PYTHON_KEYWORDS)
+SCRIPT_ENGINE = HighlightEngine(SCRIPT_KEYWORDS, line_comments=('#', '//'),
+                                multiline=PYTHON_MULTILINE + [('/*', '*/', 'comment')])
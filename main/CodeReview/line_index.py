@@ -0,0 +1,108 @@
+# line_index.py
+"""
+Random access to the lines of a large file, independent of Qt.
+
+LineIndex memory-maps the file and records the byte offset of every line once (array of 64-bit
+offsets, built with mmap.find so the scan runs in C). After that, any range of lines is one slice
+of the map and one decode: reading the lines around line 250,000 costs the same as around line 1.
+
+BlockStates answers "which highlighter state is line N entered with?" without highlighting lines
+0..N-1. A line that contains no multi-line delimiter (\"\"\", ''', /* ...) leaves the state unchanged, so
+only the lines that do contain one are run through the engine, once, and a bisect over them gives
+the state at any line.
+"""
+import mmap
+from array import array
+from bisect import bisect_right
+from typing import List
+
+from main.CodeReview.highlight_engine import HighlightEngine
+
+ENCODING = "utf-8"
+
+
+class LineIndex:
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        size = self._file.seek(0, 2)
+        # mmap rejects empty files; an empty bytes object reads the same way
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+        self.size = size
+        self.offsets = self._index_lines()
+
+    def _index_lines(self) -> array:
+        offsets = array("Q", [0])
+        find = self._map.find
+        position = find(b"\n")
+        while position != -1:
+            offsets.append(position + 1)
+            position = find(b"\n", position + 1)
+        if offsets[-1] != self.size:
+            # Last line without a trailing newline
+            offsets.append(self.size)
+        return offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    @property
+    def line_count(self) -> int:
+        return len(self)
+
+    def line_offset(self, line: int) -> int:
+        """Byte offset of a 0-based line; O(1)."""
+        return self.offsets[line]
+
+    def read(self, start: int, stop: int) -> str:
+        """Text of lines [start, stop) (0-based), line terminators included."""
+        start = max(0, min(start, len(self)))
+        stop = max(start, min(stop, len(self)))
+        return self._map[self.offsets[start]:self.offsets[stop]].decode(ENCODING, errors="replace")
+
+    def lines(self, start: int, stop: int) -> List[str]:
+        return self.read(start, stop).splitlines()
+
+    def find_all(self, needle: bytes) -> List[int]:
+        """0-based numbers of the lines containing needle, in order, without duplicates."""
+        found = []
+        find = self._map.find
+        position = find(needle)
+        while position != -1:
+            line = bisect_right(self.offsets, position) - 1
+            if not found or found[-1] != line:
+                found.append(line)
+            # Continue from the next line; further hits on this one add nothing
+            position = find(needle, self.offsets[line + 1])
+        return found
+
+    def close(self):
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class BlockStates:
+    def __init__(self, index: LineIndex, engine: HighlightEngine):
+        self.engine = engine
+        delimiters = {delimiter for open_, close, _ in engine.multiline for delimiter in (open_, close)}
+        lines = sorted({line for delimiter in delimiters for line in index.find_all(delimiter.encode(ENCODING))})
+        # State after each delimiter line, in line order
+        self.lines = array("Q", lines)
+        self.states = array("i")
+        state = 0
+        for line in lines:
+            text = index.read(line, line + 1).rstrip("\r\n")
+            _, state = engine.highlight(text, state)
+            self.states.append(state)
+
+    def state_before(self, line: int) -> int:
+        """Highlighter state a 0-based line starts in."""
+        position = bisect_right(self.lines, line - 1)
+        return self.states[position - 1] if position else 0
@@ -0,0 +1,209 @@
+# parse_cache.py
+"""
+Process-wide cache of parsed Python sources: ASTs and token streams.
+
+The analysis, refactoring and coverage tools each parse the files they look at, often the same file
+several times per action and again on every re-run. ParseCache parses each distinct source once:
+- tree(path) / tokens(path): a file is looked up by (path, mtime_ns, size); while those are
+  unchanged it is neither re-read nor re-parsed.
+- parse_source(source) / tokenize_source(source): for code that is already in memory; keyed by a
+  hash of the text, so a file and the same text in memory share one entry.
+
+Trees are shared, so they must not be modified. Callers that run a NodeTransformer ask for
+fresh=True and get a private tree parsed from the cached source. Copying a cached tree costs more
+than parsing it again: deepcopy takes about 3x as long, and pickle.loads about as long.
+
+Entries are evicted least recently used once there are more than max_entries, or their sources add
+up to more than max_bytes (an AST takes roughly ten times the memory of its source).
+
+With persist_path (or PARSE_CACHE_PATH) set, sources and token streams are pickled to that file on
+save() and at exit, and read back by the next process. ASTs are not persisted, because unpickling
+a tree takes as long as parsing it again; unpickling tokens is 2-4x faster than tokenizing.
+"""
+import ast
+import atexit
+import hashlib
+import io
+import os
+import pickle
+import threading
+import tokenize
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+MAX_ENTRIES = int(os.environ.get("PARSE_CACHE_MAX_ENTRIES", 1024))
+MAX_BYTES = int(os.environ.get("PARSE_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+PERSIST_PATH = os.environ.get("PARSE_CACHE_PATH") or None
+
+# Bumped when the persisted layout changes; other versions are ignored
+PERSIST_FORMAT = 1
+
+
+def source_digest(source: str) -> str:
+    return hashlib.sha1(source.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class _Entry:
+    __slots__ = ("source", "tree", "tokens")
+
+    def __init__(self, source: str, tokens=None):
+        self.source = source
+        self.tree = None
+        self.tokens = tokens
+
+
+class ParseCache:
+    def __init__(self, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES,
+                 persist_path: Optional[str] = PERSIST_PATH):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.persist_path = persist_path
+        # digest -> entry, least recently used first
+        self.entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # path -> ((mtime_ns, size), digest)
+        self.files: Dict[str, Tuple[Tuple[int, int], str]] = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        # Analyzer threads share the cache
+        self.lock = threading.RLock()
+        if persist_path:
+            self._load()
+
+    # Entries
+
+    def _entry(self, source: str, digest: Optional[str] = None) -> _Entry:
+        digest = digest or source_digest(source)
+        with self.lock:
+            entry = self.entries.get(digest)
+            if entry is not None:
+                self.entries.move_to_end(digest)
+                return entry
+            entry = self.entries[digest] = _Entry(source)
+            self.size += len(source)
+            self._evict()
+            return entry
+
+    def _evict(self):
+        # Keep at least the newest entry, however large
+        while len(self.entries) > 1 and (len(self.entries) > self.max_entries or self.size > self.max_bytes):
+            _, entry = self.entries.popitem(last=False)
+            self.size -= len(entry.source)
+
+    def _file_entry(self, path: str) -> _Entry:
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            known = self.files.get(path)
+            if known is not None and known[0] == key and known[1] in self.entries:
+                self.entries.move_to_end(known[1])
+                return self.entries[known[1]]
+        # tokenize.open honours coding cookies and BOMs the way the interpreter does
+        with tokenize.open(path) as file:
+            source = file.read()
+        digest = source_digest(source)
+        entry = self._entry(source, digest)
+        with self.lock:
+            self.files[path] = (key, digest)
+        return entry
+
+    def _tree(self, entry: _Entry, filename: str, fresh: bool) -> ast.Module:
+        if fresh:
+            return ast.parse(entry.source, filename)
+        with self.lock:
+            if entry.tree is not None:
+                self.hits += 1
+                return entry.tree
+            self.misses += 1
+        tree = ast.parse(entry.source, filename)
+        with self.lock:
+            if entry.tree is None:
+                entry.tree = tree
+            return entry.tree
+
+    def _tokens(self, entry: _Entry) -> Tuple[tokenize.TokenInfo, ...]:
+        with self.lock:
+            tokens = entry.tokens
+        if tokens is not None and (not tokens or isinstance(tokens[0], tokenize.TokenInfo)):
+            self.hits += 1
+            return tokens
+        if tokens is None:
+            self.misses += 1
+            tokens = tuple(tokenize.generate_tokens(io.StringIO(entry.source).readline))
+        else:
+            # Read back from disk as plain tuples
+            self.hits += 1
+            tokens = tuple(tokenize.TokenInfo(*token) for token in tokens)
+        with self.lock:
+            entry.tokens = tokens
+        return tokens
+
+    # Public API
+
+    def source(self, path: str) -> str:
+        return self._file_entry(path).source
+
+    def tree(self, path: str, fresh: bool = False) -> ast.Module:
+        """AST of a file; shared and read-only unless fresh=True. Raises SyntaxError like ast.parse."""
+        return self._tree(self._file_entry(path), path, fresh)
+
+    def tokens(self, path: str) -> Tuple[tokenize.TokenInfo, ...]:
+        """Token stream of a file, as tokenize.generate_tokens() yields it."""
+        return self._tokens(self._file_entry(path))
+
+    def parse_source(self, source: str, filename: str = "<unknown>", fresh: bool = False) -> ast.Module:
+        return self._tree(self._entry(source), filename, fresh)
+
+    def tokenize_source(self, source: str) -> Tuple[tokenize.TokenInfo, ...]:
+        return self._tokens(self._entry(source))
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.files.clear()
+            self.size = 0
+
+    # Persistence
+
+    def _load(self):
+        try:
+            with open(self.persist_path, "rb") as file:
+                data = pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, ValueError):
+            return
+        if not isinstance(data, dict) or data.get("format") != PERSIST_FORMAT:
+            return
+        with self.lock:
+            for source, tokens in data["entries"]:
+                entry = self._entry(source)
+                entry.tokens = tokens
+            self.files.update(data["files"])
+
+    def save(self):
+        """Write sources and token streams to persist_path (no-op without one)."""
+        if not self.persist_path:
+            return
+        with self.lock:
+            entries = [(entry.source, tuple(tuple(token) for token in entry.tokens) if entry.tokens else None)
+                       for entry in self.entries.values()]
+            data = {"format": PERSIST_FORMAT, "entries": entries,
+                    "files": {path: known for path, known in self.files.items() if known[1] in self.entries}}
+        temp_path = f"{self.persist_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as file:
+            pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.persist_path)
+
+
+_shared_cache = None
+_shared_cache_lock = threading.Lock()
+
+
+def get_parse_cache() -> ParseCache:
+    """Process-wide cache; persisted at exit when PARSE_CACHE_PATH is set."""
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = ParseCache()
+            atexit.register(_shared_cache.save)
+        return _shared_cache
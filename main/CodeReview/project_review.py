@@ -0,0 +1,132 @@
+# project_review.py
+"""
+Helpers for reviewing only what changed in a git repository.
+
+changed_python_files() and changed_hunks() ask git which Python files differ from a base ref and
+which line ranges of them were added or modified; untracked files (not ignored) count as entirely
+new. changed_findings() reduces analyzer results to
+the findings that fall inside those ranges. Cost follows the size of the diff, not of the repository.
+"""
+import json
+import os
+import re
+import subprocess
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+# "path:line:" prefix of text reports (mypy, vulture, flake8's default format)
+TEXT_LOCATION = re.compile(r"^(?P<path>.+?):(?P<line>\d+):")
+
+
+def git_output(repo_root: str, *args: str) -> str:
+    try:
+        return subprocess.run(["git", "-C", repo_root, "-c", "core.quotepath=off", *args],
+                              capture_output=True, text=True, encoding="utf-8", check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(e.stderr.strip() or f"git {' '.join(args)} failed")
+
+
+def changed_python_files(repo_root: str, base_ref: str) -> List[str]:
+    """Python files under repo_root that differ from base_ref (working tree included), relative to repo_root."""
+    output = git_output(repo_root, "diff", "--relative", "--name-only", "-z", "--diff-filter=d",
+                        base_ref, "--", "*.py")
+    return [path for path in output.split("\0") if path]
+
+
+def untracked_python_files(repo_root: str) -> List[str]:
+    """Python files under repo_root that git does not track and does not ignore, relative to repo_root."""
+    output = git_output(repo_root, "ls-files", "--others", "--exclude-standard", "-z", "--", "*.py")
+    return [path for path in output.split("\0") if path]
+
+
+def changed_hunks(repo_root: str, base_ref: str) -> Dict[str, List[Tuple[int, int]]]:
+    """Added/modified line ranges (first, last; 1-based, inclusive) of each changed Python file."""
+    output = git_output(repo_root, "diff", "--relative", "-U0", "--no-color", "--no-ext-diff", "--diff-filter=d",
+                        base_ref, "--", "*.py")
+    hunks = {}
+    current = None
+    for line in output.splitlines():
+        if line.startswith("+++ "):
+            path = line[4:]
+            current = hunks.setdefault(path[2:] if path.startswith("b/") else path, [])
+            continue
+        match = HUNK_HEADER.match(line)
+        if match and current is not None:
+            start = int(match.group(1))
+            count = int(match.group(2)) if match.group(2) is not None else 1
+            # count == 0 is a pure deletion; nothing in the new file to review
+            if count:
+                current.append((start, start + count - 1))
+    return hunks
+
+
+def collect_changes(repo_root: str, base_ref: str) -> Dict[str, List[Tuple[int, int]]]:
+    """{path: hunks} for every changed Python file; files without added lines get an empty list."""
+    hunks = changed_hunks(repo_root, base_ref)
+    changes = {path: sorted(hunks.get(path, [])) for path in changed_python_files(repo_root, base_ref)}
+    for path in untracked_python_files(repo_root):
+        # git diff does not see untracked files; every line of one is new
+        with open(os.path.join(repo_root, path), "rb") as file:
+            line_count = len(file.read().splitlines())
+        changes[path] = [(1, line_count)] if line_count else []
+    return changes
+
+
+def _json_data(result: Dict):
+    data = result.get('data')
+    if data is None and result.get('raw'):
+        # Results cached by the API only carry the raw output
+        try:
+            data = json.loads(result['raw'])
+        except ValueError:
+            data = None
+    return data
+
+
+def tool_findings(tool: str, result: Dict) -> List[Tuple[int, int, str]]:
+    """(first line, last line, message) of every finding in one analyzer result."""
+    data = _json_data(result) if tool in ("pylint", "flake8", "bandit") else None
+    if tool == "pylint" and isinstance(data, list):
+        return [(m["line"], m["line"], f"{m['message-id']} {m['message']} ({m['symbol']})") for m in data]
+    if tool == "flake8" and isinstance(data, dict):
+        return [(m["line_number"], m["line_number"], f"{m['code']} {m['text']}")
+                for messages in data.values() for m in messages]
+    if tool == "bandit" and isinstance(data, dict):
+        return [(min(r.get("line_range") or [r["line_number"]]), max(r.get("line_range") or [r["line_number"]]),
+                 f"{r['test_id']} {r['issue_severity']}: {r['issue_text']}") for r in data.get("results", [])]
+    if tool == "radon" and isinstance(result.get('complexity'), dict):
+        return [(block["lineno"], block.get("endline") or block["lineno"],
+                 f"{block['name']}: complexity {block['complexity']} ({block['rank']})")
+                for blocks in result['complexity'].values() if isinstance(blocks, list) for block in blocks]
+
+    findings = []
+    for line in (result.get('raw') or '').splitlines():
+        match = TEXT_LOCATION.match(line)
+        if match:
+            findings.append((int(match.group("line")), int(match.group("line")), line[match.end():].strip()))
+    return findings
+
+
+def overlaps(first: int, last: int, hunks: List[Tuple[int, int]]) -> bool:
+    """Whether [first, last] touches any of the sorted, non-overlapping hunks."""
+    index = bisect_left(hunks, (first, first))
+    # The hunk starting before `first` may still extend into the range
+    if index and hunks[index - 1][1] >= first:
+        return True
+    return index < len(hunks) and hunks[index][0] <= last
+
+
+def changed_findings(results: Dict[str, Dict], hunks: List[Tuple[int, int]]) -> Dict[str, List[Dict]]:
+    """{tool: [{"line", "message"}]} keeping only findings on changed lines; tool errors are always kept."""
+    report = {}
+    for tool, result in results.items():
+        if 'error' in result:
+            report[tool] = [{"line": 0, "message": result.get('raw') or result['error']}]
+            continue
+        findings = [{"line": first, "message": message}
+                    for first, last, message in sorted(tool_findings(tool, result)) if overlaps(first, last, hunks)]
+        if findings:
+            report[tool] = findings
+    return report
@@ -0,0 +1,328 @@
+# results_store.py
+"""
+Persistent history of code review runs.
+
+Every analysis run (desktop tool or FastAPI service) is recorded as one row in analysis_runs plus one
+row per issue in analysis_issues: file, module, tool, issue code, severity, line and message. Issues
+are matched across runs by a fingerprint of (file, tool, code, message) without the line number, so
+an issue that merely moved is not reported as new. Inserts are batched in one transaction per run;
+runs beyond KEEP_RUNS per project (or older than KEEP_DAYS) are pruned as new runs arrive.
+
+Each run also records which files it covered: a project review only analyzes the files in its diff,
+so two runs of one project may cover different files. new_issues and top_regressions only compare
+files that both runs covered. The trend queries only touch the runs they compare, through the
+(run_id, fingerprint) and (run_id, file) indexes, so they stay fast as history grows.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import subprocess
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+RESULTS_PATH = os.environ.get(
+    "CODE_REVIEW_RESULTS_PATH", os.path.join(os.path.expanduser("~"), ".code_review_results.db"))
+KEEP_RUNS = int(os.environ.get("CODE_REVIEW_KEEP_RUNS", 200))
+KEEP_DAYS = int(os.environ.get("CODE_REVIEW_KEEP_DAYS", 180))
+
+# "path:line: [severity:] message [code]" lines of mypy and vulture
+TEXT_ISSUE = re.compile(r"^.+?:(?P<line>\d+):(?:\d+:)?\s*(?:(?P<severity>error|warning|note):\s*)?(?P<message>.*?)"
+                        r"(?:\s+\[(?P<code>[\w-]+)\])?$")
+
+# flake8's default "path:line:col: CODE message" lines (without the JSON formatter plugin)
+FLAKE8_TEXT_ISSUE = re.compile(r"^.+?:(?P<line>\d+):\d+:\s+(?P<code>[A-Z]+\d+)\s+(?P<message>.*)$")
+
+# Radon ranks that count as an issue (cyclomatic complexity above 10)
+RADON_ISSUE_RANKS = {"C", "D", "E", "F"}
+
+# (file, module, tool, code, severity, line, message)
+Issue = Tuple[str, str, str, str, str, int, str]
+
+
+def module_name(file: str) -> str:
+    """Dotted module of a project-relative path: pkg/sub/mod.py -> pkg.sub.mod."""
+    name = file.replace("\\", "/")
+    if name.endswith(".py"):
+        name = name[:-3]
+    if name.endswith("/__init__"):
+        name = name[:-len("/__init__")]
+    return name.strip("/").replace("/", ".")
+
+
+def _json_data(result: Dict):
+    data = result.get('data')
+    if data is None and result.get('raw'):
+        # Runs recorded before the API parsed its output only kept the raw text
+        try:
+            data = json.loads(result['raw'])
+        except ValueError:
+            data = None
+    return data
+
+
+def _radon_complexity(result: Dict):
+    complexity = result.get('complexity')
+    raw = result.get('raw') or ''
+    if complexity is None and raw.startswith("Complexity:\n"):
+        # "Complexity:\n<cc -j>\nMaintainability:\n<mi -j>" when only the raw text was kept
+        try:
+            complexity = json.loads(raw[len("Complexity:\n"):].split("\nMaintainability:\n")[0])
+        except ValueError:
+            complexity = None
+    return complexity
+
+
+def _flake8_severity(code: str) -> str:
+    return {"E": "error", "F": "error", "W": "warning", "C": "convention"}.get(code[:1], "warning")
+
+
+def issues_from_result(file: str, tool: str, result: Dict) -> List[Issue]:
+    """Normalised issues of one tool's result for one file; tool errors yield no issues."""
+    if 'error' in result:
+        return []
+    module = module_name(file)
+    issues = []
+    data = _json_data(result) if tool in ("pylint", "flake8", "bandit") else None
+    complexity = _radon_complexity(result) if tool == "radon" else None
+
+    if tool == "pylint" and isinstance(data, list):
+        for message in data:
+            issues.append((message["message-id"], message["type"], message["line"],
+                           f"{message['message']} ({message['symbol']})"))
+    elif tool == "flake8" and isinstance(data, dict):
+        for messages in data.values():
+            for message in messages:
+                issues.append((message["code"], _flake8_severity(message["code"]),
+                               message["line_number"], message["text"]))
+    elif tool == "flake8":
+        for line in (result.get('raw') or '').splitlines():
+            match = FLAKE8_TEXT_ISSUE.match(line)
+            if match:
+                issues.append((match.group("code"), _flake8_severity(match.group("code")),
+                               int(match.group("line")), match.group("message")))
+    elif tool == "bandit" and isinstance(data, dict):
+        for issue in data.get("results", []):
+            issues.append((issue["test_id"], issue["issue_severity"].lower(),
+                           issue["line_number"], issue["issue_text"]))
+    elif tool == "radon" and isinstance(complexity, dict):
+        for blocks in complexity.values():
+            for block in blocks if isinstance(blocks, list) else []:
+                if block["rank"] in RADON_ISSUE_RANKS:
+                    issues.append((f"CC-{block['rank']}", "refactor", block["lineno"],
+                                   f"{block['name']} has complexity {block['complexity']}"))
+    elif tool in ("mypy", "vulture"):
+        for line in (result.get('raw') or '').splitlines():
+            match = TEXT_ISSUE.match(line)
+            if match is None or match.group("severity") == "note":
+                continue
+            message = match.group("message")
+            code = match.group("code") or (
+                "-".join(message.split("'")[0].split()[:2]) if tool == "vulture" else "misc")
+            issues.append((code, match.group("severity") or "warning", int(match.group("line")), message))
+
+    return [(file, module, tool, code, severity, line, message) for code, severity, line, message in issues]
+
+
+def fingerprint(file: str, tool: str, code: str, message: str) -> str:
+    return hashlib.sha1(f"{file}\0{tool}\0{code}\0{message}".encode("utf-8")).hexdigest()
+
+
+def git_head(path: str) -> Optional[str]:
+    """Commit checked out in the repository containing path, if any."""
+    directory = path if os.path.isdir(path) else os.path.dirname(os.path.abspath(path))
+    try:
+        result = subprocess.run(["git", "-C", directory, "rev-parse", "HEAD"],
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    return result.stdout.strip() or None
+
+
+class ResultsStore:
+    def __init__(self, db_path: str = RESULTS_PATH, keep_runs: int = KEEP_RUNS, keep_days: int = KEEP_DAYS):
+        self.db_path = db_path
+        self.keep_runs = keep_runs
+        self.keep_days = keep_days
+        # Analyzer threads and API worker threads share the connection
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+        # Pruned runs take their issues with them (ON DELETE CASCADE)
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        with self.conn:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_runs (
+                    id INTEGER PRIMARY KEY,
+                    project TEXT NOT NULL,
+                    commit_sha TEXT,
+                    source TEXT NOT NULL,
+                    started_at REAL NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_analysis_runs_project "
+                              "ON analysis_runs (project, started_at)")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_issues (
+                    run_id INTEGER NOT NULL REFERENCES analysis_runs (id) ON DELETE CASCADE,
+                    file TEXT NOT NULL,
+                    module TEXT NOT NULL,
+                    tool TEXT NOT NULL,
+                    code TEXT NOT NULL,
+                    severity TEXT NOT NULL,
+                    line INTEGER NOT NULL,
+                    message TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL
+                )
+            """)
+            # new_issues() probes by fingerprint within a run; regressions and module counts group by file
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_analysis_issues_fingerprint "
+                              "ON analysis_issues (run_id, fingerprint)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_analysis_issues_file "
+                              "ON analysis_issues (run_id, file)")
+            covered_files_exist = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'analysis_run_files'").fetchone()
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_run_files (
+                    run_id INTEGER NOT NULL REFERENCES analysis_runs (id) ON DELETE CASCADE,
+                    file TEXT NOT NULL,
+                    PRIMARY KEY (run_id, file)
+                ) WITHOUT ROWID
+            """)
+            if not covered_files_exist:
+                # Older runs did not record their files; the files they found issues in are the best guess
+                self.conn.execute("INSERT OR IGNORE INTO analysis_run_files (run_id, file) "
+                                  "SELECT DISTINCT run_id, file FROM analysis_issues")
+
+    def record_run(self, project: str, file_results: Dict[str, Dict[str, Dict]], commit: Optional[str] = None,
+                   source: str = "desktop") -> Optional[int]:
+        """
+        Store one run.
+
+        Parameters:
+        - project: What the run covers (repository root, file path or upload name); trends are per project.
+        - file_results: {project-relative file: {tool: result}} as produced by the analyzers; its keys are
+          the files the run covered, which may be only part of the project.
+        - commit: Commit the analyzed code came from, when known.
+        - source: "desktop" or "api".
+
+        Returns:
+        - The run id, or None when no tool produced a result (a run of failed tools would make every
+          issue look new next time).
+        """
+        if all('error' in result for results in file_results.values() for result in results.values()):
+            return None
+        issues = [issue for file, results in file_results.items()
+                  for tool, result in results.items() for issue in issues_from_result(file, tool, result)]
+        return self.record_issues(project, issues, commit, source, files=file_results)
+
+    def record_issues(self, project: str, issues: Iterable[Issue], commit: Optional[str] = None,
+                      source: str = "desktop", files: Optional[Iterable[str]] = None) -> int:
+        """Store one run of already normalised issues; files defaults to the files the issues are in."""
+        issues = list(issues)
+        files = {issue[0] for issue in issues} if files is None else set(files)
+        rows = ((file, module, tool, code, severity, line, message, fingerprint(file, tool, code, message))
+                for file, module, tool, code, severity, line, message in issues)
+        with self.lock, self.conn:
+            run_id = self.conn.execute(
+                "INSERT INTO analysis_runs (project, commit_sha, source, started_at) VALUES (?, ?, ?, ?)",
+                (project, commit, source, time.time())).lastrowid
+            self.conn.executemany(
+                "INSERT INTO analysis_issues (run_id, file, module, tool, code, severity, line, message, fingerprint) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", ((run_id, *row) for row in rows))
+            self.conn.executemany("INSERT INTO analysis_run_files (run_id, file) VALUES (?, ?)",
+                                  ((run_id, file) for file in sorted(files)))
+            self._prune(project)
+        return run_id
+
+    def _prune(self, project: str):
+        cutoff = time.time() - self.keep_days * 86400
+        self.conn.execute(
+            "DELETE FROM analysis_runs WHERE project = ? AND (started_at < ? OR id NOT IN "
+            "(SELECT id FROM analysis_runs WHERE project = ? ORDER BY started_at DESC, id DESC LIMIT ?))",
+            (project, cutoff, project, self.keep_runs))
+
+    def runs(self, project: str, limit: int = 20) -> List[Dict]:
+        """Most recent runs first, with their issue counts."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT r.id, r.commit_sha, r.source, r.started_at, "
+                "(SELECT COUNT(*) FROM analysis_issues i WHERE i.run_id = r.id) "
+                "FROM analysis_runs r WHERE r.project = ? ORDER BY r.started_at DESC, r.id DESC LIMIT ?",
+                (project, limit)).fetchall()
+        return [{"run_id": run_id, "commit": commit, "source": source, "started_at": started_at, "issues": issues}
+                for run_id, commit, source, started_at, issues in rows]
+
+    def _last_two_runs(self, project: str) -> Tuple[Optional[int], Optional[int]]:
+        ids = [run_id for run_id, in self.conn.execute(
+            "SELECT id FROM analysis_runs WHERE project = ? ORDER BY started_at DESC, id DESC LIMIT 2",
+            (project,))]
+        return (ids + [None, None])[0], (ids + [None, None])[1]
+
+    def new_issues(self, project: str) -> List[Dict]:
+        """
+        Issues of the latest run that the run before it did not have (all of them for a first run).
+
+        Files the previous run did not cover are left out: their issues are unknown, not new.
+        """
+        with self.lock:
+            latest, previous = self._last_two_runs(project)
+            if latest is None:
+                return []
+            rows = self.conn.execute(
+                "SELECT file, tool, code, severity, line, message FROM analysis_issues i "
+                "WHERE i.run_id = ? AND NOT EXISTS "
+                "(SELECT 1 FROM analysis_issues p WHERE p.run_id = ? AND p.fingerprint = i.fingerprint) "
+                "AND (? IS NULL OR EXISTS "
+                "(SELECT 1 FROM analysis_run_files f WHERE f.run_id = ? AND f.file = i.file)) "
+                "ORDER BY file, line", (latest, previous, previous, previous)).fetchall()
+        return [dict(zip(("file", "tool", "code", "severity", "line", "message"), row)) for row in rows]
+
+    def counts_by_module(self, project: str, last_runs: int = 20) -> List[Dict]:
+        """Issue count per module for each of the last runs, oldest run first."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT r.id, r.started_at, r.commit_sha, i.module, COUNT(*) "
+                "FROM (SELECT id, started_at, commit_sha FROM analysis_runs WHERE project = ? "
+                "      ORDER BY started_at DESC, id DESC LIMIT ?) r "
+                "JOIN analysis_issues i ON i.run_id = r.id "
+                "GROUP BY r.id, i.module ORDER BY r.started_at, r.id, i.module",
+                (project, last_runs)).fetchall()
+        return [{"run_id": run_id, "started_at": started_at, "commit": commit, "module": module, "issues": count}
+                for run_id, started_at, commit, module, count in rows]
+
+    def top_regressions(self, project: str, limit: int = 10) -> List[Dict]:
+        """Files covered by both of the last two runs whose issue count grew the most between them."""
+        with self.lock:
+            latest, previous = self._last_two_runs(project)
+            if latest is None:
+                return []
+            rows = self.conn.execute(
+                "SELECT file, SUM(run_id = ?) AS now, COALESCE(SUM(run_id = ?), 0) AS before "
+                "FROM analysis_issues WHERE run_id IN (?, ?) "
+                "AND (? IS NULL OR file IN (SELECT a.file FROM analysis_run_files a JOIN analysis_run_files b "
+                "ON b.file = a.file WHERE a.run_id = ? AND b.run_id = ?)) GROUP BY file "
+                "HAVING now > before ORDER BY now - before DESC, file LIMIT ?",
+                (latest, previous, latest, previous, previous, latest, previous, limit)).fetchall()
+        return [{"file": file, "issues": now, "previous": before, "delta": now - before}
+                for file, now, before in rows]
+
+    def close(self):
+        self.conn.close()
+
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+
+def get_results_store() -> ResultsStore:
+    """Process-wide store at RESULTS_PATH."""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = ResultsStore()
+        return _shared_store
@@ -0,0 +1,40 @@
+# syntax_highlighter.py
+"""
+QSyntaxHighlighter driven by a HighlightEngine.
+
+Formats are built once per highlighter; highlightBlock() is one engine pass plus one setFormat()
+per token, and multi-line strings/comments continue through setCurrentBlockState(). initial_state
+is the state of the document's first block, for documents that hold an excerpt of a file.
+"""
+from typing import Dict
+
+from PyQt5.QtGui import QColor, QSyntaxHighlighter, QTextCharFormat
+
+from main.CodeReview.highlight_engine import HighlightEngine
+
+
+class RegexHighlighter(QSyntaxHighlighter):
+    def __init__(self, engine: HighlightEngine, colors: Dict[str, str], parent=None):
+        """
+        Parameters:
+        - engine: Tokenizer for the language, e.g. highlight_engine.PYTHON_ENGINE.
+        - colors: Foreground color per token kind ('keyword', 'string', 'comment'); kinds without
+          a color are left unformatted.
+        """
+        super().__init__(parent)
+        self.engine = engine
+        self.initial_state = 0
+        self.formats = {}
+        for kind, color in colors.items():
+            text_format = QTextCharFormat()
+            text_format.setForeground(QColor(color))
+            self.formats[kind] = text_format
+
+    def highlightBlock(self, text):
+        first = self.currentBlock().blockNumber() == 0
+        spans, state = self.engine.highlight(text, self.initial_state if first else self.previousBlockState())
+        for start, length, kind in spans:
+            text_format = self.formats.get(kind)
+            if text_format is not None:
+                self.setFormat(start, length, text_format)
+        self.setCurrentBlockState(state)
@@ -0,0 +1,84 @@
+import pytest
+
+from main.CodeReview.analysis_cache import AnalysisCache, file_digest
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache.db"), max_bytes=10_000)
+    yield cache
+    cache.close()
+
+
+def counting(result):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return result
+    return compute, calls
+
+
+def test_hit_after_first_run(cache):
+    compute, calls = counting({'data': [], 'raw': '[]'})
+    assert cache.fetch("abc", "no-such-tool", ["x"], compute) == {'data': [], 'raw': '[]'}
+    assert cache.fetch("abc", "no-such-tool", ["x"], compute) == {'data': [], 'raw': '[]', 'cached': True}
+    assert len(calls) == 1
+
+
+def test_key_includes_content_and_options(cache):
+    compute, calls = counting({'raw': 'ok'})
+    cache.fetch("abc", "no-such-tool", ["x"], compute)
+    cache.fetch("def", "no-such-tool", ["x"], compute)
+    cache.fetch("abc", "no-such-tool", ["y"], compute)
+    assert len(calls) == 3
+
+
+def test_force_refresh_and_errors_skip_cache(cache):
+    compute, calls = counting({'raw': 'ok'})
+    cache.fetch("abc", "no-such-tool", [], compute)
+    cache.fetch("abc", "no-such-tool", [], compute, force_refresh=True)
+    assert len(calls) == 2
+
+    failing, failing_calls = counting({'raw': '', 'error': 'timeout'})
+    cache.fetch("abc", "other-tool", [], failing)
+    cache.fetch("abc", "other-tool", [], failing)
+    assert len(failing_calls) == 2
+
+
+def test_evicts_least_recently_used(cache):
+    payload = {'raw': 'x' * 3000}
+    for content_hash in ("a", "b", "c"):
+        cache.fetch(content_hash, "no-such-tool", [], lambda: payload)
+    cache.fetch("a", "no-such-tool", [], lambda: payload)  # touch "a" so "b" is the oldest
+    cache.fetch("d", "no-such-tool", [], lambda: payload)
+
+    assert cache.stats()["bytes"] <= 10_000
+    compute, calls = counting(payload)
+    cache.fetch("a", "no-such-tool", [], compute)
+    cache.fetch("b", "no-such-tool", [], compute)
+    assert len(calls) == 1
+
+
+def test_file_digest_tracks_content(tmp_path):
+    path = tmp_path / "module.py"
+    path.write_text("x = 1\n")
+    first = file_digest(str(path))
+    path.write_text("x = 2\n")
+    assert file_digest(str(path)) != first
+
+
+def test_hit_reports_the_path_it_was_asked_for(cache):
+    def flake8(path):
+        return lambda: {'data': {path: [{"code": "F401", "line_number": 1}]}, 'raw': f"{path}:1:1: F401"}
+
+    cache.fetch("abc", "no-such-tool", [], flake8("/tmp/upload1/mod.py"), file_path="/tmp/upload1/mod.py")
+    compute, calls = counting({})
+    hit = cache.fetch("abc", "no-such-tool", [], compute, file_path="/tmp/upload2/mod.py")
+    assert not calls
+    assert hit == {'data': {"/tmp/upload2/mod.py": [{"code": "F401", "line_number": 1}]},
+                   'raw': "/tmp/upload2/mod.py:1:1: F401", 'cached': True}
+
+    # Module names in tool output come from the file name, so another name is another entry
+    cache.fetch("abc", "no-such-tool", [], compute, file_path="/tmp/upload2/other.py")
+    assert len(calls) == 1
@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from main.CodeReview.analyzer_pool import AnalyzerPool, JobCancelled
+
+# Not an in-process analyzer, so the worker runs it as a subprocess: python -c <code> <file_path>
+ECHO = [sys.executable, "-c", "import sys; print(sys.argv[1])"]
+SLEEP = [sys.executable, "-c", "import time; time.sleep(5)"]
+
+
+@pytest.fixture
+def pool():
+    pool = AnalyzerPool(size=1, max_jobs_per_worker=2)
+    yield pool
+    pool.close()
+
+
+def test_returns_one_output_per_command(pool):
+    assert pool.run([ECHO, ECHO], "module.py") == ["module.py\n", "module.py\n"]
+
+
+def test_workers_are_reused_then_recycled(pool):
+    spawned = []
+    spawn = pool._spawn
+
+    def counting_spawn():
+        worker = spawn()
+        spawned.append(worker.process.pid)
+        return worker
+
+    pool._spawn = counting_spawn
+    for _ in range(5):
+        pool.run([ECHO], "module.py")
+    assert len(spawned) == 3
+
+
+def test_timeout_kills_the_worker(pool):
+    with pytest.raises(subprocess.TimeoutExpired):
+        pool.run([SLEEP], "module.py", timeout=0.5)
+    assert pool.run([ECHO], "module.py") == ["module.py\n"]
+
+
+def test_cancel(pool):
+    cancel_event = threading.Event()
+    threading.Timer(0.3, cancel_event.set).start()
+    with pytest.raises(JobCancelled):
+        pool.run([SLEEP], "module.py", cancel_event=cancel_event)
+
+
+@pytest.mark.skipif(os.name != "posix", reason="process groups are POSIX only")
+def test_timeout_also_kills_the_analyzer_subprocess(pool, tmp_path):
+    # Run through the subprocess fallback: sh -c <script> sh <file_path> writes its pid to file_path
+    pid_file = tmp_path / "analyzer.pid"
+    with pytest.raises(subprocess.TimeoutExpired):
+        pool.run([["sh", "-c", 'echo $$ > "$1"; exec sleep 30', "sh"]], str(pid_file), timeout=1)
+    pid = int(pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return
+        time.sleep(0.05)
+    pytest.fail(f"analyzer {pid} outlived its worker")
@@ -0,0 +1,64 @@
+import os
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("PyQt5.QtCore")
+
+from main.CodeReview.code_review_ad import CodeAnalyzerWorker  # noqa: E402
+
+# Stand-ins for the analyzers: sh -c <script> sh <file_path>, printing an empty JSON report
+SLEEP_THEN_REPORT = ["sh", "-c", "sleep 0.5; echo []", "sh"]
+SLEEP_LONG = ["sh", "-c", "sleep 30; echo []", "sh"]
+# Leaves a background child holding stdout open; only killing the whole process group ends it
+FORKS_HELPER = ["sh", "-c", "sleep 30 & sleep 30; echo []", "sh"]
+
+
+def make_worker(commands, **options):
+    worker = CodeAnalyzerWorker("module.py", [name for name, (key, _) in CodeAnalyzerWorker.ANALYZERS.items()
+                                              if key in commands],
+                                dict(options, use_cache=False, use_pool=False, record_history=False))
+    worker.ANALYZER_COMMANDS = {key: [command] for key, command in commands.items()}
+    emitted = {"results": [], "tools": [], "errors": [], "cancelled": 0}
+    worker.result.connect(emitted["results"].append)
+    worker.tool_result.connect(lambda key, result: emitted["tools"].append(key))
+    worker.error.connect(emitted["errors"].append)
+    worker.cancelled.connect(lambda: emitted.update(cancelled=emitted["cancelled"] + 1))
+    return worker, emitted
+
+
+def timed_run(worker):
+    started = time.monotonic()
+    worker.run()
+    return time.monotonic() - started
+
+
+@pytest.mark.skipif(os.name != "posix", reason="stub analyzers are shell commands")
+def test_tools_run_concurrently():
+    worker, emitted = make_worker({"pylint": SLEEP_THEN_REPORT, "flake8": SLEEP_THEN_REPORT,
+                                   "bandit": SLEEP_THEN_REPORT}, max_workers=3)
+    # Three half-second tools one after another would take 1.5s
+    assert timed_run(worker) < 1.2
+    results, = emitted["results"]
+    assert sorted(emitted["tools"]) == ["bandit", "flake8", "pylint"]
+    assert all(result["data"] == [] for result in results.values())
+
+
+@pytest.mark.skipif(os.name != "posix", reason="stub analyzers are shell commands")
+def test_timeout_becomes_an_error_result():
+    worker, emitted = make_worker({"pylint": SLEEP_LONG, "flake8": SLEEP_THEN_REPORT}, timeout=1)
+    assert timed_run(worker) < 10
+    results, = emitted["results"]
+    assert results["pylint"]["error"] == "timeout"
+    assert results["flake8"]["data"] == []
+
+
+@pytest.mark.skipif(os.name != "posix", reason="process groups are POSIX only")
+def test_cancel_kills_the_tools_process_group():
+    worker, emitted = make_worker({"pylint": FORKS_HELPER, "flake8": SLEEP_LONG}, max_workers=2)
+    threading.Timer(0.5, worker.cancel).start()
+    assert timed_run(worker) < 10
+    assert emitted["cancelled"] == 1
+    assert emitted["results"] == []
+    assert emitted["errors"] == []
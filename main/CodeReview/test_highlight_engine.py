@@ -0,0 +1,54 @@
+from main.CodeReview.highlight_engine import PYTHON_ENGINE, SCRIPT_ENGINE
+
+
+def kinds(text, spans):
+    return [(text[start:start + length], kind) for start, length, kind in spans]
+
+
+def test_one_pass_tokens():
+    text = 'if name == "a \\" b" and x: # done'
+    spans, state = PYTHON_ENGINE.highlight(text)
+    assert kinds(text, spans) == [("if", "keyword"), ('"a \\" b"', "string"),
+                                  ("and", "keyword"), ("# done", "comment")]
+    assert state == 0
+
+
+def test_keywords_are_whole_words():
+    text = "format = information or classy"
+    spans, _ = PYTHON_ENGINE.highlight(text)
+    assert kinds(text, spans) == [("or", "keyword")]
+
+
+def test_comment_markers_inside_strings_are_not_comments():
+    text = "url = 'http://host/#anchor'"
+    spans, _ = PYTHON_ENGINE.highlight(text)
+    assert kinds(text, spans) == [("'http://host/#anchor'", "string")]
+
+
+def test_triple_quoted_string_carries_block_state():
+    lines = ['x = """first # not a comment', 'if still inside', 'end""" if x else None']
+    highlighted = PYTHON_ENGINE.highlight_lines(lines)
+    assert kinds(lines[0], highlighted[0]) == [('"""first # not a comment', "string")]
+    assert kinds(lines[1], highlighted[1]) == [("if still inside", "string")]
+    assert kinds(lines[2], highlighted[2]) == [('end"""', "string"), ("if", "keyword"),
+                                               ("else", "keyword"), ("None", "keyword")]
+
+
+def test_state_distinguishes_quote_styles():
+    _, state = PYTHON_ENGINE.highlight("s = '''open")
+    spans, state = PYTHON_ENGINE.highlight('""" still open', state)
+    assert spans == [(0, 14, "string")] and state > 0
+    _, state = PYTHON_ENGINE.highlight("'''", state)
+    assert state == 0
+
+
+def test_qt_default_state_means_outside():
+    assert PYTHON_ENGINE.highlight("pass", -1) == ([(0, 4, "keyword")], 0)
+
+
+def test_script_engine_block_comments():
+    lines = ["int x; /* start", "return */ return x; // tail"]
+    highlighted = SCRIPT_ENGINE.highlight_lines(lines)
+    assert kinds(lines[0], highlighted[0]) == [("/* start", "comment")]
+    assert kinds(lines[1], highlighted[1]) == [("return */", "comment"), ("return", "keyword"),
+                                               ("// tail", "comment")]
@@ -0,0 +1,38 @@
+from main.CodeReview.highlight_engine import PYTHON_ENGINE
+from main.CodeReview.line_index import BlockStates, LineIndex
+
+SOURCE = 'import os\n"""doc\nstill doc\n"""\nx = 1\ny = """a\nb"""  # é\nlast'
+
+
+def test_random_access_lines(tmp_path):
+    path = tmp_path / "m.py"
+    path.write_text(SOURCE, encoding="utf-8")
+    with LineIndex(str(path)) as index:
+        assert index.line_count == 8
+        assert index.lines(6, 8) == ['b"""  # é', "last"]
+        assert index.read(1, 3) == '"""doc\nstill doc\n'
+        assert index.line_offset(1) == len("import os\n")
+        assert index.lines(7, 100) == ["last"]
+        assert index.find_all(b'"""') == [1, 3, 5, 6]
+
+
+def test_block_states_match_full_highlighting(tmp_path):
+    path = tmp_path / "m.py"
+    path.write_text(SOURCE + "\n", encoding="utf-8")
+    lines = SOURCE.split("\n")
+    expected = [0]
+    for line in lines:
+        expected.append(PYTHON_ENGINE.highlight(line, expected[-1])[1])
+
+    with LineIndex(str(path)) as index:
+        states = BlockStates(index, PYTHON_ENGINE)
+        assert [states.state_before(line) for line in range(len(lines))] == expected[:-1]
+
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.py"
+    path.write_bytes(b"")
+    with LineIndex(str(path)) as index:
+        assert index.line_count == 0
+        assert index.lines(0, 10) == []
+        assert BlockStates(index, PYTHON_ENGINE).state_before(0) == 0
@@ -0,0 +1,71 @@
+import os
+import tokenize
+
+import pytest
+
+from main.CodeReview.parse_cache import ParseCache
+
+
+@pytest.fixture
+def cache():
+    return ParseCache(persist_path=None)
+
+
+def test_unchanged_file_is_parsed_once(tmp_path, cache):
+    path = tmp_path / "mod.py"
+    path.write_text("def f():\n    return 1\n")
+    tree = cache.tree(str(path))
+    assert cache.tree(str(path)) is tree
+    # The same text from memory shares the entry
+    assert cache.parse_source("def f():\n    return 1\n") is tree
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    # A fresh tree can be transformed without touching the shared one
+    fresh = cache.tree(str(path), fresh=True)
+    assert fresh is not tree
+    fresh.body.clear()
+    assert cache.tree(str(path)).body
+
+    path.write_text("def g():\n    return 22\n")
+    assert cache.tree(str(path)).body[0].name == "g"
+
+
+def test_tokens(tmp_path, cache):
+    path = tmp_path / "mod.py"
+    path.write_text("x = 1  # one\n")
+    tokens = cache.tokens(str(path))
+    assert [token.string for token in tokens if token.type == tokenize.COMMENT] == ["# one"]
+    assert cache.tokens(str(path)) is tokens
+
+
+def test_lru_bounds(cache):
+    cache.max_entries = 2
+    first = cache.parse_source("a = 1\n")
+    cache.parse_source("b = 1\n")
+    cache.parse_source("a = 1\n")
+    cache.parse_source("c = 1\n")
+    # "b" was least recently used
+    assert cache.parse_source("a = 1\n") is first
+    assert len(cache.entries) == 2
+    cache.max_bytes = 6
+    cache.parse_source("d = 1\n")
+    assert len(cache.entries) == 1
+
+
+def test_persisted_tokens_survive_a_restart(tmp_path):
+    path = tmp_path / "mod.py"
+    path.write_text("value = 'x'\n")
+    store = str(tmp_path / "parse_cache.pickle")
+    cache = ParseCache(persist_path=store)
+    tokens = cache.tokens(str(path))
+    cache.save()
+
+    restarted = ParseCache(persist_path=store)
+    assert restarted.tokens(str(path)) == tokens
+    assert (restarted.hits, restarted.misses) == (1, 0)
+    assert restarted.tree(str(path)).body[0].targets[0].id == "value"
+
+    with open(store, "wb") as file:
+        file.write(b"not a pickle")
+    assert ParseCache(persist_path=store).entries == {}
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
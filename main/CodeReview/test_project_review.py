@@ -0,0 +1,68 @@
+import json
+import subprocess
+
+import pytest
+
+from main.CodeReview.project_review import changed_findings, collect_changes, overlaps
+
+
+def git(repo, *args):
+    subprocess.run(["git", "-C", str(repo), *args], check=True, capture_output=True)
+
+
+@pytest.fixture
+def repo(tmp_path):
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "config", "user.email", "review@example.com")
+    git(tmp_path, "config", "user.name", "review")
+    (tmp_path / "kept.py").write_text("a = 1\nb = 2\nc = 3\nd = 4\n")
+    (tmp_path / "untouched.py").write_text("x = 1\n")
+    (tmp_path / "removed.py").write_text("y = 1\n")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "base")
+    git(tmp_path, "tag", "base")
+    return tmp_path
+
+
+def test_collect_changes_lists_changed_python_files_and_hunks(repo):
+    (repo / "kept.py").write_text("a = 1\nB = 2\nc = 3\nd = 4\ne = 5\n")
+    (repo / "removed.py").unlink()
+    (repo / "notes.txt").write_text("not python\n")
+    git(repo, "add", "-A")
+
+    assert collect_changes(str(repo), "base") == {"kept.py": [(2, 2), (5, 5)]}
+
+
+def test_untracked_files_are_entirely_new(repo):
+    (repo / "pkg").mkdir()
+    (repo / "pkg" / "new.py").write_text("a = 1\nb = 2\n")
+    (repo / "empty.py").write_text("")
+    (repo / "build.py").write_text("ignored = True\n")
+    (repo / ".gitignore").write_text("build.py\n")
+
+    assert collect_changes(str(repo), "base") == {"pkg/new.py": [(1, 2)], "empty.py": []}
+
+
+def test_overlaps():
+    hunks = [(3, 5), (10, 10)]
+    assert overlaps(4, 4, hunks)
+    assert overlaps(1, 3, hunks)
+    assert overlaps(5, 9, hunks)
+    assert overlaps(8, 12, hunks)
+    assert not overlaps(6, 9, hunks)
+    assert not overlaps(11, 20, hunks)
+    assert not overlaps(1, 1, [])
+
+
+def test_changed_findings_keeps_changed_lines_and_errors():
+    pylint = [{"line": 2, "message-id": "C0103", "message": "bad name", "symbol": "invalid-name"},
+              {"line": 7, "message-id": "W0612", "message": "unused", "symbol": "unused-variable"}]
+    results = {
+        'pylint': {'data': pylint, 'raw': json.dumps(pylint)},
+        'vulture': {'data': None, 'raw': "kept.py:9: unused variable 'z' (60% confidence)\n"},
+        'mypy': {'raw': 'Timed out after 60s', 'error': 'timeout'},
+    }
+    assert changed_findings(results, [(1, 3)]) == {
+        'pylint': [{"line": 2, "message": "C0103 bad name (invalid-name)"}],
+        'mypy': [{"line": 0, "message": "Timed out after 60s"}],
+    }
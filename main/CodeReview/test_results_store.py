@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from main.CodeReview.results_store import ResultsStore, issues_from_result, module_name
+
+
+def pylint_result(*messages):
+    data = [{"line": line, "message-id": code, "type": "warning", "message": text, "symbol": code.lower()}
+            for code, line, text in messages]
+    return {'raw': json.dumps(data)}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultsStore(str(tmp_path / "results.db"), keep_runs=3)
+    yield store
+    store.close()
+
+
+def test_issues_from_results():
+    assert issues_from_result("pkg/mod.py", "pylint", pylint_result(("W0612", 4, "unused"))) == [
+        ("pkg/mod.py", "pkg.mod", "pylint", "W0612", "warning", 4, "unused (w0612)")]
+    mypy = {'raw': 'pkg/mod.py:7: error: Incompatible return value  [return-value]\n'
+                   'pkg/mod.py:7: note: see docs\nFound 1 error in 1 file\n'}
+    assert issues_from_result("pkg/mod.py", "mypy", mypy) == [
+        ("pkg/mod.py", "pkg.mod", "mypy", "return-value", "error", 7, "Incompatible return value")]
+    vulture = {'raw': "pkg/mod.py:3: unused variable 'x' (60% confidence)\n"}
+    assert issues_from_result("pkg/mod.py", "vulture", vulture)[0][3] == "unused-variable"
+    assert issues_from_result("pkg/mod.py", "pylint", {'raw': '', 'error': 'timeout'}) == []
+    assert module_name("pkg/sub/__init__.py") == "pkg.sub"
+
+
+def test_issues_from_api_results():
+    # What the API kept before it parsed its output: flake8's text format and radon's raw text
+    flake8 = {'raw': "/tmp/x/mod.py:3:1: F401 'os' imported but unused\n"}
+    assert issues_from_result("mod.py", "flake8", flake8) == [
+        ("mod.py", "mod", "flake8", "F401", "error", 3, "'os' imported but unused")]
+    cc = {"/tmp/x/mod.py": [{"rank": "D", "lineno": 5, "name": "tangled", "complexity": 23}]}
+    radon = {'raw': f"Complexity:\n{json.dumps(cc)}\nMaintainability:\n{{}}"}
+    assert issues_from_result("mod.py", "radon", radon) == [
+        ("mod.py", "mod", "radon", "CC-D", "refactor", 5, "tangled has complexity 23")]
+    assert issues_from_result("mod.py", "radon", {**radon, 'complexity': cc}) == issues_from_result(
+        "mod.py", "radon", radon)
+
+
+def test_new_issues_ignore_moved_lines(store):
+    store.record_run("proj", {"a.py": {"pylint": pylint_result(("W0612", 4, "unused"))}})
+    store.record_run("proj", {"a.py": {"pylint": pylint_result(("W0612", 9, "unused"),
+                                                                ("C0103", 2, "bad name"))}})
+    assert [(issue["code"], issue["line"]) for issue in store.new_issues("proj")] == [("C0103", 2)]
+    assert store.new_issues("other") == []
+
+
+def test_trends(store):
+    store.record_run("proj", {"a.py": {"pylint": pylint_result(("W1", 1, "x"))},
+                              "pkg/b.py": {"pylint": pylint_result(("W1", 1, "x"), ("W2", 2, "y"))}})
+    store.record_run("proj", {"a.py": {"pylint": pylint_result(("W1", 1, "x"), ("W2", 2, "y"), ("W3", 3, "z"))},
+                              "pkg/b.py": {"pylint": pylint_result(("W1", 1, "x"))},
+                              "c.py": {"pylint": pylint_result(("W1", 1, "x"))}})
+
+    # c.py was not analyzed in the first run, so it cannot have regressed
+    assert store.top_regressions("proj") == [{"file": "a.py", "issues": 3, "previous": 1, "delta": 2}]
+    counts = [(row["module"], row["issues"]) for row in store.counts_by_module("proj")]
+    assert counts == [("a", 1), ("pkg.b", 2), ("a", 3), ("c", 1), ("pkg.b", 1)]
+
+
+def test_runs_over_different_files_only_compare_files_both_covered(store):
+    # Project reviews analyze only the files in the current diff
+    store.record_run("repo", {"a.py": {"pylint": pylint_result(("W1", 1, "x"))},
+                              "clean.py": {"pylint": pylint_result()}})
+    store.record_run("repo", {"a.py": {"pylint": pylint_result(("W1", 1, "x"), ("W2", 2, "y"))},
+                              "clean.py": {"pylint": pylint_result(("W3", 1, "z"))},
+                              "b.py": {"pylint": pylint_result(("W1", 1, "x"), ("W2", 2, "y"))}})
+
+    assert [(issue["file"], issue["code"]) for issue in store.new_issues("repo")] == [
+        ("a.py", "W2"), ("clean.py", "W3")]
+    assert [(row["file"], row["delta"]) for row in store.top_regressions("repo")] == [("a.py", 1), ("clean.py", 1)]
+
+
+def test_first_run_is_all_new_and_retention(store):
+    for count in range(1, 6):
+        store.record_run("proj", {"a.py": {"pylint": pylint_result(*[("W1", line, "x") for line in range(count)])}})
+    assert len(store.new_issues("proj")) == 0
+    runs = store.runs("proj")
+    assert [run["issues"] for run in runs] == [5, 4, 3]
+    # Issues of pruned runs are gone too
+    assert store.conn.execute("SELECT COUNT(*) FROM analysis_issues").fetchone()[0] == 12
+
+    store.record_run("fresh", {"a.py": {"pylint": pylint_result(("W1", 1, "x"))}})
+    assert len(store.new_issues("fresh")) == 1
+
+
+def test_runs_where_every_tool_failed_are_not_recorded(store):
+    assert store.record_run("proj", {"a.py": {"pylint": {'raw': '', 'error': 'timeout'}}}) is None
+    assert store.runs("proj") == []
@@ -1,17 +1,19 @@
 import ast
 import datetime
+import json
 import sys
 import subprocess
 import tempfile
 import os
-from typing import List, Dict, Optional, Tuple
+import re
+from typing import Dict, Optional, Tuple
 import astunparse
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QLabel, QTextEdit, QFileDialog, QListWidget, QMessageBox,
     QProgressBar, QSpinBox, QComboBox, QGroupBox, QGridLayout,
     QSplitter, QTreeWidget, QTreeWidgetItem, QCheckBox, QInputDialog,
-    QDialog, QLineEdit
+    QDialog, QLineEdit, QPlainTextEdit
 )
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon
@@ -22,55 +24,60 @@ import rope.base.project
 import rope.refactor.extract
 import rope.refactor.rename
 import rope.refactor.usefunction
-from rope.base.project import Project
 from rope.refactor.rename import Rename
 from rope.refactor.extract import ExtractMethod
 from rope.base import worder
 
+from main.CodeReview.code_preview import LazyCodePreview
+from main.CodeReview.parse_cache import get_parse_cache
+from main.intelligent_script_refactoring.ast_analysis import analyze_tree
+from main.intelligent_script_refactoring.batch_refactoring import REFACTORING_ORDER, plan
+from main.intelligent_script_refactoring.refactoring_journal import get_journal, read_text
+from main.intelligent_script_refactoring.rope_projects import (
+    RopeProjects, find_project_root, get_rope_projects, perform)
+
+# Line a result row points at: "path:12:..." (pylint) or "... at line 12" (code smells)
+LINE_REFERENCE = re.compile(r':(\d+):|\bline (\d+)')
+
 
 class CodeRefactorer:
-    def __init__(self, file_path: str):
+    def __init__(self, file_path: str, projects: Optional[RopeProjects] = None):
         self.file_path = file_path
-        self.project = Project('.')
-        self.resource = self.project.get_resource(file_path)
+        # Rope projects stay open between operations; see rope_projects
+        self.projects = projects or get_rope_projects()
+        # path -> (before, after) of every file the last rope refactoring wrote
+        self.changed_files: Dict[str, Tuple[str, str]] = {}
 
     def extract_method(self, start_offset: int, end_offset: int, new_name: str) -> str:
-        try:
-            extractor = ExtractMethod(self.project, self.resource, start_offset, end_offset)
-            changes = extractor.get_changes(new_name)
-            changes.do()
-            return self.get_file_content()
-        finally:
-            self.project.close()
+        with self.projects.open(self.file_path) as (project, resource):
+            extractor = ExtractMethod(project, resource, start_offset, end_offset)
+            self.changed_files = perform(project, extractor.get_changes(new_name))
+        return self.get_file_content()
 
     def rename_symbol(self, offset: int, new_name: str) -> str:
-        try:
-            renamer = Rename(self.project, self.resource, offset)
-            changes = renamer.get_changes(new_name)
-            changes.do()
-            return self.get_file_content()
-        finally:
-            self.project.close()
+        with self.projects.open(self.file_path) as (project, resource):
+            renamer = Rename(project, resource, offset)
+            self.changed_files = perform(project, renamer.get_changes(new_name))
+        return self.get_file_content()
 
     def convert_to_context_manager(self, class_name: str) -> str:
-        with open(self.file_path, 'r') as file:
-            tree = ast.parse(file.read())
+        # The transformer edits the tree, so it gets its own
+        tree = get_parse_cache().tree(self.file_path, fresh=True)
 
         transformer = ContextManagerTransformer(class_name)
         new_tree = transformer.visit(tree)
         return astunparse.unparse(new_tree)
 
     def simplify_complex_function(self, function_name: str) -> str:
-        with open(self.file_path, 'r') as file:
-            tree = ast.parse(file.read())
+        # The transformer edits the tree, so it gets its own
+        tree = get_parse_cache().tree(self.file_path, fresh=True)
 
         transformer = ComplexFunctionSimplifier(function_name)
         new_tree = transformer.visit(tree)
         return astunparse.unparse(new_tree)
 
     def get_file_content(self) -> str:
-        with open(self.file_path, 'r') as file:
-            return file.read()
+        return read_text(self.file_path)
 
 
 class ContextManagerTransformer(ast.NodeTransformer):
@@ -335,7 +342,6 @@ class ScriptRefactoringTool(QWidget):
     def __init__(self):
         super().__init__()
         self.analyzer_thread = None
-        self.refactoring_history = []
         self.refactorer = None
         self.initUI()
 
@@ -350,105 +356,69 @@ class ScriptRefactoringTool(QWidget):
 
         try:
             # Initialize refactorer if needed
-            if not self.refactorer:
+            if not self.refactorer or self.refactorer.file_path != self.file_path:
                 self.refactorer = CodeRefactorer(self.file_path)
 
-            # Create backup before refactoring
-            backup_path = f"{self.file_path}.bak"
-            with open(self.file_path, 'r') as file:
-                original_code = file.read()
-            with open(backup_path, 'w') as file:
-                file.write(original_code)
+            # Keeps CRLF line endings, so the journal's hashes match the file
+            original_code = read_text(self.file_path)
 
             # Get refactoring parameters through dialog
             dialog = RefactoringDialog(refactoring_type, self)
             if dialog.exec_() != QDialog.Accepted:
                 return
 
-            # Apply the selected refactoring
-            if refactoring_type == "Remove Unused Imports":
-                refactored_code = self.remove_unused_imports(original_code)
-
-            elif refactoring_type == "Extract Method":
-                start_offset = self.get_offset_for_line(original_code, dialog.start_line.value())
-                end_offset = self.get_offset_for_line(original_code, dialog.end_line.value())
-                refactored_code = self.refactorer.extract_method(
-                    start_offset, end_offset, dialog.method_name.text())
-
-            elif refactoring_type == "Rename Symbol":
-                offset = self.find_symbol_offset(original_code, dialog.old_name.text())
-                refactored_code = self.refactorer.rename_symbol(
-                    offset, dialog.new_name.text())
-
-            elif refactoring_type == "Convert to Context Manager":
-                refactored_code = self.refactorer.convert_to_context_manager(
-                    dialog.class_name.text())
+            # Rope and the journal rewrite the previewed file, which must not be open or mapped meanwhile
+            with self.code_preview.released():
+                # Apply the selected refactoring
+                if refactoring_type == "Remove Unused Imports":
+                    refactored_code = self.remove_unused_imports(original_code)
 
-            elif refactoring_type == "Simplify Complex Function":
-                refactored_code = self.refactorer.simplify_complex_function(
-                    dialog.function_name.text())
+                elif refactoring_type == "Extract Method":
+                    start_offset = self.get_offset_for_line(original_code, dialog.start_line.value())
+                    end_offset = self.get_offset_for_line(original_code, dialog.end_line.value())
+                    refactored_code = self.refactorer.extract_method(
+                        start_offset, end_offset, dialog.method_name.text())
 
-            elif refactoring_type == "Format with Black":
-                refactored_code = black.format_str(original_code, mode=black.FileMode())
+                elif refactoring_type == "Rename Symbol":
+                    offset = self.find_symbol_offset(original_code, dialog.old_name.text())
+                    refactored_code = self.refactorer.rename_symbol(
+                        offset, dialog.new_name.text())
 
+                elif refactoring_type == "Convert to Context Manager":
+                    refactored_code = self.refactorer.convert_to_context_manager(
+                        dialog.class_name.text())
 
-            elif refactoring_type == "Format with Black":
+                elif refactoring_type == "Simplify Complex Function":
+                    refactored_code = self.refactorer.simplify_complex_function(
+                        dialog.function_name.text())
 
-                refactored_code = black.format_str(original_code, mode=black.FileMode())
+                elif refactoring_type == "Format with Black":
+                    refactored_code = black.format_str(original_code, mode=black.FileMode())
 
 
-            elif refactoring_type == "Sort Imports":
+                elif refactoring_type == "Format with Black":
 
-                refactored_code = isort.code(original_code)
+                    refactored_code = black.format_str(original_code, mode=black.FileMode())
 
-                # Save refactored code
 
-            with open(self.file_path, 'w') as file:
+                elif refactoring_type == "Sort Imports":
 
-                file.write(refactored_code)
+                    refactored_code = isort.code(original_code)
 
-                # Update preview
-
-            self.code_preview.setText(refactored_code)
-
-            # Add to history
-
-            self.refactoring_history.append({
-
-                'type': refactoring_type,
-
-                'backup': backup_path,
-
-                'timestamp': datetime.now().isoformat()
-
-            })
+                # Save refactored code; the project's refactoring history can undo it
+                journal = get_journal(find_project_root(self.file_path))
+                if refactoring_type in ("Extract Method", "Rename Symbol"):
+                    # Rope has already written the files; a rename can touch every module that uses the name
+                    journal.record(refactoring_type, self.refactorer.changed_files)
+                else:
+                    journal.write(refactoring_type, {self.file_path: refactored_code})
 
             # Update results tree
-
             self.add_refactoring_result(refactoring_type)
 
-            QMessageBox.information(
-
-                self,
-
-                "Success",
-
-                f"Applied {refactoring_type} successfully.\nBackup saved as {backup_path}"
-
-            )
-
+            QMessageBox.information(self, "Success", f"Applied {refactoring_type} successfully.")
 
         except Exception as e:
-
-            # Restore from backup if something went wrong
-
-            if 'backup_path' in locals():
-                with open(backup_path, 'r') as file:
-                    original_code = file.read()
-
-                with open(self.file_path, 'w') as file:
-                    file.write(original_code)
-
             QMessageBox.critical(self, "Error", f"Failed to apply refactoring: {str(e)}")
 
     def get_offset_for_line(self, code: str, line_number: int) -> int:
@@ -461,7 +431,7 @@ class ScriptRefactoringTool(QWidget):
 
     def find_symbol_offset(self, code: str, symbol_name: str) -> int:
         """Find the first occurrence of a symbol in the code."""
-        tree = ast.parse(code)
+        tree = get_parse_cache().parse_source(code)
         for node in ast.walk(tree):
             if isinstance(node, ast.Name) and node.id == symbol_name:
                 return self.get_offset_for_line(code, node.lineno)
@@ -477,7 +447,8 @@ class ScriptRefactoringTool(QWidget):
 
     def remove_unused_imports(self, source_code: str) -> str:
         """Remove unused imports from the code."""
-        tree = ast.parse(source_code)
+        # The tree is edited below, so it gets its own
+        tree = get_parse_cache().parse_source(source_code, fresh=True)
 
         # First pass: collect all used names
         used_names = set()
@@ -587,21 +558,14 @@ class ScriptRefactoringTool(QWidget):
 
     def undo_last_refactoring(self):
         """Undo the last refactoring operation."""
-        if not self.refactoring_history:
-            QMessageBox.warning(self, "Warning", "No refactoring to undo.")
-            return
-
-        last_refactoring = self.refactoring_history.pop()
+        journal = get_journal(find_project_root(self.file_path))
         try:
-            # Restore from backup
-            with open(last_refactoring['backup'], 'r') as backup_file:
-                backup_code = backup_file.read()
-
-            with open(self.file_path, 'w') as current_file:
-                current_file.write(backup_code)
-
-            # Update preview
-            self.code_preview.setText(backup_code)
+            # The preview lets go of the file while it is restored and shows it again afterwards
+            with self.code_preview.released():
+                last_refactoring = journal.undo()
+            if last_refactoring is None:
+                QMessageBox.warning(self, "Warning", "No refactoring to undo.")
+                return
 
             # Update results tree
             undo_item = QTreeWidgetItem(["Undo Operation"])
@@ -614,8 +578,9 @@ class ScriptRefactoringTool(QWidget):
             QMessageBox.critical(self, "Error", f"Failed to undo refactoring: {str(e)}")
 
     def save_refactoring_history(self):
-        """Save the refactoring history to a file."""
-        if not self.refactoring_history:
+        """Export the project's refactoring history (operations and the files they changed)."""
+        operations = get_journal(find_project_root(self.file_path)).operations()
+        if not operations:
             QMessageBox.warning(self, "Warning", "No refactoring history to save.")
             return
 
@@ -629,11 +594,13 @@ class ScriptRefactoringTool(QWidget):
 
             if file_path:
                 with open(file_path, 'w') as f:
-                    json.dump(self.refactoring_history, f, indent=2)
+                    json.dump(operations, f, indent=2)
                 QMessageBox.information(self, "Success", "Refactoring history saved successfully.")
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save history: {str(e)}")
+
+
 class CodeAnalyzerWorker(QThread):
     finished = pyqtSignal(dict)
     progress = pyqtSignal(int)
@@ -652,16 +619,12 @@ class CodeAnalyzerWorker(QThread):
             results['pylint'] = result.stdout
             self.progress.emit(33)
 
-            # Run additional static analysis
-            with open(self.file_path, 'r') as file:
-                tree = ast.parse(file.read())
-
-            # Analyze code complexity
-            results['complexity'] = self.analyze_complexity(tree)
+            # Run additional static analysis; an unchanged file is not parsed again
+            tree = get_parse_cache().tree(self.file_path)
             self.progress.emit(66)
 
-            # Find code smells
-            results['code_smells'] = self.detect_code_smells(tree)
+            # Complexity, classes, imports and code smells in one pass over the tree
+            results.update(analyze_tree(tree))
             self.progress.emit(100)
 
         except Exception as e:
@@ -669,69 +632,30 @@ class CodeAnalyzerWorker(QThread):
 
         self.finished.emit(results)
 
-    def analyze_complexity(self, tree) -> Dict:
-        complexity_info = {
-            'functions': [],
-            'classes': [],
-            'imports': []
-        }
 
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                complexity = self.calculate_cyclomatic_complexity(node)
-                complexity_info['functions'].append({
-                    'name': node.name,
-                    'complexity': complexity,
-                    'lines': node.lineno
-                })
-            elif isinstance(node, ast.ClassDef):
-                complexity_info['classes'].append({
-                    'name': node.name,
-                    'methods': len([n for n in node.body if isinstance(n, ast.FunctionDef)])
-                })
-            elif isinstance(node, (ast.Import, ast.ImportFrom)):
-                complexity_info['imports'].append(str(node.names[0].name))
-
-        return complexity_info
-
-    def calculate_cyclomatic_complexity(self, node) -> int:
-        complexity = 1
-        for child in ast.walk(node):
-            if isinstance(child, (ast.If, ast.While, ast.For, ast.And, ast.Or)):
-                complexity += 1
-        return complexity
-
-    def detect_code_smells(self, tree) -> List[Dict]:
-        smells = []
+class BatchRefactoringWorker(QThread):
+    # Emits the BatchPlan, or the error message if planning failed
+    finished = pyqtSignal(object)
+    progress = pyqtSignal(int)
 
-        for node in ast.walk(tree):
-            # Long method detection
-            if isinstance(node, ast.FunctionDef):
-                if len(node.body) > 15:
-                    smells.append({
-                        'type': 'long_method',
-                        'name': node.name,
-                        'line': node.lineno
-                    })
-
-            # Large class detection
-            elif isinstance(node, ast.ClassDef):
-                method_count = len([n for n in node.body if isinstance(n, ast.FunctionDef)])
-                if method_count > 10:
-                    smells.append({
-                        'type': 'large_class',
-                        'name': node.name,
-                        'line': node.lineno
-                    })
-
-        return smells
+    def __init__(self, root, refactorings):
+        super().__init__()
+        self.root = root
+        self.refactorings = refactorings
+
+    def run(self):
+        try:
+            batch = plan(self.root, self.refactorings,
+                         progress=lambda done, total: self.progress.emit(done * 100 // total))
+        except Exception as e:
+            batch = str(e)
+        self.finished.emit(batch)
 
 
 class ScriptRefactoringTool(QWidget):
     def __init__(self):
         super().__init__()
         self.analyzer_thread = None
-        self.refactoring_history = []
         self.initUI()
 
     def initUI(self):
@@ -831,11 +755,43 @@ class ScriptRefactoringTool(QWidget):
             }
         """)
 
+        # Undo and redo go through the project's refactoring history
+        history_layout = QHBoxLayout()
+        self.undo_button = QPushButton("Undo")
+        self.undo_button.clicked.connect(self.undo_last_refactoring)
+        self.redo_button = QPushButton("Redo")
+        self.redo_button.clicked.connect(self.redo_refactoring)
+        history_layout.addWidget(self.undo_button)
+        history_layout.addWidget(self.redo_button)
+        self.update_history_buttons()
+
         refactor_layout.addWidget(self.refactoring_type)
         refactor_layout.addWidget(self.refactor_button)
+        refactor_layout.addLayout(history_layout)
         refactor_group.setLayout(refactor_layout)
         left_panel.addWidget(refactor_group)
 
+        # Batch refactoring over a whole folder
+        batch_group = QGroupBox("Batch Refactoring")
+        batch_layout = QVBoxLayout()
+
+        self.batch_dir_label = QLabel("No folder selected")
+        self.select_dir_button = QPushButton("Choose Folder")
+        self.select_dir_button.clicked.connect(self.open_dir_dialog)
+        batch_layout.addWidget(self.batch_dir_label)
+        batch_layout.addWidget(self.select_dir_button)
+
+        self.batch_checks = {}
+        for name in REFACTORING_ORDER:
+            self.batch_checks[name] = QCheckBox(name)
+            batch_layout.addWidget(self.batch_checks[name])
+
+        self.batch_button = QPushButton("Preview Batch Changes")
+        self.batch_button.clicked.connect(self.preview_batch_refactoring)
+        batch_layout.addWidget(self.batch_button)
+        batch_group.setLayout(batch_layout)
+        left_panel.addWidget(batch_group)
+
         # Add left panel to main layout
         main_layout.addLayout(left_panel, stretch=1)
 
@@ -846,11 +802,11 @@ class ScriptRefactoringTool(QWidget):
         self.results_tree = QTreeWidget()
         self.results_tree.setHeaderLabels(["Analysis Results"])
         self.results_tree.setFont(QFont("Consolas", 10))
+        self.results_tree.itemDoubleClicked.connect(self.jump_to_result)
         right_panel.addWidget(self.results_tree)
 
-        # Code preview
-        self.code_preview = QTextEdit()
-        self.code_preview.setReadOnly(True)
+        # Code preview; only the visible part of the file is loaded and highlighted
+        self.code_preview = LazyCodePreview()
         self.code_preview.setFont(QFont("Consolas", 10))
         self.code_preview.setStyleSheet("""
             QTextEdit {
@@ -880,15 +836,20 @@ class ScriptRefactoringTool(QWidget):
             self.file_path = file
             self.file_label.setText(f"Selected: {os.path.basename(file)}")
             self.load_file_preview()
+            self.update_history_buttons()
 
     def load_file_preview(self):
         try:
-            with open(self.file_path, 'r') as file:
-                content = file.read()
-                self.code_preview.setText(content)
+            self.code_preview.load(self.file_path)
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to load file: {str(e)}")
 
+    def jump_to_result(self, item, column):
+        """Show the line a result row refers to ("path:12:..." or "... at line 12")."""
+        match = LINE_REFERENCE.search(item.text(0))
+        if match and hasattr(self, 'file_path'):
+            self.code_preview.goto_line(int(match.group(1) or match.group(2)))
+
     def analyze_code(self):
         if not hasattr(self, 'file_path'):
             QMessageBox.warning(self, "File Error", "Please select a Python file first.")
@@ -936,6 +897,8 @@ class ScriptRefactoringTool(QWidget):
 
         for smell in results['code_smells']:
             smell_text = f"{smell['type']} in {smell['name']} at line {smell['line']}"
+            if 'detail' in smell:
+                smell_text += f" ({smell['detail']})"
             QTreeWidgetItem(smells_item, [smell_text])
 
         self.results_tree.expandAll()
@@ -962,32 +925,156 @@ class ScriptRefactoringTool(QWidget):
                                     f"Refactoring type '{refactoring_type}' is not yet implemented.")
                 return
 
-            # Create backup
-            backup_path = f"{self.file_path}.bak"
-            with open(backup_path, 'w') as file:
-                file.write(source_code)
+            # Save refactored code; the project's refactoring history can undo it. The preview lets go
+            # of the file meanwhile and shows the new text afterwards
+            journal = self.journal_for(self.file_path)
+            with self.code_preview.released():
+                journal.write(refactoring_type, {self.file_path: refactored_code})
+            self.update_history_buttons()
 
-            # Save refactored code
-            with open(self.file_path, 'w') as file:
-                file.write(refactored_code)
+            QMessageBox.information(self, "Success", f"Applied {refactoring_type} successfully.")
 
-            # Update preview
-            self.code_preview.setText(refactored_code)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to apply refactoring: {str(e)}")
 
-            # Add to history
-            self.refactoring_history.append({
-                'type': refactoring_type,
-                'backup': backup_path
-            })
+    def open_dir_dialog(self):
+        directory = QFileDialog.getExistingDirectory(self, "Select project folder")
+        if directory:
+            self.batch_root = directory
+            self.batch_dir_label.setText(f"Selected: {directory}")
+            self.update_history_buttons()
 
-            QMessageBox.information(self, "Success",
-                                    f"Applied {refactoring_type} successfully.\nBackup saved as {backup_path}")
+    def preview_batch_refactoring(self):
+        if not hasattr(self, 'batch_root'):
+            QMessageBox.warning(self, "Folder Error", "Please select a folder first.")
+            return
+        refactorings = [name for name, check in self.batch_checks.items() if check.isChecked()]
+        if not refactorings:
+            QMessageBox.warning(self, "Batch Refactoring", "Please select at least one refactoring.")
+            return
+
+        self.progress_bar.setValue(0)
+        self.batch_button.setEnabled(False)
+
+        # Files are transformed in worker processes; nothing is written until the diff is accepted
+        self.batch_thread = BatchRefactoringWorker(self.batch_root, refactorings)
+        self.batch_thread.progress.connect(self.update_progress)
+        self.batch_thread.finished.connect(self.handle_batch_plan)
+        self.batch_thread.start()
+
+    def handle_batch_plan(self, batch):
+        self.batch_button.setEnabled(True)
+        if isinstance(batch, str):
+            QMessageBox.critical(self, "Error", f"Batch refactoring failed: {batch}")
+            return
+
+        self.results_tree.clear()
+        changes_item = QTreeWidgetItem([f"Batch Refactoring: {len(batch.changes)} of {batch.files} files change"])
+        self.results_tree.addTopLevelItem(changes_item)
+        for change in batch.changes:
+            QTreeWidgetItem(changes_item, [os.path.relpath(change.path, batch.root)])
+        if batch.errors:
+            errors_item = QTreeWidgetItem([f"Skipped Files ({len(batch.errors)})"])
+            self.results_tree.addTopLevelItem(errors_item)
+            for path, error in batch.errors:
+                QTreeWidgetItem(errors_item, [f"{os.path.relpath(path, batch.root)}: {error}"])
+        self.results_tree.expandAll()
+
+        if not batch.changes:
+            QMessageBox.information(self, "Batch Refactoring", "No files need changes.")
+            return
+        if not self.show_batch_diff(batch):
+            return
 
+        journal = self.journal_for(batch.root)
+        try:
+            # The previewed file may be one of the files replaced
+            with self.code_preview.released():
+                written = batch.apply(journal)
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to apply refactoring: {str(e)}")
+            QMessageBox.critical(self, "Error", f"Failed to apply batch refactoring: {str(e)}")
+            return
+        self.update_history_buttons()
+        QMessageBox.information(self, "Success", f"Refactored {len(written)} files.")
+
+    def show_batch_diff(self, batch) -> bool:
+        """Show the unified diff of a batch; True if the user chose to apply it."""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Batch Refactoring Preview")
+        dialog.setModal(True)
+        dialog.resize(900, 700)
+
+        layout = QVBoxLayout()
+        diff_view = QPlainTextEdit()
+        diff_view.setReadOnly(True)
+        diff_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        diff_view.setFont(QFont("Consolas", 10))
+        diff_view.setPlainText(batch.diff())
+        layout.addWidget(diff_view)
+
+        button_layout = QHBoxLayout()
+        apply_button = QPushButton(f"Apply to {len(batch.changes)} Files")
+        apply_button.clicked.connect(dialog.accept)
+        cancel_button = QPushButton("Cancel")
+        cancel_button.clicked.connect(dialog.reject)
+        button_layout.addWidget(apply_button)
+        button_layout.addWidget(cancel_button)
+        layout.addLayout(button_layout)
+
+        dialog.setLayout(layout)
+        return dialog.exec_() == QDialog.Accepted
+
+    def journal_for(self, path):
+        """Refactoring history of the project path belongs to."""
+        journal = get_journal(find_project_root(path))
+        if journal.recovered:
+            # Operations a crash left half-done, settled when the history was opened
+            settled = "\n".join(f"{refactoring_type}: {'completed' if kept else 'rolled back'}"
+                                for refactoring_type, kept in journal.recovered)
+            journal.recovered = []
+            QMessageBox.information(self, "Refactoring History", f"Recovered interrupted refactorings:\n{settled}")
+        return journal
+
+    def current_journal(self):
+        path = getattr(self, 'file_path', None) or getattr(self, 'batch_root', None)
+        return self.journal_for(path) if path else None
+
+    def update_history_buttons(self):
+        journal = self.current_journal()
+        self.undo_button.setEnabled(bool(journal and journal.can_undo()))
+        self.redo_button.setEnabled(bool(journal and journal.can_redo()))
+
+    def undo_last_refactoring(self):
+        self.step_history(undo=True)
+
+    def redo_refactoring(self):
+        self.step_history(undo=False)
+
+    def step_history(self, undo: bool):
+        action = "undo" if undo else "redo"
+        journal = self.current_journal()
+        try:
+            # The previewed file may be one of the files restored
+            with self.code_preview.released():
+                operation = (journal.undo() if undo else journal.redo()) if journal else None
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to {action} refactoring: {str(e)}")
+            return
+        if operation is None:
+            QMessageBox.warning(self, "Warning", f"No refactoring to {action}.")
+            return
+
+        history_item = QTreeWidgetItem([f"{action.capitalize()} Operation"])
+        history_item.addChild(QTreeWidgetItem([f"{'Reverted' if undo else 'Reapplied'}: {operation['type']}"]))
+        for path in operation['files']:
+            history_item.addChild(QTreeWidgetItem([os.path.relpath(path, journal.root)]))
+        self.results_tree.insertTopLevelItem(0, history_item)
+        self.results_tree.expandItem(history_item)
+        self.update_history_buttons()
 
     def remove_unused_imports(self, source_code):
-        tree = ast.parse(source_code)
+        # The transformer edits the tree, so it gets its own
+        tree = get_parse_cache().parse_source(source_code, fresh=True)
         transformer = UnusedImportTransformer()
         transformed = transformer.visit(tree)
         return astunparse.unparse(transformed)
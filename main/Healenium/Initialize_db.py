@@ -1,40 +1,28 @@
-import sqlite3
+from main.Self_healing.locator_store import LocatorStore, bulk_write
 
 
-# Initialize database and create table if it doesn't exist
+# Initialize database: creates the shared locator tables and migrates a legacy locators table
 def init_db():
-    conn = sqlite3.connect("locators.db")
-    cursor = conn.cursor()
-    cursor.execute('''CREATE TABLE IF NOT EXISTS locators (
-                        element_name TEXT PRIMARY KEY,
-                        locator_type TEXT,
-                        locator_value TEXT,
-                        last_healed TEXT)''')
-    conn.commit()
-    conn.close()
+    LocatorStore("locators.db").close()
 
 
 # Insert sample data into the locators table
 def insert_sample_data():
-    conn = sqlite3.connect("locators.db")
-    cursor = conn.cursor()
+    store = LocatorStore("locators.db")
 
-    # Sample data: elements with different locators
+    # Sample data: (page, element, locator type, locator value, last healed, fallbacks)
     sample_data = [
-        ("loginButton", "id", "newLoginBtn", "2024-11-01 10:00:00"),
-        ("searchBox", "name", "queryInput", "2024-11-01 10:05:00"),
-        ("submitButton", "css", ".submit-btn", "2024-11-01 10:10:00"),
-        ("userMenu", "xpath", "//div[@id='userMenu']", "2024-11-01 10:15:00"),
-        ("footerLink", "link_text", "About Us", "2024-11-01 10:20:00")
+        ("", "loginButton", "id", "newLoginBtn", "2024-11-01 10:00:00", None),
+        ("", "searchBox", "name", "queryInput", "2024-11-01 10:05:00", None),
+        ("", "submitButton", "css_selector", ".submit-btn", "2024-11-01 10:10:00", None),
+        ("", "userMenu", "xpath", "//div[@id='userMenu']", "2024-11-01 10:15:00", None),
+        ("", "footerLink", "link_text", "About Us", "2024-11-01 10:20:00", None)
     ]
 
     # Insert data into the table
-    cursor.executemany(
-        "REPLACE INTO locators (element_name, locator_type, locator_value, last_healed) VALUES (?, ?, ?, ?)",
-        sample_data)
+    bulk_write(store.conn, sample_data)
 
-    conn.commit()
-    conn.close()
+    store.close()
     print("Sample data inserted successfully.")
 
 
@@ -1,99 +1,119 @@
 import sys
-import sqlite3
+import time
 from datetime import datetime
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer, QAbstractTableModel, QModelIndex
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QLabel, QPushButton, QTextEdit, QTableWidget, QTableWidgetItem, QTabWidget,
-    QToolBox, QHBoxLayout, QRadioButton, QSizePolicy
+    QApplication, QWidget, QVBoxLayout, QLabel, QPushButton, QTextEdit, QTableView, QTabWidget
 )
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import NoSuchElementException
 
+from main.Healenium.healing_event_bus import healing_event_bus
+from main.Healenium.healing_history import init_history_db, record_healing_event
+from main.Healenium.report_view import SCREENSHOT_DIR, HealingReportView
+from main.Self_healing.healing_metrics import healing_metrics
+from main.Self_healing.locator_store import get_locator_store, normalize_locator_type
+from main.Self_healing.screenshot_store import ScreenshotStore
 
-# Database setup functions
+# Minimum time between two refreshes of the Selectors table; heals arriving in between are coalesced
+LOCATOR_REFRESH_INTERVAL_MS = 500
+
+
+# Database setup functions; the locator tables are shared with LocatorManager and the pytest healing store
 def init_db():
-    conn = sqlite3.connect("locators.db")
-    cursor = conn.cursor()
-    cursor.execute('''CREATE TABLE IF NOT EXISTS locators (
-                        element_name TEXT PRIMARY KEY,
-                        locator_type TEXT,
-                        locator_value TEXT,
-                        last_healed TEXT)''')
-    conn.commit()
-    conn.close()
-
-
-# Update database and refresh the UI function
-def update_locator_in_db(element_name, locator_type, locator_value, ui_reference):
-    conn = sqlite3.connect("locators.db")
-    cursor = conn.cursor()
-    cursor.execute(
-        "REPLACE INTO locators (element_name, locator_type, locator_value, last_healed) VALUES (?, ?, ?, datetime('now'))",
-        (element_name, locator_type, locator_value)
-    )
-    conn.commit()
-    conn.close()
+    # Opening the store creates the unified schema and migrates a legacy locators table
+    get_locator_store("locators.db")
+
+
+# Update database and publish the change; subscribed UIs refresh themselves on their own thread
+def update_locator_in_db(element_name, locator_type, locator_value):
+    last_healed = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    locator_type = normalize_locator_type(locator_type)
+    get_locator_store("locators.db").put(element_name, locator_type, locator_value, last_healed=last_healed)
     print(
         f"Database updated with: element_name={element_name}, locator_type={locator_type}, locator_value={locator_value}")
 
-    # Refresh the locator table in the UI after updating the database
-    ui_reference.load_locators()
+    healing_event_bus.publish(element_name, locator_type, locator_value, last_healed)
 
 
 def get_locator_from_db(element_name):
-    conn = sqlite3.connect("locators.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT locator_type, locator_value FROM locators WHERE element_name = ?", (element_name,))
-    result = cursor.fetchone()
-    conn.close()
-    return result
+    locator = get_locator_store("locators.db").get(element_name)
+    return (locator["locator_type"], locator["locator_value"]) if locator else None
+
+
+# Append the failed/healed pair and a screenshot of the page to the healing_events history
+def log_healing_event(driver, element_name, failed_locator, healed_locator, strategy, heal_started):
+    latency_ms = (time.perf_counter() - heal_started) * 1000
+    record_healing_event("locators.db", {
+        "element_name": element_name,
+        "page": driver.current_url,
+        "failed_locator_type": failed_locator[0],
+        "failed_locator_value": failed_locator[1],
+        "healed_locator_type": healed_locator[0] if healed_locator else None,
+        "healed_locator_value": healed_locator[1] if healed_locator else None,
+        "strategy": strategy,
+        "latency_ms": latency_ms,
+        "screenshot_path": ScreenshotStore(SCREENSHOT_DIR).put(driver.get_screenshot_as_png()),
+    })
 
 
 # Main healing logic function following specified conditions
-def heal_locator(driver, element_name, primary_locator_type, primary_locator_value, ui_reference):
+def heal_locator(driver, element_name, primary_locator_type, primary_locator_value):
+    heal_started = time.perf_counter()
     element = None  # Track if an element is successfully found
     found_in_db = False  # Track if found element is from the database
 
     # Attempt primary locator
     try:
-        if primary_locator_type == "id":
-            element = driver.find_element(By.ID, primary_locator_value)
-        elif primary_locator_type == "css":
-            element = driver.find_element(By.CSS_SELECTOR, primary_locator_value)
-        elif primary_locator_type == "xpath":
-            element = driver.find_element(By.XPATH, primary_locator_value)
-        elif primary_locator_type == "name":
-            element = driver.find_element(By.NAME, primary_locator_value)
+        with healing_metrics.measure("primary", element_name) as attempt:
+            if primary_locator_type == "id":
+                element = driver.find_element(By.ID, primary_locator_value)
+            elif primary_locator_type == "css":
+                element = driver.find_element(By.CSS_SELECTOR, primary_locator_value)
+            elif primary_locator_type == "xpath":
+                element = driver.find_element(By.XPATH, primary_locator_value)
+            elif primary_locator_type == "name":
+                element = driver.find_element(By.NAME, primary_locator_value)
+            if element:
+                attempt.succeeded()
 
         # If element is found with primary locator, add to database if it’s not already there
         if element:
             print(f"Primary selector for {element_name} is valid. Adding to database.")
-            update_locator_in_db(element_name, primary_locator_type, primary_locator_value, ui_reference)
+            update_locator_in_db(element_name, primary_locator_type, primary_locator_value)
             return element
 
     except NoSuchElementException:
         print(f"Primary locator failed for {element_name}. Checking database for healed locator...")
 
     # Check for a healed locator in the database if primary locator fails
-    healed_locator = get_locator_from_db(element_name)
+    with healing_metrics.measure("database_lookup", element_name) as attempt:
+        healed_locator = get_locator_from_db(element_name)
+        if healed_locator:
+            attempt.succeeded()
     if healed_locator:
         locator_type, locator_value = healed_locator
         try:
             # Attempt to locate using the healed locator
-            if locator_type == "id":
-                element = driver.find_element(By.ID, locator_value)
-            elif locator_type == "css":
-                element = driver.find_element(By.CSS_SELECTOR, locator_value)
-            elif locator_type == "xpath":
-                element = driver.find_element(By.XPATH, locator_value)
-            elif locator_type == "name":
-                element = driver.find_element(By.NAME, locator_value)
+            with healing_metrics.measure("database", element_name) as attempt:
+                if locator_type == "id":
+                    element = driver.find_element(By.ID, locator_value)
+                elif locator_type in ("css", "css_selector"):
+                    element = driver.find_element(By.CSS_SELECTOR, locator_value)
+                elif locator_type == "xpath":
+                    element = driver.find_element(By.XPATH, locator_value)
+                elif locator_type == "name":
+                    element = driver.find_element(By.NAME, locator_value)
+                if element:
+                    attempt.succeeded()
             found_in_db = True  # Set flag if healed locator found and used
 
             # If healed locator is found, log success and return element
             if element:
                 print(f"Found {element_name} using healed locator from database.")
+                log_healing_event(driver, element_name, (primary_locator_type, primary_locator_value),
+                                  healed_locator, "database", heal_started)
                 return element
 
         except NoSuchElementException:
@@ -103,7 +123,13 @@ def heal_locator(driver, element_name, primary_locator_type, primary_locator_val
 
     # Perform dynamic healing if both primary and healed locators fail
     if element is None:
-        element = dynamic_healing(driver, element_name, ui_reference)
+        with healing_metrics.measure("dynamic", element_name) as attempt:
+            element = dynamic_healing(driver, element_name)
+            if element:
+                attempt.succeeded()
+        if element:
+            log_healing_event(driver, element_name, (primary_locator_type, primary_locator_value),
+                              get_locator_from_db(element_name), "dynamic", heal_started)
 
     # Return element only if found and log the appropriate message
     if element:
@@ -118,7 +144,7 @@ def heal_locator(driver, element_name, primary_locator_type, primary_locator_val
 
 
 # Dynamic healing logic with additional validation before database update
-def dynamic_healing(driver, element_name, ui_reference):
+def dynamic_healing(driver, element_name):
     try:
         print(f"Attempting dynamic healing for {element_name}...")
 
@@ -128,14 +154,14 @@ def dynamic_healing(driver, element_name, ui_reference):
         for element in possible_elements:
             if "expected text" in element.text:  # Additional check for unique identification
                 print(f"Dynamically found {element_name} by class name.")
-                update_locator_in_db(element_name, "class_name", "expected-class-name", ui_reference)
+                update_locator_in_db(element_name, "class_name", "expected-class-name")
                 return element
 
         # Optionally try locating by partial link text if applicable
         element = driver.find_element(By.PARTIAL_LINK_TEXT, "Expected Text")
         if element:
             print(f"Dynamically found {element_name} by partial link text.")
-            update_locator_in_db(element_name, "partial_link_text", "Expected Text", ui_reference)
+            update_locator_in_db(element_name, "partial_link_text", "Expected Text")
             return element
 
     except NoSuchElementException:
@@ -143,12 +169,74 @@ def dynamic_healing(driver, element_name, ui_reference):
         return None
 
 
+# Table model for the Selectors tab; heals are applied as row-level inserts/updates instead of a full rebuild
+class LocatorTableModel(QAbstractTableModel):
+    HEADERS = ["Element Name", "Locator Type", "Locator Value", "Last Healed Date"]
+    FIELDS = ["element_name", "locator_type", "locator_value", "last_healed"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.row_index = {}  # element_name -> row number
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return str(self.rows[index.row()][index.column()])
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return super().headerData(section, orientation, role)
+
+    def set_rows(self, rows):
+        """Replace the whole table (used for the initial load only)."""
+        self.beginResetModel()
+        self.rows = [list(row) for row in rows]
+        self.row_index = {row[0]: i for i, row in enumerate(self.rows)}
+        self.endResetModel()
+
+    def apply_updates(self, events):
+        """Apply healing events as a diff: changed rows emit dataChanged, new elements are appended."""
+        new_rows = []
+        for event in events:
+            row_data = [event[field] for field in self.FIELDS]
+            row = self.row_index.get(event["element_name"])
+            if row is None:
+                new_rows.append(row_data)
+            elif self.rows[row] != row_data:
+                self.rows[row] = row_data
+                self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+
+        if new_rows:
+            first = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(new_rows) - 1)
+            for offset, row_data in enumerate(new_rows):
+                self.rows.append(row_data)
+                self.row_index[row_data[0]] = first + offset
+            self.endInsertRows()
+
+
 # PyQt5 UI with test execution and locator display
 class HealeniumUI(QWidget):
     def __init__(self):
         super().__init__()
+        # Healing events waiting for the next refresh, keyed by element_name so repeated heals collapse
+        self.pending_locator_updates = {}
+        self.locator_refresh_timer = QTimer(self)
+        self.locator_refresh_timer.setSingleShot(True)
+        self.locator_refresh_timer.setInterval(LOCATOR_REFRESH_INTERVAL_MS)
+        self.locator_refresh_timer.timeout.connect(self.flush_locator_updates)
+
         self.initUI()
         self.load_locators()  # Load table at startup
+        healing_event_bus.subscribe(self.on_locator_healed)
 
     def initUI(self):
         self.setWindowTitle("Healenium-like Locator Healing UI")
@@ -169,9 +257,9 @@ class HealeniumUI(QWidget):
         self.healing_tab = QWidget()
         self.healing_tab_layout = QVBoxLayout()
 
-        # QToolBox for displaying healed dates as accordion-style tabs in Reports tab
-        self.date_toolbox = QToolBox()
-        self.healing_tab_layout.addWidget(self.date_toolbox)
+        # Paginated accordion of healed dates; sections are only built when expanded
+        self.report_view = HealingReportView("locators.db")
+        self.healing_tab_layout.addWidget(self.report_view)
 
         # Set layout for Reports tab
         self.healing_tab.setLayout(self.healing_tab_layout)
@@ -180,9 +268,9 @@ class HealeniumUI(QWidget):
         # Selectors Tab with Last Healed Date
         self.database_tab = QWidget()
         self.database_tab_layout = QVBoxLayout()
-        self.locator_table = QTableWidget(0, 4)  # Updated to 4 columns
-        self.locator_table.setHorizontalHeaderLabels(
-            ["Element Name", "Locator Type", "Locator Value", "Last Healed Date"])
+        self.locator_model = LocatorTableModel(self)
+        self.locator_table = QTableView()
+        self.locator_table.setModel(self.locator_model)
         self.database_tab_layout.addWidget(self.locator_table)
         self.database_tab.setLayout(self.database_tab_layout)
         self.tabs.addTab(self.database_tab, "Selectors")  # Add Selectors as the second tab
@@ -204,58 +292,9 @@ class HealeniumUI(QWidget):
         self.load_healed_dates()
 
     def load_healed_dates(self):
-        """Loads the healed dates and times into the Reports tab as accordion-style tabs in QToolBox."""
-        # Remove all existing items from QToolBox
-        while self.date_toolbox.count() > 0:
-            self.date_toolbox.removeItem(0)
-
-        # Retrieve healed dates and locator values from the database
-        conn = sqlite3.connect("locators.db")
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT element_name, locator_type, locator_value, last_healed FROM locators WHERE last_healed IS NOT NULL ORDER BY last_healed DESC")
-
-        # Add each healed date as a new section in QToolBox
-        for element_name, locator_type, locator_value, last_healed in cursor.fetchall():
-            healed_datetime = datetime.strptime(last_healed, "%Y-%m-%d %H:%M:%S")
-            formatted_date = healed_datetime.strftime("%d %b %Y %H:%M:%S")
-
-            # Create a custom layout for each tab content
-            tab_content_layout = QHBoxLayout()
-
-            # Vertical layout for locators (Failed and Healed) - displayed close together
-            locator_layout = QVBoxLayout()
-            locator_layout.setSpacing(2)  # Reduce spacing between Failed and Healed Locator labels
-
-            # Failed Locator label
-            failed_locator_label = QLabel(f"Failed Locator: {locator_type} - {locator_value}")
-            locator_layout.addWidget(failed_locator_label)
-
-            # Healed Locator label - here showing the same locator, but you may replace with actual healed locator
-            healed_locator_label = QLabel(f"Healed Locator: {locator_type} - {locator_value}")
-            locator_layout.addWidget(healed_locator_label)
-
-            # Add the vertical locator layout to the horizontal layout
-            tab_content_layout.addLayout(locator_layout)
-
-            # Placeholder for Screenshot - QLabel with fixed size and centered alignment
-            screenshot_label = QLabel("Screenshot")
-            screenshot_label.setFixedSize(120, 120)  # Set a fixed size for the screenshot placeholder
-            screenshot_label.setStyleSheet("border: 1px solid black;")
-            screenshot_label.setAlignment(Qt.AlignCenter)  # Center the text within the QLabel
-            tab_content_layout.addWidget(screenshot_label)
-
-            # Success healing radio button - properly aligned to the center of its space
-            success_healing_radio = QRadioButton("Success Healing")
-            success_healing_radio.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
-            tab_content_layout.addWidget(success_healing_radio, alignment=Qt.AlignCenter)
-
-            # Set the tab content layout in a QWidget and add it to the QToolBox
-            tab_content_widget = QWidget()
-            tab_content_widget.setLayout(tab_content_layout)
-            self.date_toolbox.addItem(tab_content_widget, formatted_date)
-
-        conn.close()
+        """Reloads the first page of healed dates into the Reports tab."""
+        self.report_view.reload()
+
     def run_test(self):
         # Initialize browser
         driver = webdriver.Chrome()
@@ -268,7 +307,7 @@ class HealeniumUI(QWidget):
         primary_locator_value = "//*[contains(text(), 'Forgot Your Password?')]"
 
         # Attempt to heal locator and find element
-        element = heal_locator(driver, element_name, primary_locator_type, primary_locator_value, self)
+        element = heal_locator(driver, element_name, primary_locator_type, primary_locator_value)
 
         if element:
             self.log_display.append(f"Found {element_name} using healed locator.")
@@ -276,22 +315,30 @@ class HealeniumUI(QWidget):
             self.log_display.append(f"Failed to find {element_name}. The selector is not valid.")
 
         driver.quit()
+        self.log_display.append(healing_metrics.report())
 
     def load_locators(self):
         """Loads the locator database table into the UI, refreshing existing data."""
-        self.locator_table.setRowCount(0)
-        conn = sqlite3.connect("locators.db")
-        cursor = conn.cursor()
-        cursor.execute("SELECT element_name, locator_type, locator_value, last_healed FROM locators")
-        for row_index, row_data in enumerate(cursor.fetchall()):
-            self.locator_table.insertRow(row_index)
-            for col_index, col_data in enumerate(row_data):
-                self.locator_table.setItem(row_index, col_index, QTableWidgetItem(str(col_data)))
-        conn.close()
+        self.locator_model.set_rows(get_locator_store("locators.db").list_locators())
+
+    def on_locator_healed(self, event):
+        """Queues a healing event; at most one table refresh happens per LOCATOR_REFRESH_INTERVAL_MS."""
+        self.pending_locator_updates[event["element_name"]] = event
+        if not self.locator_refresh_timer.isActive():
+            self.locator_refresh_timer.start()
+
+    def flush_locator_updates(self):
+        """Applies all coalesced healing events to the Selectors table in one diff."""
+        events = list(self.pending_locator_updates.values())
+        self.pending_locator_updates.clear()
+        self.locator_model.apply_updates(events)
+        # Newest heals go on top of the Reports tab without dropping the pages already loaded
+        self.report_view.show_new_events()
 
 
 # Initialize database and run the PyQt5 app
 init_db()
+init_history_db("locators.db")
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
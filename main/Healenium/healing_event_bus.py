@@ -0,0 +1,32 @@
+from datetime import datetime
+
+from PyQt5.QtCore import QObject, Qt, pyqtSignal
+
+
+# Event bus between the healing code and the UI.
+# Writers call publish() from whatever thread did the healing; subscribers are connected with a
+# queued connection so the slot always runs on the thread that owns the subscriber (the GUI thread).
+class HealingEventBus(QObject):
+    locator_healed = pyqtSignal(dict)
+
+    def publish(self, element_name, locator_type, locator_value, last_healed=None):
+        """Publish a locator write. Safe to call from any thread."""
+        if last_healed is None:
+            last_healed = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        self.locator_healed.emit({
+            "element_name": element_name,
+            "locator_type": locator_type,
+            "locator_value": locator_value,
+            "last_healed": last_healed,
+        })
+
+    def subscribe(self, slot):
+        """Connect a slot that receives event dicts on its own (usually the GUI) thread."""
+        self.locator_healed.connect(slot, Qt.QueuedConnection)
+
+    def unsubscribe(self, slot):
+        self.locator_healed.disconnect(slot)
+
+
+# Shared bus used by healenium.py and healing_logic.py
+healing_event_bus = HealingEventBus()
@@ -0,0 +1,160 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+EVENT_COLUMNS = (
+    "element_name", "page", "failed_locator_type", "failed_locator_value",
+    "healed_locator_type", "healed_locator_value", "strategy", "latency_ms", "ts", "screenshot_path"
+)
+
+
+# Append-only log of every heal. Unlike element_locators (one row per element, overwritten on
+# each heal) this keeps the failed/healed pair of every event so reports can show what changed.
+def init_history_db(db_path="locators.db"):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    # WAL lets dashboards read while a test run keeps appending
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute('''CREATE TABLE IF NOT EXISTS healing_events (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        element_name TEXT NOT NULL,
+                        page TEXT,
+                        failed_locator_type TEXT,
+                        failed_locator_value TEXT,
+                        healed_locator_type TEXT,
+                        healed_locator_value TEXT,
+                        strategy TEXT,
+                        latency_ms REAL,
+                        ts TEXT NOT NULL,
+                        screenshot_path TEXT)''')
+    # Databases created before screenshots were recorded
+    columns = {row[1] for row in cursor.execute("PRAGMA table_info(healing_events)")}
+    if "screenshot_path" not in columns:
+        cursor.execute("ALTER TABLE healing_events ADD COLUMN screenshot_path TEXT")
+    # Per-element history in time order
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_healing_events_element_ts "
+                   "ON healing_events (element_name, ts)")
+    # Time-window scans; the trailing columns let strategy/latency aggregates run from the index alone
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_healing_events_ts "
+                   "ON healing_events (ts, strategy, latency_ms)")
+    # Daily roll-up that compaction folds expired events into
+    cursor.execute('''CREATE TABLE IF NOT EXISTS healing_events_daily (
+                        day TEXT NOT NULL,
+                        element_name TEXT NOT NULL,
+                        strategy TEXT NOT NULL,
+                        heals INTEGER NOT NULL,
+                        total_latency_ms REAL NOT NULL,
+                        PRIMARY KEY (day, element_name, strategy))''')
+    conn.commit()
+    conn.close()
+
+
+def _event_row(event):
+    ts = event.get("ts") or datetime.utcnow().strftime(TIMESTAMP_FORMAT)
+    return tuple(ts if column == "ts" else event.get(column) for column in EVENT_COLUMNS)
+
+
+def record_healing_event(db_path, event):
+    """Append a single healing event (a dict keyed by EVENT_COLUMNS; ts defaults to now, UTC)."""
+    record_healing_events(db_path, [event])
+
+
+def record_healing_events(db_path, events):
+    """
+    Append many healing events in one transaction.
+
+    Parameters:
+    - db_path: Path to the SQLite database file.
+    - events: Iterable of dicts keyed by EVENT_COLUMNS.
+
+    Returns:
+    - The number of events written.
+    """
+    rows = [_event_row(event) for event in events]
+    if not rows:
+        return 0
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.executemany(
+            f"INSERT INTO healing_events ({', '.join(EVENT_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in EVENT_COLUMNS)})",
+            rows)
+    conn.close()
+    return len(rows)
+
+
+def get_events_between(db_path, start, end, element_name=None, limit=None):
+    """
+    Return events with start <= ts < end, newest first, as dicts.
+
+    Parameters:
+    - start, end: Timestamps formatted with TIMESTAMP_FORMAT (or datetime objects).
+    - element_name: Restrict to one element (served by the (element_name, ts) index).
+    - limit: Optional maximum number of rows.
+    """
+    start, end = _as_timestamp(start), _as_timestamp(end)
+    query = f"SELECT id, {', '.join(EVENT_COLUMNS)} FROM healing_events WHERE ts >= ? AND ts < ?"
+    params = [start, end]
+    if element_name is not None:
+        query += " AND element_name = ?"
+        params.append(element_name)
+    query += " ORDER BY ts DESC, id DESC"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    rows = [dict(row) for row in conn.execute(query, params)]
+    conn.close()
+    return rows
+
+
+def get_strategy_stats(db_path, start, end):
+    """
+    Aggregate heals per strategy in a time window.
+
+    Returns:
+    - A dict of strategy -> {"heals": int, "avg_latency_ms": float, "max_latency_ms": float}.
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.execute(
+        "SELECT strategy, COUNT(*), AVG(latency_ms), MAX(latency_ms) FROM healing_events "
+        "WHERE ts >= ? AND ts < ? GROUP BY strategy",
+        (_as_timestamp(start), _as_timestamp(end)))
+    stats = {
+        strategy: {"heals": heals, "avg_latency_ms": avg_latency or 0.0, "max_latency_ms": max_latency or 0.0}
+        for strategy, heals, avg_latency, max_latency in cursor.fetchall()
+    }
+    conn.close()
+    return stats
+
+
+def compact_history(db_path, retention_days=30, now=None):
+    """
+    Fold events older than the retention window into healing_events_daily and delete them.
+
+    Returns:
+    - The number of raw events removed.
+    """
+    now = now or datetime.utcnow()
+    cutoff = (now - timedelta(days=retention_days)).strftime(TIMESTAMP_FORMAT)
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute(
+            "INSERT INTO healing_events_daily (day, element_name, strategy, heals, total_latency_ms) "
+            "SELECT substr(ts, 1, 10), element_name, COALESCE(strategy, ''), COUNT(*), COALESCE(SUM(latency_ms), 0) "
+            "FROM healing_events WHERE ts < ? GROUP BY 1, 2, 3 "
+            "ON CONFLICT (day, element_name, strategy) DO UPDATE SET "
+            "heals = heals + excluded.heals, total_latency_ms = total_latency_ms + excluded.total_latency_ms",
+            (cutoff,))
+        removed = conn.execute("DELETE FROM healing_events WHERE ts < ?", (cutoff,)).rowcount
+    conn.close()
+    return removed
+
+
+def _as_timestamp(value):
+    if isinstance(value, datetime):
+        return value.strftime(TIMESTAMP_FORMAT)
+    return value
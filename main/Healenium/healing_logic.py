@@ -1,22 +1,19 @@
-import sqlite3
+from datetime import datetime
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webdriver import WebDriver
 
+from main.Healenium.healing_event_bus import healing_event_bus
+from main.Self_healing.locator_store import get_locator_store, normalize_locator_type
+
 def get_locator_from_db(element_name):
-    conn = sqlite3.connect("locators.db")
-    cursor = conn.cursor()
-    cursor.execute("SELECT locator_type, locator_value FROM locators WHERE element_name = ?", (element_name,))
-    result = cursor.fetchone()
-    conn.close()
-    return result
+    locator = get_locator_store("locators.db").get(element_name)
+    return (locator["locator_type"], locator["locator_value"]) if locator else None
 
 def update_locator_in_db(element_name, locator_type, locator_value):
-    conn = sqlite3.connect("locators.db")
-    cursor = conn.cursor()
-    cursor.execute("REPLACE INTO locators (element_name, locator_type, locator_value, last_healed) VALUES (?, ?, ?, datetime('now'))",
-                   (element_name, locator_type, locator_value))
-    conn.commit()
-    conn.close()
+    last_healed = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+    locator_type = normalize_locator_type(locator_type)
+    get_locator_store("locators.db").put(element_name, locator_type, locator_value, last_healed=last_healed)
+    healing_event_bus.publish(element_name, locator_type, locator_value, last_healed)
 
 def heal_locator(driver: WebDriver, element_name, primary_locator_type, primary_locator_value):
     try:
@@ -33,7 +30,7 @@ def heal_locator(driver: WebDriver, element_name, primary_locator_type, primary_
             try:
                 if locator_type == "id":
                     return driver.find_element(By.ID, locator_value)
-                elif locator_type == "css":
+                elif locator_type in ("css", "css_selector"):
                     return driver.find_element(By.CSS_SELECTOR, locator_value)
                 # Add other locator types as needed
             except:
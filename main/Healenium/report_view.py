@@ -0,0 +1,209 @@
+import os
+import sqlite3
+from datetime import datetime
+
+from PyQt5.QtCore import Qt, QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QToolBox, QRadioButton, QSizePolicy
+)
+
+# Number of healed rows fetched per page
+REPORT_PAGE_SIZE = 50
+# Content-addressed store the healing code writes screenshots to; events keep the stored path
+SCREENSHOT_DIR = "screenshots"
+SCREENSHOT_SIZE = 120
+
+
+REPORT_COLUMNS = ("id, element_name, failed_locator_type, failed_locator_value, "
+                 "healed_locator_type, healed_locator_value, ts, screenshot_path")
+
+
+def fetch_healed_page(db_path, after=None, limit=REPORT_PAGE_SIZE):
+    """
+    Fetch one page of healing events, newest first, using keyset pagination on (ts, id).
+
+    Parameters:
+    - db_path: Path to the SQLite database file.
+    - after: (ts, id) of the last row of the previous page, or None for the first page.
+    - limit: Maximum number of rows to return.
+
+    Returns:
+    - A list of (id, element_name, failed_locator_type, failed_locator_value,
+      healed_locator_type, healed_locator_value, ts, screenshot_path) tuples.
+    """
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    if after is None:
+        cursor.execute(
+            f"SELECT {REPORT_COLUMNS} FROM healing_events ORDER BY ts DESC, id DESC LIMIT ?",
+            (limit,))
+    else:
+        cursor.execute(
+            f"SELECT {REPORT_COLUMNS} FROM healing_events WHERE (ts, id) < (?, ?) ORDER BY ts DESC, id DESC LIMIT ?",
+            (after[0], after[1], limit))
+    rows = cursor.fetchall()
+    conn.close()
+    return rows
+
+
+def fetch_newer_events(db_path, newer_than):
+    """Fetch the healing events after the (ts, id) key of the newest shown row, newest first."""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(
+        f"SELECT {REPORT_COLUMNS} FROM healing_events WHERE (ts, id) > (?, ?) ORDER BY ts DESC, id DESC",
+        (newer_than[0], newer_than[1])).fetchall()
+    conn.close()
+    return rows
+
+
+class ScreenshotLoaderSignals(QObject):
+    loaded = pyqtSignal(int, int, QImage)
+
+
+class ScreenshotLoader(QRunnable):
+    """
+    Decodes a screenshot off the GUI thread; QImage (unlike QPixmap) is safe to build in a worker.
+
+    The image is emitted with the view generation and event id it was requested for, so a load
+    that finishes after the view was reloaded can be recognised and dropped.
+    """
+
+    def __init__(self, generation, event_id, path):
+        super().__init__()
+        self.generation = generation
+        self.event_id = event_id
+        self.path = path
+        self.signals = ScreenshotLoaderSignals()
+
+    def run(self):
+        image = QImage(self.path)
+        if not image.isNull():
+            image = image.scaled(SCREENSHOT_SIZE, SCREENSHOT_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+            self.signals.loaded.emit(self.generation, self.event_id, image)
+
+
+class HealingReportView(QWidget):
+    """
+    Reports tab: one accordion section per healing event, fetched a page at a time.
+
+    Sections start as empty placeholders; their labels, radio button and screenshot are only
+    built the first time a section is expanded.
+    """
+
+    def __init__(self, db_path="locators.db", parent=None):
+        super().__init__(parent)
+        self.db_path = db_path
+        self.section_rows = []
+        self.section_labels = {}  # event id -> screenshot QLabel, once materialized
+        self.next_page_key = None
+        # Bumped on every reload; screenshot loads from an older generation are ignored
+        self.generation = 0
+        self.thread_pool = QThreadPool.globalInstance()
+
+        layout = QVBoxLayout()
+        self.date_toolbox = QToolBox()
+        self.date_toolbox.currentChanged.connect(self.materialize_section)
+        layout.addWidget(self.date_toolbox)
+
+        self.load_more_button = QPushButton("Load More")
+        self.load_more_button.clicked.connect(self.load_next_page)
+        layout.addWidget(self.load_more_button)
+        self.setLayout(layout)
+
+    def reload(self):
+        """Drops every section and loads the first page again."""
+        self.date_toolbox.blockSignals(True)
+        while self.date_toolbox.count() > 0:
+            widget = self.date_toolbox.widget(0)
+            self.date_toolbox.removeItem(0)
+            widget.deleteLater()
+        self.date_toolbox.blockSignals(False)
+        self.section_rows = []
+        self.section_labels = {}
+        self.next_page_key = None
+        self.generation += 1
+        self.load_next_page()
+
+    def show_new_events(self):
+        """Inserts the events healed since the newest shown one at the top, keeping loaded pages."""
+        if not self.section_rows:
+            self.reload()
+            return
+        newest = self.section_rows[0]
+        rows = fetch_newer_events(self.db_path, (newest[6], newest[0]))
+        if not rows:
+            return
+        # Inserting above the current section shifts its index; it is already built, so no
+        # currentChanged handling is needed
+        self.date_toolbox.blockSignals(True)
+        for index, row in enumerate(rows):
+            self.date_toolbox.insertItem(index, self.placeholder(), self.section_title(row))
+        self.date_toolbox.blockSignals(False)
+        self.section_rows[:0] = rows
+
+    def load_next_page(self):
+        rows = fetch_healed_page(self.db_path, self.next_page_key)
+        if rows:
+            last_row = rows[-1]
+            self.next_page_key = (last_row[6], last_row[0])
+        self.load_more_button.setEnabled(len(rows) == REPORT_PAGE_SIZE)
+
+        for row in rows:
+            self.section_rows.append(row)
+            self.date_toolbox.addItem(self.placeholder(), self.section_title(row))
+
+        # Make sure the initially selected section is built even if the toolbox did not report it
+        if self.date_toolbox.count() and self.date_toolbox.currentIndex() == 0:
+            self.materialize_section(0)
+
+    @staticmethod
+    def placeholder():
+        placeholder = QWidget()
+        placeholder.setLayout(QHBoxLayout())
+        return placeholder
+
+    @staticmethod
+    def section_title(row):
+        healed_datetime = datetime.strptime(row[6], "%Y-%m-%d %H:%M:%S")
+        return healed_datetime.strftime("%d %b %Y %H:%M:%S")
+
+    def materialize_section(self, section):
+        if section < 0:
+            return
+        event_id, _, failed_type, failed_value, healed_type, healed_value, _, screenshot_path = \
+            self.section_rows[section]
+        if event_id in self.section_labels:
+            return
+        tab_content_layout = self.date_toolbox.widget(section).layout()
+
+        # Vertical layout for locators (Failed and Healed) - displayed close together
+        locator_layout = QVBoxLayout()
+        locator_layout.setSpacing(2)
+        locator_layout.addWidget(QLabel(f"Failed Locator: {failed_type} - {failed_value}"))
+        locator_layout.addWidget(QLabel(f"Healed Locator: {healed_type} - {healed_value}"))
+        tab_content_layout.addLayout(locator_layout)
+
+        # Placeholder text until the screenshot has been decoded in the background
+        screenshot_label = QLabel("Screenshot")
+        screenshot_label.setFixedSize(SCREENSHOT_SIZE, SCREENSHOT_SIZE)
+        screenshot_label.setStyleSheet("border: 1px solid black;")
+        screenshot_label.setAlignment(Qt.AlignCenter)
+        tab_content_layout.addWidget(screenshot_label)
+        self.section_labels[event_id] = screenshot_label
+
+        success_healing_radio = QRadioButton("Success Healing")
+        success_healing_radio.setSizePolicy(QSizePolicy.Fixed, QSizePolicy.Fixed)
+        tab_content_layout.addWidget(success_healing_radio, alignment=Qt.AlignCenter)
+
+        if screenshot_path and os.path.exists(screenshot_path):
+            loader = ScreenshotLoader(self.generation, event_id, screenshot_path)
+            loader.signals.loaded.connect(self.show_screenshot)
+            self.thread_pool.start(loader)
+
+    def show_screenshot(self, generation, event_id, image):
+        if generation != self.generation:
+            return
+        label = self.section_labels.get(event_id)
+        if label is not None:
+            label.setPixmap(QPixmap.fromImage(image))
@@ -0,0 +1,104 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from main.Healenium.healing_history import (
+    init_history_db, record_healing_events, get_events_between, get_strategy_stats, compact_history
+)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "locators.db")
+    init_history_db(path)
+    return path
+
+
+def make_event(element_name, ts, strategy="database", latency_ms=10.0):
+    return {
+        "element_name": element_name,
+        "page": "https://example.com/login",
+        "failed_locator_type": "id",
+        "failed_locator_value": "oldLoginBtn",
+        "healed_locator_type": "css",
+        "healed_locator_value": ".login-btn",
+        "strategy": strategy,
+        "latency_ms": latency_ms,
+        "ts": ts,
+    }
+
+
+def test_events_are_appended_not_replaced(db_path):
+    record_healing_events(db_path, [
+        make_event("loginButton", "2024-11-01 10:00:00"),
+        make_event("loginButton", "2024-11-01 10:05:00"),
+    ])
+    events = get_events_between(db_path, "2024-11-01 00:00:00", "2024-11-02 00:00:00")
+    assert [event["ts"] for event in events] == ["2024-11-01 10:05:00", "2024-11-01 10:00:00"]
+    assert events[0]["failed_locator_value"] == "oldLoginBtn"
+    assert events[0]["healed_locator_value"] == ".login-btn"
+
+
+def test_time_window_and_element_filter(db_path):
+    record_healing_events(db_path, [
+        make_event("loginButton", "2024-11-01 10:00:00"),
+        make_event("searchBox", "2024-11-01 11:00:00"),
+        make_event("loginButton", "2024-11-02 10:00:00"),
+    ])
+    events = get_events_between(db_path, datetime(2024, 11, 1), datetime(2024, 11, 2), element_name="loginButton")
+    assert len(events) == 1
+    assert events[0]["ts"] == "2024-11-01 10:00:00"
+
+
+def test_window_queries_use_indexes(db_path):
+    conn = sqlite3.connect(db_path)
+    plan = " ".join(row[-1] for row in conn.execute(
+        "EXPLAIN QUERY PLAN SELECT strategy, COUNT(*) FROM healing_events "
+        "WHERE ts >= '2024-11-01' AND ts < '2024-11-02' GROUP BY strategy"))
+    conn.close()
+    assert "COVERING INDEX idx_healing_events_ts" in plan
+
+
+def test_strategy_stats(db_path):
+    record_healing_events(db_path, [
+        make_event("loginButton", "2024-11-01 10:00:00", "database", 10.0),
+        make_event("searchBox", "2024-11-01 10:01:00", "database", 30.0),
+        make_event("footerLink", "2024-11-01 10:02:00", "dynamic", 200.0),
+    ])
+    stats = get_strategy_stats(db_path, "2024-11-01 00:00:00", "2024-11-02 00:00:00")
+    assert stats["database"]["heals"] == 2
+    assert stats["database"]["avg_latency_ms"] == pytest.approx(20.0)
+    assert stats["dynamic"]["max_latency_ms"] == pytest.approx(200.0)
+
+
+def test_compaction_rolls_up_expired_events(db_path):
+    record_healing_events(db_path, [
+        make_event("loginButton", "2024-10-01 10:00:00", latency_ms=10.0),
+        make_event("loginButton", "2024-10-01 12:00:00", latency_ms=30.0),
+        make_event("loginButton", "2024-11-01 10:00:00"),
+    ])
+    removed = compact_history(db_path, retention_days=7, now=datetime(2024, 11, 2))
+    assert removed == 2
+
+    conn = sqlite3.connect(db_path)
+    remaining = conn.execute("SELECT COUNT(*) FROM healing_events").fetchone()[0]
+    rollup = conn.execute("SELECT day, element_name, heals, total_latency_ms FROM healing_events_daily").fetchall()
+    conn.close()
+    assert remaining == 1
+    assert rollup == [("2024-10-01", "loginButton", 2, 40.0)]
+
+
+def test_existing_history_gains_screenshot_column(tmp_path):
+    path = str(tmp_path / "locators.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE healing_events (id INTEGER PRIMARY KEY AUTOINCREMENT, element_name TEXT NOT NULL, "
+                 "page TEXT, failed_locator_type TEXT, failed_locator_value TEXT, healed_locator_type TEXT, "
+                 "healed_locator_value TEXT, strategy TEXT, latency_ms REAL, ts TEXT NOT NULL)")
+    conn.close()
+    init_history_db(path)
+    init_history_db(path)
+    record_healing_events(path, [dict(make_event("loginButton", "2024-11-01 10:00:00"),
+                                      screenshot_path="screenshots/ab/ab12.png")])
+    events = get_events_between(path, "2024-11-01 00:00:00", "2024-11-02 00:00:00")
+    assert events[0]["screenshot_path"] == "screenshots/ab/ab12.png"
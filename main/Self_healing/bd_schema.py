@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime
+from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, Index
 from sqlalchemy.ext.declarative import declarative_base
 from datetime import datetime
 
@@ -18,6 +18,12 @@ class Selector(Base):
     selector_type = Column(String)  # CSS, XPath, etc.
     confidence_score = Column(Float)
 
+    __table_args__ = (
+        # Filter by page/element, paginate by id
+        Index('ix_selectors_page_element_id', 'page_name', 'element_name', 'id'),
+        Index('ix_selectors_element_id', 'element_name', 'id'),
+    )
+
 
 class HealingReport(Base):
     __tablename__ = 'healing_reports'
@@ -31,4 +37,12 @@ class HealingReport(Base):
     healing_score = Column(Float)
     screenshot_path = Column(String)
     status = Column(String)
-    execution_time = Column(Float)
\ No newline at end of file
+    execution_time = Column(Float)
+
+    __table_args__ = (
+        # Reports are paginated newest first on (timestamp, id); each filter gets an index with that suffix
+        Index('ix_healing_reports_timestamp_id', 'timestamp', 'id'),
+        Index('ix_healing_reports_page_timestamp', 'page_name', 'timestamp', 'id'),
+        Index('ix_healing_reports_element_timestamp', 'element_name', 'timestamp', 'id'),
+        Index('ix_healing_reports_status_timestamp', 'status', 'timestamp', 'id'),
+    )
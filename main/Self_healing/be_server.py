@@ -1,12 +1,26 @@
-from fastapi import FastAPI, WebSocket
+from fastapi import FastAPI, WebSocket, Request, Query, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy import create_engine, and_, or_
+from sqlalchemy.orm import sessionmaker
+from datetime import datetime
+from typing import Dict, List, Optional
+import asyncio
+import base64
+import binascii
+import hashlib
 import json
+import os
+import time
 
 from starlette.websockets import WebSocketDisconnect
 
-from main.Self_healing.bd_schema import Selector, HealingReport
+from main.Self_healing.bd_schema import Base, Selector, HealingReport
+
+DATABASE_URL = os.environ.get("SELF_HEALING_DB_URL", "sqlite:///self_healing.db")
+engine = create_engine(DATABASE_URL)
+Base.metadata.create_all(engine)
+Session = sessionmaker(bind=engine)
 
 app = FastAPI()
 
@@ -19,18 +33,119 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-client WebSocket settings
+WS_MAX_QUEUE_SIZE = 256       # messages buffered per client before the overflow policy applies
+WS_SEND_TIMEOUT = 5.0         # seconds a single send may take before the client is considered dead
+WS_OVERFLOW_POLICY = "drop_oldest"  # drop_oldest | drop_newest | disconnect
+
+
+class ClientChannel:
+    """Outgoing queue, sender task and send statistics for one WebSocket client."""
+
+    def __init__(self, websocket: WebSocket, max_queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self.sender_task: Optional[asyncio.Task] = None
+        self.sent = 0
+        self.dropped = 0
+        self.total_send_latency = 0.0
+        self.max_send_latency = 0.0
+
+    def metrics(self) -> Dict:
+        return {
+            "client": f"{self.websocket.client.host}:{self.websocket.client.port}" if self.websocket.client else None,
+            "queue_depth": self.queue.qsize(),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "avg_send_latency_ms": (self.total_send_latency / self.sent * 1000) if self.sent else 0.0,
+            "max_send_latency_ms": self.max_send_latency * 1000,
+        }
+
+
 # WebSocket connection manager
+# broadcast() only enqueues; every client has its own sender task, so a slow or dead client
+# never delays the others.
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    def __init__(self, max_queue_size: int = WS_MAX_QUEUE_SIZE, send_timeout: float = WS_SEND_TIMEOUT,
+                 overflow_policy: str = WS_OVERFLOW_POLICY):
+        if overflow_policy not in ("drop_oldest", "drop_newest", "disconnect"):
+            raise ValueError(f"Unknown overflow policy: {overflow_policy}")
+        self.max_queue_size = max_queue_size
+        self.send_timeout = send_timeout
+        self.overflow_policy = overflow_policy
+        self.channels: Dict[WebSocket, ClientChannel] = {}
+        self.disconnected = 0
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.channels)
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        channel = ClientChannel(websocket, self.max_queue_size)
+        channel.sender_task = asyncio.create_task(self._sender(channel))
+        self.channels[websocket] = channel
+
+    def disconnect(self, websocket: WebSocket):
+        channel = self.channels.pop(websocket, None)
+        if channel is None:
+            return
+        self.disconnected += 1
+        if channel.sender_task and channel.sender_task is not asyncio.current_task():
+            channel.sender_task.cancel()
 
     async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+        for websocket, channel in list(self.channels.items()):
+            try:
+                channel.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._handle_overflow(websocket, channel, message)
+
+    def _handle_overflow(self, websocket: WebSocket, channel: ClientChannel, message: str):
+        if self.overflow_policy == "drop_oldest":
+            channel.queue.get_nowait()
+            channel.queue.put_nowait(message)
+            channel.dropped += 1
+        elif self.overflow_policy == "drop_newest":
+            channel.dropped += 1
+        else:
+            # Slow consumer: cut it loose rather than buffer without bound
+            self.disconnect(websocket)
+            asyncio.create_task(self._close(websocket))
+
+    async def _sender(self, channel: ClientChannel):
+        while True:
+            message = await channel.queue.get()
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(channel.websocket.send_text(message), self.send_timeout)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Dead or stuck socket: drop it and stop sending
+                self.disconnect(channel.websocket)
+                return
+            latency = time.perf_counter() - started
+            channel.sent += 1
+            channel.total_send_latency += latency
+            channel.max_send_latency = max(channel.max_send_latency, latency)
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
+    def metrics(self) -> Dict:
+        clients = [channel.metrics() for channel in self.channels.values()]
+        return {
+            "connections": len(clients),
+            "disconnected": self.disconnected,
+            "overflow_policy": self.overflow_policy,
+            "total_queue_depth": sum(client["queue_depth"] for client in clients),
+            "total_dropped": sum(client["dropped"] for client in clients),
+            "clients": clients,
+        }
 
 manager = ConnectionManager()
 
@@ -43,17 +158,185 @@ async def websocket_endpoint(websocket: WebSocket):
             # Process received data and broadcast updates
             await manager.broadcast(data)
     except WebSocketDisconnect:
-        manager.active_connections.remove(websocket)
+        manager.disconnect(websocket)
+
+@app.get("/api/ws-metrics")
+async def get_ws_metrics():
+    return manager.metrics()
+
+@app.get("/api/healing-metrics")
+def get_healing_metrics():
+    # Written by the Self_healing conftest at the end of every test session
+    path = os.environ.get("HEALING_METRICS_PATH", "healing_metrics.json")
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="No healing metrics recorded yet")
+    with open(path) as f:
+        return json.load(f)
 
 # REST endpoints for initial data load
+# Lists are keyset-paginated (no OFFSET scans) and carry an ETag so dashboards can poll with If-None-Match.
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+EXPORT_BATCH_SIZE = 1000
+
+
+def selector_to_dict(selector: Selector) -> Dict:
+    return {
+        "id": selector.id,
+        "page_name": selector.page_name,
+        "element_name": selector.element_name,
+        "original_selector": selector.original_selector,
+        "current_selector": selector.current_selector,
+        "healing_enabled": selector.healing_enabled,
+        "last_updated": selector.last_updated.isoformat() if selector.last_updated else None,
+        "selector_type": selector.selector_type,
+        "confidence_score": selector.confidence_score,
+    }
+
+
+def report_to_dict(report: HealingReport) -> Dict:
+    return {
+        "id": report.id,
+        "timestamp": report.timestamp.isoformat() if report.timestamp else None,
+        "page_name": report.page_name,
+        "element_name": report.element_name,
+        "failed_selector": report.failed_selector,
+        "healed_selector": report.healed_selector,
+        "healing_score": report.healing_score,
+        "screenshot_path": report.screenshot_path,
+        "status": report.status,
+        "execution_time": report.execution_time,
+    }
+
+
+def encode_cursor(values: Dict) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def decode_cursor(cursor: str, *fields: str) -> Dict:
+    """Cursor values, or a 400 unless it has every field: an integer "id", an ISO "timestamp" (parsed) or null."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, dict) or any(field not in values for field in fields):
+            raise ValueError("missing cursor fields")
+        if "id" in fields and (not isinstance(values["id"], int) or isinstance(values["id"], bool)):
+            raise ValueError("cursor id is not an integer")
+        if "timestamp" in fields and values["timestamp"] is not None:
+            values["timestamp"] = datetime.fromisoformat(values["timestamp"])
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def paged_response(request: Request, items: List[Dict], next_cursor: Optional[str]):
+    """Builds the JSON page, or a 304 when the client already has this exact page."""
+    body = json.dumps({"items": items, "next_cursor": next_cursor}, sort_keys=True)
+    etag = '"' + hashlib.sha1(body.encode()).hexdigest() + '"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+def filter_selectors(query, page_name: Optional[str], element_name: Optional[str]):
+    if page_name is not None:
+        query = query.filter(Selector.page_name == page_name)
+    if element_name is not None:
+        query = query.filter(Selector.element_name == element_name)
+    return query
+
+
+def filter_reports(query, page_name: Optional[str], element_name: Optional[str], status: Optional[str],
+                   since: Optional[datetime], until: Optional[datetime]):
+    if page_name is not None:
+        query = query.filter(HealingReport.page_name == page_name)
+    if element_name is not None:
+        query = query.filter(HealingReport.element_name == element_name)
+    if status is not None:
+        query = query.filter(HealingReport.status == status)
+    if since is not None:
+        query = query.filter(HealingReport.timestamp >= since)
+    if until is not None:
+        query = query.filter(HealingReport.timestamp < until)
+    return query
+
+
+# Newest first; reports without a timestamp come last, so the cursor can still reach them
+REPORT_ORDER = (HealingReport.timestamp.desc().nullslast(), HealingReport.id.desc())
+
+
+def after_report(timestamp: Optional[datetime], report_id: int):
+    """Filter for the reports that follow (timestamp, id) in REPORT_ORDER."""
+    if timestamp is None:
+        return and_(HealingReport.timestamp.is_(None), HealingReport.id < report_id)
+    return or_(
+        HealingReport.timestamp < timestamp,
+        and_(HealingReport.timestamp == timestamp, HealingReport.id < report_id),
+        HealingReport.timestamp.is_(None),
+    )
+
+
+def stream_ndjson(query_factory, to_dict):
+    """Yields one JSON document per row, fetching EXPORT_BATCH_SIZE rows at a time."""
+    with Session() as session:
+        for row in query_factory(session).yield_per(EXPORT_BATCH_SIZE):
+            yield json.dumps(to_dict(row)) + "\n"
+
+
+# Plain (sync) handlers so FastAPI runs the blocking DB work in its thread pool, not on the event loop
 @app.get("/api/selectors")
-async def get_selectors():
+def get_selectors(request: Request,
+                  page_name: Optional[str] = None,
+                  element_name: Optional[str] = None,
+                  cursor: Optional[str] = None,
+                  limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)):
     with Session() as session:
-        selectors = session.query(Selector).all()
-        return selectors
+        query = filter_selectors(session.query(Selector), page_name, element_name)
+        if cursor:
+            query = query.filter(Selector.id > decode_cursor(cursor, "id")["id"])
+        selectors = query.order_by(Selector.id).limit(limit + 1).all()
+
+    next_cursor = encode_cursor({"id": selectors[limit - 1].id}) if len(selectors) > limit else None
+    return paged_response(request, [selector_to_dict(s) for s in selectors[:limit]], next_cursor)
+
+
+@app.get("/api/selectors/export")
+def export_selectors(page_name: Optional[str] = None, element_name: Optional[str] = None):
+    def query_factory(session):
+        return filter_selectors(session.query(Selector), page_name, element_name).order_by(Selector.id)
+    return StreamingResponse(stream_ndjson(query_factory, selector_to_dict), media_type="application/x-ndjson")
+
 
 @app.get("/api/healing-reports")
-async def get_healing_reports():
+def get_healing_reports(request: Request,
+                        page_name: Optional[str] = None,
+                        element_name: Optional[str] = None,
+                        status: Optional[str] = None,
+                        since: Optional[datetime] = None,
+                        until: Optional[datetime] = None,
+                        cursor: Optional[str] = None,
+                        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)):
     with Session() as session:
-        reports = session.query(HealingReport).all()
-        return reports
\ No newline at end of file
+        query = filter_reports(session.query(HealingReport), page_name, element_name, status, since, until)
+        if cursor:
+            position = decode_cursor(cursor, "timestamp", "id")
+            query = query.filter(after_report(position["timestamp"], position["id"]))
+        reports = query.order_by(*REPORT_ORDER).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(reports) > limit:
+        last = reports[limit - 1]
+        next_cursor = encode_cursor({"timestamp": last.timestamp.isoformat() if last.timestamp else None,
+                                     "id": last.id})
+    return paged_response(request, [report_to_dict(r) for r in reports[:limit]], next_cursor)
+
+
+@app.get("/api/healing-reports/export")
+def export_healing_reports(page_name: Optional[str] = None,
+                           element_name: Optional[str] = None,
+                           status: Optional[str] = None,
+                           since: Optional[datetime] = None,
+                           until: Optional[datetime] = None):
+    def query_factory(session):
+        query = filter_reports(session.query(HealingReport), page_name, element_name, status, since, until)
+        return query.order_by(*REPORT_ORDER)
+    return StreamingResponse(stream_ndjson(query_factory, report_to_dict), media_type="application/x-ndjson")
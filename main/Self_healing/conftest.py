@@ -5,21 +5,63 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import NoSuchElementException
 import requests
 import json
-import base64
+import os
+import time
 from datetime import datetime
 
-from main.Self_healing.bd_schema import HealingReport
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from main.Self_healing.bd_schema import Base
+from main.Self_healing.ingestion import HealingIngestor
+from main.Self_healing.screenshot_store import ScreenshotStore
+from main.Self_healing import healing_store_plugin
+from main.Self_healing.healing_metrics import healing_metrics
+
+DATABASE_URL = os.environ.get("SELF_HEALING_DB_URL", "sqlite:///self_healing.db")
+SCREENSHOT_DIR = "./screenshots"
+HEALING_METRICS_PATH = os.environ.get("HEALING_METRICS_PATH", "healing_metrics.json")
+
+
+def pytest_configure(config):
+    # Snapshot/shard/merge handling of the locator DB, safe under pytest-xdist
+    if not config.pluginmanager.has_plugin("healing_store"):
+        config.pluginmanager.register(healing_store_plugin, "healing_store")
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if hasattr(config, "workerinput"):
+        # xdist worker: hand the metrics to the controller
+        config.workeroutput["healing_metrics"] = healing_metrics.snapshot()
+    elif healing_metrics.by_strategy:
+        # Sessions that never healed anything (e.g. unit tests only) leave no file behind
+        healing_metrics.save(HEALING_METRICS_PATH)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    snapshot = getattr(node, "workeroutput", {}).get("healing_metrics")
+    if snapshot:
+        healing_metrics.merge_snapshot(snapshot)
+
+
+def pytest_terminal_summary(terminalreporter):
+    if healing_metrics.by_strategy:
+        terminalreporter.write_line(healing_metrics.report())
 
 
 class SelfHealingDriver:
-    def __init__(self, driver, db_session):
+    def __init__(self, driver, ingestor, locator_store):
         self.driver = driver
-        self.db_session = db_session
-        self.websocket_client = WebSocketClient()
+        self.ingestor = ingestor
+        self.locator_store = locator_store
 
     def find_element(self, by, value):
         try:
-            element = self.driver.find_element(by, value)
+            with healing_metrics.measure("primary", f"{by}={value}") as attempt:
+                element = self.driver.find_element(by, value)
+                attempt.succeeded()
             return element
         except NoSuchElementException:
             healed_element = self.heal_selector(by, value)
@@ -28,43 +70,76 @@ class SelfHealingDriver:
             raise
 
     def heal_selector(self, by, value):
-        # Capture screenshot of the area
-        screenshot = self.driver.get_screenshot_as_base64()
+        heal_started = time.perf_counter()
 
         # Get alternative selectors from database
-        alternative_selectors = self.get_alternative_selectors(by, value)
+        with healing_metrics.measure("store_lookup", f"{by}={value}") as attempt:
+            alternative_selectors = self.get_alternative_selectors(by, value)
+            if alternative_selectors:
+                attempt.succeeded()
 
         for selector in alternative_selectors:
             try:
-                element = self.driver.find_element(selector['type'], selector['value'])
+                with healing_metrics.measure(f"fallback:{selector['type']}", f"{by}={value}") as attempt:
+                    element = self.driver.find_element(selector['type'], selector['value'])
+                    attempt.succeeded()
                 if element:
                     # Record successful healing
-                    self.record_healing(by, value, selector, screenshot)
+                    self.record_healing(by, value, selector, time.perf_counter() - heal_started)
                     return element
             except NoSuchElementException:
                 continue
         return None
 
-    def record_healing(self, original_by, original_value, healed_selector, screenshot):
-        report = HealingReport(
-            page_name=self.driver.current_url,
-            element_name=f"{original_by}={original_value}",
-            failed_selector=f"{original_by}={original_value}",
-            healed_selector=f"{healed_selector['type']}={healed_selector['value']}",
-            healing_score=healed_selector.get('confidence', 0.0),
-            screenshot_path=screenshot,
-            status='success',
-            execution_time=0.0
-        )
-        self.db_session.add(report)
-        self.db_session.commit()
+    def get_alternative_selectors(self, by, value):
+        locator = self.locator_store.get_locator(f"{by}={value}")
+        if not locator:
+            return []
+        # Stored types use underscores (css_selector); Selenium's By values use spaces (css selector)
+        return [{'type': locator_type.replace('_', ' '), 'value': locator_value}
+                for locator_type, locator_value in locator['fallback_locators']]
+
+    def record_healing(self, original_by, original_value, healed_selector, execution_time):
+        # Remember the working selector in this worker's shard; shards are merged at session end
+        fallbacks = [(s['type'].replace(' ', '_'), s['value'])
+                     for s in self.get_alternative_selectors(original_by, original_value) if s != healed_selector]
+        self.locator_store.record_heal(f"{original_by}={original_value}",
+                                       f"{healed_selector['type'].replace(' ', '_')}={healed_selector['value']}",
+                                       fallbacks)
+
+        # The driver is not thread-safe, so the screenshot is grabbed here; hashing, storing and
+        # committing the report happen on the ingestor's worker thread
+        self.ingestor.submit({
+            'page_name': self.driver.current_url,
+            'element_name': f"{original_by}={original_value}",
+            'failed_selector': f"{original_by}={original_value}",
+            'healed_selector': f"{healed_selector['type']}={healed_selector['value']}",
+            'healing_score': healed_selector.get('confidence', 0.0),
+            'status': 'success',
+            'execution_time': execution_time
+        }, self.driver.get_screenshot_as_png())
+
+
+@pytest.fixture(scope="session")
+def healing_ingestor():
+    # Every xdist worker has its own ingestor; a busy timeout lets their batched SQLite commits queue up
+    connect_args = {"timeout": 30} if DATABASE_URL.startswith("sqlite") else {}
+    engine = create_engine(DATABASE_URL, connect_args=connect_args)
+    Base.metadata.create_all(engine)
+    websocket_client = WebSocketClient()
+
+    def broadcast(reports):
+        # Broadcast updates via WebSocket once they are committed
+        for report in reports:
+            websocket_client.send_update(report)
 
-        # Broadcast update via WebSocket
-        self.websocket_client.send_update(report)
+    ingestor = HealingIngestor(sessionmaker(bind=engine), ScreenshotStore(SCREENSHOT_DIR), on_committed=broadcast)
+    yield ingestor
+    ingestor.close()
 
 
 @pytest.fixture
-def self_healing_driver(selenium):
-    driver = SelfHealingDriver(selenium)
+def self_healing_driver(selenium, healing_ingestor, healing_store):
+    driver = SelfHealingDriver(selenium, healing_ingestor, healing_store)
     yield driver
     driver.quit()
\ No newline at end of file
@@ -0,0 +1,166 @@
+# healing_metrics.py
+"""
+Timers and counters for healing strategies.
+
+Every strategy attempt (primary locator, database lookup, fallback, dynamic search, ...) is timed
+with perf_counter and recorded per strategy and per (strategy, element) as attempts, successes
+and a latency histogram. Used by Healenium's heal_locator, LocatorManager.find_element and
+SelfHealingDriver.heal_selector.
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, float("inf"))
+
+
+class StrategyStats:
+    def __init__(self):
+        self.attempts = 0
+        self.successes = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS_MS)
+
+    def record(self, latency_ms: float, success: bool):
+        self.attempts += 1
+        self.successes += int(success)
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+        for i, bound in enumerate(LATENCY_BUCKETS_MS):
+            if latency_ms <= bound:
+                self.buckets[i] += 1
+                break
+
+    def merge(self, data: Dict):
+        self.attempts += data["attempts"]
+        self.successes += data["successes"]
+        self.total_ms += data["total_ms"]
+        self.max_ms = max(self.max_ms, data["max_ms"])
+        self.buckets = [a + b for a, b in zip(self.buckets, data["buckets"])]
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given fraction of attempts (histogram estimate)."""
+        if not self.attempts:
+            return 0.0
+        threshold = fraction * self.attempts
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= threshold:
+                return self.max_ms if bound == float("inf") else min(bound, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> Dict:
+        return {
+            "attempts": self.attempts,
+            "successes": self.successes,
+            "success_rate": self.successes / self.attempts if self.attempts else 0.0,
+            "total_ms": self.total_ms,
+            "avg_ms": self.total_ms / self.attempts if self.attempts else 0.0,
+            "max_ms": self.max_ms,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "buckets": list(self.buckets),
+        }
+
+
+class Attempt:
+    """Handle yielded by HealingMetrics.measure(); call succeeded() once the strategy found the element."""
+
+    def __init__(self):
+        self.success = False
+
+    def succeeded(self):
+        self.success = True
+
+
+class HealingMetrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.by_strategy: Dict[str, StrategyStats] = {}
+        self.by_element: Dict[str, Dict[str, StrategyStats]] = {}
+
+    @contextmanager
+    def measure(self, strategy: str, element_name: Optional[str] = None):
+        """
+        Time one strategy attempt.
+
+            with healing_metrics.measure("database", "loginButton") as attempt:
+                element = driver.find_element(...)
+                attempt.succeeded()
+
+        An exception escaping the block counts as a failed attempt and is re-raised.
+        """
+        attempt = Attempt()
+        started = time.perf_counter()
+        try:
+            yield attempt
+        finally:
+            self.record(strategy, element_name, (time.perf_counter() - started) * 1000, attempt.success)
+
+    def record(self, strategy: str, element_name: Optional[str], latency_ms: float, success: bool):
+        with self.lock:
+            self.by_strategy.setdefault(strategy, StrategyStats()).record(latency_ms, success)
+            if element_name is not None:
+                element_stats = self.by_element.setdefault(element_name, {})
+                element_stats.setdefault(strategy, StrategyStats()).record(latency_ms, success)
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            return {
+                "buckets_ms": [str(bound) for bound in LATENCY_BUCKETS_MS],
+                "strategies": {name: stats.to_dict() for name, stats in self.by_strategy.items()},
+                "elements": {
+                    element: {name: stats.to_dict() for name, stats in strategies.items()}
+                    for element, strategies in self.by_element.items()
+                },
+            }
+
+    def merge_snapshot(self, snapshot: Dict):
+        """Add another process's snapshot (e.g. an xdist worker) into these metrics."""
+        with self.lock:
+            for name, data in snapshot["strategies"].items():
+                self.by_strategy.setdefault(name, StrategyStats()).merge(data)
+            for element, strategies in snapshot["elements"].items():
+                element_stats = self.by_element.setdefault(element, {})
+                for name, data in strategies.items():
+                    element_stats.setdefault(name, StrategyStats()).merge(data)
+
+    def reset(self):
+        with self.lock:
+            self.by_strategy.clear()
+            self.by_element.clear()
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=2)
+
+    def report(self, top_elements: int = 10) -> str:
+        """Plain-text summary: per-strategy table, then the elements that cost the most time."""
+        snapshot = self.snapshot()
+        lines = [
+            "Healing strategy metrics",
+            f"{'strategy':<20}{'attempts':>10}{'success':>10}{'avg ms':>10}{'p95 ms':>10}{'total ms':>12}",
+        ]
+        for name, data in sorted(snapshot["strategies"].items(), key=lambda item: -item[1]["total_ms"]):
+            lines.append(f"{name:<20}{data['attempts']:>10}{data['successes']:>10}"
+                         f"{data['avg_ms']:>10.1f}{data['p95_ms']:>10.1f}{data['total_ms']:>12.1f}")
+
+        element_totals = sorted(
+            ((element, sum(data["total_ms"] for data in strategies.values()))
+             for element, strategies in snapshot["elements"].items()),
+            key=lambda item: -item[1])[:top_elements]
+        if element_totals:
+            lines.append("")
+            lines.append(f"Slowest elements (top {len(element_totals)})")
+            for element, total_ms in element_totals:
+                lines.append(f"  {element:<40}{total_ms:>12.1f} ms")
+        return "\n".join(lines)
+
+
+# Process-wide metrics shared by all healing code paths
+healing_metrics = HealingMetrics()
@@ -0,0 +1,126 @@
+# healing_store_plugin.py
+"""
+pytest plugin giving every (xdist) worker its own healing store.
+
+- At session start the controller snapshots the shared locators DB into a run directory.
+- Workers read locators from that snapshot (read-only, no locking) and write heals to their
+  own shard file, so no two processes ever write the same SQLite file.
+- At session end the controller merges all shards into the shared DB, latest heal winning.
+
+All three files use the unified locator schema from locator_store.py.
+
+Without xdist the single process is both controller and worker.
+"""
+import os
+import shutil
+import sqlite3
+import tempfile
+from datetime import datetime
+
+import pytest
+
+from main.Self_healing.locator_store import (
+    LocatorStore, TIMESTAMP_FORMAT, bulk_write, connect, get_locator, split_locator
+)
+
+HEALING_DB_PATH = os.environ.get("HEALING_DB_PATH", "locators.db")
+
+
+class ShardedLocatorStore:
+    """
+    Per-worker view of the locator DB.
+
+    Lookups check this worker's own heals first, then the session-start snapshot.
+    get_locator() returns the same shape as DBManager.get_locator().
+    """
+
+    def __init__(self, snapshot_path: str, shard_path: str):
+        self.snapshot = sqlite3.connect(f"file:{snapshot_path}?mode=ro&immutable=1", uri=True)
+        self.shard = LocatorStore(shard_path)
+
+    def get_locator(self, element_name):
+        row = self.shard.get(element_name) or get_locator(self.snapshot, element_name)
+        if row is None:
+            return None
+        return {"primary_locator": f"{row['locator_type']}={row['locator_value']}",
+                "fallback_locators": row["fallbacks"]}
+
+    def record_heal(self, element_name, primary_locator, fallback_locators):
+        locator_type, locator_value = split_locator(primary_locator)
+        self.shard.put(element_name, locator_type, locator_value, fallback_locators,
+                       last_healed=datetime.utcnow().strftime(TIMESTAMP_FORMAT))
+
+    def close(self):
+        self.snapshot.close()
+        self.shard.close()
+
+
+def take_snapshot(db_path: str, snapshot_path: str):
+    """Consistent copy of the shared DB via the SQLite backup API (safe even if another process is writing)."""
+    target = sqlite3.connect(snapshot_path)
+    if os.path.exists(db_path):
+        source = sqlite3.connect(db_path)
+        source.backup(target)
+        source.close()
+    target.close()
+    # Workers open the snapshot read-only, so bring it onto the unified schema now
+    connect(snapshot_path).close()
+
+
+def merge_shards(run_dir: str, db_path: str) -> int:
+    """Fold every shard in run_dir into db_path in one transaction. Returns the number of rows merged."""
+    rows = []
+    for name in sorted(os.listdir(run_dir)):
+        if not (name.startswith("shard_") and name.endswith(".db")):
+            continue
+        shard = LocatorStore(os.path.join(run_dir, name))
+        rows.extend(shard.export_rows())
+        shard.close()
+    if not rows:
+        return 0
+
+    # Apply oldest first so the most recent heal of an element wins
+    rows.sort(key=lambda row: row[4] or "")
+    conn = connect(db_path)
+    bulk_write(conn, rows)
+    conn.close()
+    return len(rows)
+
+
+def _is_worker(config):
+    return hasattr(config, "workerinput")
+
+
+def pytest_configure(config):
+    if _is_worker(config):
+        config.healing_run_dir = config.workerinput["healing_run_dir"]
+        return
+    config.healing_run_dir = tempfile.mkdtemp(prefix="healing_store_")
+    take_snapshot(HEALING_DB_PATH, os.path.join(config.healing_run_dir, "snapshot.db"))
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    # xdist controller: tell each worker where the snapshot and shards live
+    node.workerinput["healing_run_dir"] = node.config.healing_run_dir
+
+
+def pytest_sessionfinish(session):
+    config = session.config
+    if _is_worker(config) or not hasattr(config, "healing_run_dir"):
+        return
+    merged = merge_shards(config.healing_run_dir, HEALING_DB_PATH)
+    shutil.rmtree(config.healing_run_dir, ignore_errors=True)
+    if merged:
+        print(f"\nHealing store: merged {merged} healed locators into {HEALING_DB_PATH}")
+
+
+@pytest.fixture(scope="session")
+def healing_store(request):
+    config = request.config
+    worker_id = config.workerinput["workerid"] if _is_worker(config) else "main"
+    store = ShardedLocatorStore(
+        os.path.join(config.healing_run_dir, "snapshot.db"),
+        os.path.join(config.healing_run_dir, f"shard_{worker_id}.db"))
+    yield store
+    store.close()
@@ -0,0 +1,106 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from main.Self_healing.bd_schema import HealingReport
+from main.Self_healing.screenshot_store import ScreenshotStore
+
+# Reports are committed when this many are pending or FLUSH_INTERVAL seconds have passed
+BATCH_SIZE = 50
+FLUSH_INTERVAL = 1.0
+
+
+class HealingIngestor:
+    """
+    Background pipeline for healing reports.
+
+    The test thread only calls submit(); hashing and writing screenshots, building
+    HealingReport rows and committing them in batches all happen on one worker thread
+    with its own DB session.
+
+    A report that cannot be stored is recorded in errors and skipped; the worker keeps
+    going, so one bad report never loses the reports queued after it.
+    """
+
+    def __init__(self, session_factory, screenshot_store: ScreenshotStore,
+                 on_committed: Optional[Callable[[List[HealingReport]], None]] = None,
+                 batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL):
+        self.session_factory = session_factory
+        self.screenshot_store = screenshot_store
+        self.on_committed = on_committed
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue: queue.Queue = queue.Queue()
+        self.committed = 0
+        self.errors: List[str] = []
+        self.worker = threading.Thread(target=self._run, name="healing-ingestor", daemon=True)
+        self.worker.start()
+
+    def submit(self, report_fields: Dict, screenshot_png: Optional[bytes] = None):
+        """Queue one report (HealingReport column values) and its raw PNG screenshot."""
+        self.queue.put((report_fields, screenshot_png))
+
+    def close(self, timeout: Optional[float] = None):
+        """Flush everything still queued and stop the worker."""
+        self.queue.put(None)
+        self.worker.join(timeout)
+
+    def _run(self):
+        session = self.session_factory()
+        pending = []
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+        try:
+            while not stopping:
+                try:
+                    item = self.queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    item = ()
+                if item is None:
+                    stopping = True
+                elif item:
+                    try:
+                        pending.append(self._build_report(*item))
+                    except Exception as e:
+                        self.errors.append(str(e))
+
+                if pending and (stopping or len(pending) >= self.batch_size or time.monotonic() >= deadline):
+                    self._commit(session, pending)
+                    pending = []
+                if time.monotonic() >= deadline:
+                    deadline = time.monotonic() + self.flush_interval
+        finally:
+            session.close()
+
+    def _build_report(self, report_fields: Dict, screenshot_png: Optional[bytes]) -> HealingReport:
+        if screenshot_png:
+            report_fields = dict(report_fields, screenshot_path=self.screenshot_store.put(screenshot_png))
+        return HealingReport(**report_fields)
+
+    def _commit(self, session, reports: List[HealingReport]):
+        try:
+            session.add_all(reports)
+            session.commit()
+        except Exception:
+            session.rollback()
+            # Find the bad rows: commit the batch one report at a time
+            reports = [report for report in reports if self._commit_one(session, report)]
+            if not reports:
+                return
+        self.committed += len(reports)
+        if self.on_committed:
+            try:
+                self.on_committed(reports)
+            except Exception as e:
+                self.errors.append(str(e))
+
+    def _commit_one(self, session, report: HealingReport) -> bool:
+        try:
+            session.add(report)
+            session.commit()
+            return True
+        except Exception as e:
+            session.rollback()
+            self.errors.append(str(e))
+            return False
@@ -0,0 +1,410 @@
+# locator_store.py
+"""
+Single locator schema shared by every healing module (Healenium, LocatorManager/DBManager,
+the pytest healing store).
+
+- element_locators: one row per (page, element_name) with the current locator.
+- locator_fallbacks: ordered fallback locators of an element (child table, no JSON blobs).
+
+Locator types use the LocatorManager names (id, name, css_selector, xpath, class_name, link_text,
+partial_link_text, tag_name). Opening a database migrates any of the legacy shapes it holds:
+
+- Healenium `locators` (element_name, locator_type, locator_value, last_healed)
+- LocatorManager/DBManager `locators` (element_name, primary_locator "by=value", fallback_locators JSON)
+- SQLAlchemy `selectors` (bd_schema.Selector)
+
+Each process checks the schema and migrates a database file once, the first time it is opened;
+get_locator_store() also keeps one open connection per database file and thread for callers that
+look up or record locators one at a time.
+
+Bulk import/export (CSV, one locator per line, fallbacks as a JSON column):
+    python -m main.Self_healing.locator_store import locators.db library.csv
+    python -m main.Self_healing.locator_store export locators.db library.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_PAGE = ""
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Rows per executemany batch during bulk import
+BULK_BATCH_SIZE = 5000
+
+EXPORT_COLUMNS = ("page", "element_name", "locator_type", "locator_value", "last_healed", "fallbacks")
+
+SCHEMA = """
+    CREATE TABLE IF NOT EXISTS element_locators (
+        id INTEGER PRIMARY KEY,
+        page TEXT NOT NULL DEFAULT '',
+        element_name TEXT NOT NULL,
+        locator_type TEXT NOT NULL,
+        locator_value TEXT NOT NULL,
+        last_healed TEXT,
+        UNIQUE (page, element_name)
+    );
+    -- Element lookups across pages
+    CREATE INDEX IF NOT EXISTS idx_element_locators_element ON element_locators (element_name, page);
+    -- "Recently healed" views
+    CREATE INDEX IF NOT EXISTS idx_element_locators_last_healed ON element_locators (last_healed);
+    CREATE TABLE IF NOT EXISTS locator_fallbacks (
+        locator_id INTEGER NOT NULL REFERENCES element_locators (id) ON DELETE CASCADE,
+        position INTEGER NOT NULL,
+        locator_type TEXT NOT NULL,
+        locator_value TEXT NOT NULL,
+        PRIMARY KEY (locator_id, position)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS locator_migrations (
+        source TEXT PRIMARY KEY,
+        rows INTEGER NOT NULL,
+        migrated_at TEXT NOT NULL
+    );
+"""
+
+# Healenium, Selenium By values and bd_schema selector_type spellings -> LocatorManager names
+LOCATOR_TYPE_ALIASES = {
+    "css": "css_selector",
+    "css selector": "css_selector",
+    "class name": "class_name",
+    "link text": "link_text",
+    "partial link text": "partial_link_text",
+    "tag name": "tag_name",
+}
+
+UPSERT_LOCATOR = """
+    INSERT INTO element_locators (page, element_name, locator_type, locator_value, last_healed)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (page, element_name) DO UPDATE SET
+        locator_type = excluded.locator_type,
+        locator_value = excluded.locator_value,
+        -- A write without a heal time keeps the one stored
+        last_healed = COALESCE(excluded.last_healed, element_locators.last_healed)
+"""
+INSERT_LOCATOR = """
+    INSERT INTO element_locators (page, element_name, locator_type, locator_value, last_healed)
+    VALUES (?, ?, ?, ?, ?)
+"""
+DELETE_FALLBACKS = """
+    DELETE FROM locator_fallbacks
+    WHERE locator_id = (SELECT id FROM element_locators WHERE page = ? AND element_name = ?)
+"""
+INSERT_FALLBACK = """
+    INSERT INTO locator_fallbacks (locator_id, position, locator_type, locator_value)
+    SELECT id, ?, ?, ? FROM element_locators WHERE page = ? AND element_name = ?
+"""
+
+
+def normalize_locator_type(locator_type: str) -> str:
+    locator_type = locator_type.strip().lower()
+    return LOCATOR_TYPE_ALIASES.get(locator_type, locator_type)
+
+
+def split_locator(locator: str) -> Tuple[str, str]:
+    """'css_selector=#email' -> ('css_selector', '#email')"""
+    locator_type, locator_value = locator.split("=", 1)
+    return normalize_locator_type(locator_type), locator_value
+
+
+# (path, inode) of the database files this process has already prepared; a replaced file is prepared again
+_prepared = set()
+_prepared_lock = threading.Lock()
+
+
+def _file_key(db_path: str) -> Optional[Tuple[str, int]]:
+    if db_path == ":memory:" or not os.path.exists(db_path):
+        return None
+    return os.path.realpath(db_path), os.stat(db_path).st_ino
+
+
+def connect(db_path: str = "locators.db", timeout: float = 30) -> sqlite3.Connection:
+    """Open db_path with the unified schema in place and any legacy locator tables migrated."""
+    conn = sqlite3.connect(db_path, timeout=timeout)
+    conn.execute("PRAGMA foreign_keys = ON")
+    with _prepared_lock:
+        key = _file_key(db_path)
+        if key is None or key not in _prepared:
+            ensure_schema(conn)
+            migrate_legacy(conn)
+            key = _file_key(db_path)
+            if key is not None:
+                _prepared.add(key)
+    return conn
+
+
+def ensure_schema(conn: sqlite3.Connection):
+    conn.executescript(SCHEMA)
+
+
+def _columns(conn, table) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _fallback_pairs(fallback_locators) -> List[Tuple[str, str]]:
+    if not fallback_locators:
+        return []
+    if isinstance(fallback_locators, str):
+        fallback_locators = json.loads(fallback_locators)
+    return [(normalize_locator_type(locator_type), locator_value) for locator_type, locator_value in fallback_locators]
+
+
+def _write_batch(conn, batch):
+    """Upsert a batch of (page, element_name, locator_type, locator_value, last_healed, fallbacks|None)."""
+    conn.executemany(UPSERT_LOCATOR, [row[:5] for row in batch])
+    # fallbacks=None leaves an element's stored fallbacks alone; a list (even empty) replaces them.
+    # When a batch holds the same element twice, its last list wins.
+    replaced = list({(row[0], row[1]): row for row in batch if row[5] is not None}.values())
+    conn.executemany(DELETE_FALLBACKS, [(row[0], row[1]) for row in replaced])
+    conn.executemany(INSERT_FALLBACK, [
+        (position, locator_type, locator_value, row[0], row[1])
+        for row in replaced
+        for position, (locator_type, locator_value) in enumerate(row[5])
+    ])
+
+
+def _legacy_rows(conn, table):
+    columns = _columns(conn, table)
+    if "locator_type" in columns:
+        # Healenium: element_name, locator_type, locator_value, last_healed
+        for element_name, locator_type, locator_value, last_healed in conn.execute(
+                f"SELECT element_name, locator_type, locator_value, last_healed FROM {table}"):
+            yield DEFAULT_PAGE, element_name, normalize_locator_type(locator_type), locator_value, last_healed, None
+    elif "primary_locator" in columns:
+        # LocatorManager/DBManager: element_name, "by=value", JSON list of [by, value]
+        for element_name, primary_locator, fallback_locators in conn.execute(
+                f"SELECT element_name, primary_locator, fallback_locators FROM {table}"):
+            locator_type, locator_value = split_locator(primary_locator)
+            yield (DEFAULT_PAGE, element_name, locator_type, locator_value, None,
+                   _fallback_pairs(fallback_locators))
+
+
+def _selector_rows(conn):
+    # bd_schema.Selector may hold several rows per element; oldest first so the latest one wins
+    for page_name, element_name, selector_type, current_selector, original_selector, last_updated in conn.execute(
+            "SELECT page_name, element_name, selector_type, current_selector, original_selector, last_updated "
+            "FROM selectors ORDER BY last_updated, id"):
+        locator_type = normalize_locator_type(selector_type or "css_selector")
+        fallbacks = [(locator_type, original_selector)] if original_selector and original_selector != current_selector else []
+        last_healed = str(last_updated)[:19] if last_updated else None
+        yield page_name or DEFAULT_PAGE, element_name, locator_type, current_selector, last_healed, fallbacks
+
+
+def migrate_legacy(conn: sqlite3.Connection) -> int:
+    """
+    Copy legacy locator tables into the unified schema.
+
+    A legacy `locators` table is renamed to legacy_locators afterwards (kept as a backup, and so older
+    code cannot keep writing to it unnoticed). `selectors` still backs the dashboard API, so it is
+    imported once and left in place.
+
+    Returns:
+    - The number of locators migrated.
+    """
+    # Take the write lock before looking, so two processes opening the same file never both migrate it
+    conn.execute("BEGIN IMMEDIATE")
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    migrated = 0
+    with conn:
+        if "locators" in tables:
+            migrated += bulk_write(conn, _legacy_rows(conn, "locators"), commit=False)
+            legacy_name = "legacy_locators"
+            while legacy_name in tables:
+                legacy_name += "_old"
+            conn.execute(f"ALTER TABLE locators RENAME TO {legacy_name}")
+            _record_migration(conn, "locators", migrated)
+        done = {row[0] for row in conn.execute("SELECT source FROM locator_migrations")}
+        if "selectors" in tables and "selectors" not in done:
+            count = bulk_write(conn, _selector_rows(conn), commit=False)
+            _record_migration(conn, "selectors", count)
+            migrated += count
+    return migrated
+
+
+def _record_migration(conn, source, rows):
+    conn.execute("INSERT OR REPLACE INTO locator_migrations (source, rows, migrated_at) VALUES (?, ?, ?)",
+                 (source, rows, datetime.utcnow().strftime(TIMESTAMP_FORMAT)))
+
+
+def bulk_write(conn: sqlite3.Connection, rows: Iterable[Tuple], batch_size: int = BULK_BATCH_SIZE,
+               commit: bool = True) -> int:
+    """
+    Upsert many locators in batches inside one transaction.
+
+    Parameters:
+    - rows: Iterable of (page, element_name, locator_type, locator_value, last_healed, fallbacks), where
+      fallbacks is a list of (locator_type, locator_value) or None to keep the stored fallbacks.
+    - commit: False when the caller already holds a transaction.
+
+    Returns:
+    - The number of locators written.
+    """
+    rows = iter(rows)
+    written = 0
+    try:
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            _write_batch(conn, batch)
+            written += len(batch)
+    except Exception:
+        if commit:
+            conn.rollback()
+        raise
+    if commit:
+        conn.commit()
+    return written
+
+
+def get_locator(conn: sqlite3.Connection, element_name: str, page: str = DEFAULT_PAGE) -> Optional[Dict]:
+    """Read-only lookup on any connection to the unified schema (see LocatorStore.get)."""
+    row = conn.execute(
+        "SELECT id, locator_type, locator_value, last_healed FROM element_locators "
+        "WHERE page = ? AND element_name = ?", (page, element_name)).fetchone()
+    if row is None:
+        return None
+    fallbacks = conn.execute(
+        "SELECT locator_type, locator_value FROM locator_fallbacks WHERE locator_id = ? ORDER BY position",
+        (row[0],)).fetchall()
+    return {"locator_type": row[1], "locator_value": row[2], "last_healed": row[3], "fallbacks": fallbacks}
+
+
+class LocatorStore:
+    """Access to the unified locator tables; one connection per instance."""
+
+    def __init__(self, db_path: str = "locators.db"):
+        self.db_path = db_path
+        self.conn = connect(db_path)
+
+    def get(self, element_name: str, page: str = DEFAULT_PAGE) -> Optional[Dict]:
+        """
+        Returns:
+        - {"locator_type", "locator_value", "last_healed", "fallbacks": [(type, value), ...]}, or None.
+        """
+        return get_locator(self.conn, element_name, page)
+
+    def create(self, element_name: str, locator_type: str, locator_value: str, fallbacks=(),
+               page: str = DEFAULT_PAGE, last_healed: Optional[str] = None):
+        """Insert a new element; raises sqlite3.IntegrityError if it is already stored."""
+        with self.conn:
+            self.conn.execute(INSERT_LOCATOR, (page, element_name, normalize_locator_type(locator_type),
+                                               locator_value, last_healed))
+            self.conn.executemany(INSERT_FALLBACK, [
+                (position, locator_type, locator_value, page, element_name)
+                for position, (locator_type, locator_value) in enumerate(_fallback_pairs(fallbacks))])
+
+    def put(self, element_name: str, locator_type: str, locator_value: str, fallbacks=None,
+            page: str = DEFAULT_PAGE, last_healed: Optional[str] = None):
+        """Insert or update an element's locator; fallbacks=None keeps the stored fallbacks and
+        last_healed=None the stored heal time."""
+        fallbacks = None if fallbacks is None else _fallback_pairs(fallbacks)
+        bulk_write(self.conn, [(page, element_name, normalize_locator_type(locator_type), locator_value,
+                                last_healed, fallbacks)])
+
+    def delete(self, element_name: str, page: str = DEFAULT_PAGE):
+        with self.conn:
+            self.conn.execute("DELETE FROM element_locators WHERE page = ? AND element_name = ?",
+                              (page, element_name))
+
+    def list_locators(self) -> List[Tuple]:
+        """(element_name, locator_type, locator_value, last_healed) of every element, for tables and reports."""
+        return self.conn.execute(
+            "SELECT element_name, locator_type, locator_value, last_healed FROM element_locators "
+            "ORDER BY page, element_name").fetchall()
+
+    def export_rows(self) -> Iterable[Tuple]:
+        """Stream (page, element_name, locator_type, locator_value, last_healed, fallbacks) in key order."""
+        cursor = self.conn.execute("""
+            SELECT l.page, l.element_name, l.locator_type, l.locator_value, l.last_healed,
+                   f.locator_type, f.locator_value
+            FROM element_locators l LEFT JOIN locator_fallbacks f ON f.locator_id = l.id
+            ORDER BY l.page, l.element_name, f.position
+        """)
+        current = None
+        for page, element_name, locator_type, locator_value, last_healed, fallback_type, fallback_value in cursor:
+            if current is None or current[:2] != (page, element_name):
+                if current is not None:
+                    yield current
+                current = (page, element_name, locator_type, locator_value, last_healed, [])
+            if fallback_type is not None:
+                current[5].append((fallback_type, fallback_value))
+        if current is not None:
+            yield current
+
+    def close(self):
+        self.conn.close()
+
+
+_thread_stores = threading.local()
+
+
+def get_locator_store(db_path: str = "locators.db") -> LocatorStore:
+    """This thread's open store for db_path; callers keep using it instead of closing it."""
+    stores = getattr(_thread_stores, "stores", None)
+    if stores is None:
+        stores = _thread_stores.stores = {}
+    key = os.path.abspath(db_path)
+    if key not in stores:
+        stores[key] = LocatorStore(db_path)
+    return stores[key]
+
+
+def import_locators(db_path: str, csv_path: str, batch_size: int = BULK_BATCH_SIZE) -> int:
+    """Load a CSV written by export_locators() (or by hand, same columns) into db_path in one transaction."""
+    store = LocatorStore(db_path)
+    try:
+        with open(csv_path, newline="", encoding="utf-8") as f:
+            rows = (
+                (row["page"] or DEFAULT_PAGE, row["element_name"], normalize_locator_type(row["locator_type"]),
+                 row["locator_value"], row.get("last_healed") or None, _fallback_pairs(row.get("fallbacks")))
+                for row in csv.DictReader(f)
+            )
+            return bulk_write(store.conn, rows, batch_size)
+    finally:
+        store.close()
+
+
+def export_locators(db_path: str, csv_path: str) -> int:
+    """Write every locator of db_path to a CSV file. Returns the number of locators exported."""
+    store = LocatorStore(db_path)
+    count = 0
+    try:
+        with open(csv_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(EXPORT_COLUMNS)
+            for page, element_name, locator_type, locator_value, last_healed, fallbacks in store.export_rows():
+                writer.writerow((page, element_name, locator_type, locator_value, last_healed or "",
+                                 json.dumps(fallbacks)))
+                count += 1
+    finally:
+        store.close()
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Migrate, import or export the unified locator store.")
+    parser.add_argument("command", choices=("migrate", "import", "export"))
+    parser.add_argument("db_path")
+    parser.add_argument("csv_path", nargs="?")
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        # Opening the store migrates whatever legacy tables it finds
+        LocatorStore(args.db_path).close()
+        print(f"{args.db_path} is on the unified locator schema")
+    elif not args.csv_path:
+        parser.error(f"{args.command} needs a CSV path")
+    elif args.command == "import":
+        print(f"Imported {import_locators(args.db_path, args.csv_path)} locators")
+    else:
+        print(f"Exported {export_locators(args.db_path, args.csv_path)} locators")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+# screenshot_store.py
+"""
+Content-addressed storage for healing screenshots, shared by the pytest ingestor and the Healenium UI.
+
+Only the standard library is used, so writing a screenshot does not pull in the database layer.
+"""
+import hashlib
+import os
+import threading
+
+
+class ScreenshotStore:
+    """
+    Content-addressed screenshot store: <root>/<sha[:2]>/<sha>.png.
+
+    Identical screenshots (same failing page state) are written once. PNG is already
+    deflate-compressed, so files are stored as-is rather than re-compressed.
+    """
+
+    def __init__(self, root: str = "./screenshots"):
+        self.root = root
+
+    def put(self, png: bytes) -> str:
+        digest = hashlib.sha256(png).hexdigest()
+        directory = os.path.join(self.root, digest[:2])
+        path = os.path.join(directory, f"{digest}.png")
+        if not os.path.exists(path):
+            os.makedirs(directory, exist_ok=True)
+            # Write to a temp name first so a concurrent reader never sees a partial file
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as file:
+                file.write(png)
+            os.replace(tmp_path, path)
+        return path
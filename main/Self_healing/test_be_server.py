@@ -0,0 +1,213 @@
+import asyncio
+import base64
+import json
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# The module creates its engine on import; keep that off the working directory
+os.environ.setdefault("SELF_HEALING_DB_URL", "sqlite://")
+
+from main.Self_healing import be_server  # noqa: E402
+from main.Self_healing.bd_schema import Base, HealingReport, Selector  # noqa: E402
+
+START = datetime(2024, 11, 1, 10, 0, 0)
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'self_healing.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    monkeypatch.setattr(be_server, "Session", Session)
+    with Session() as session:
+        session.add_all(Selector(page_name="login" if index % 2 else "home", element_name=f"e{index}")
+                        for index in range(5))
+        # Two reports share each timestamp, so the cursor has to break ties on id
+        session.add_all(HealingReport(timestamp=START + timedelta(minutes=index // 2), element_name=f"r{index}",
+                                      status="success" if index % 3 else "failed") for index in range(7))
+        session.commit()
+    yield TestClient(be_server.app)
+    engine.dispose()
+
+
+def cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def pages(client, url, **params):
+    items, next_cursor = [], None
+    while True:
+        response = client.get(url, params={**params, **({"cursor": next_cursor} if next_cursor else {})})
+        assert response.status_code == 200
+        body = response.json()
+        items.extend(body["items"])
+        next_cursor = body["next_cursor"]
+        if next_cursor is None:
+            return items
+
+
+def test_reports_are_paginated_newest_first_without_gaps(client):
+    items = pages(client, "/api/healing-reports", limit=2)
+    assert [item["element_name"] for item in items] == [f"r{index}" for index in reversed(range(7))]
+
+    failed = pages(client, "/api/healing-reports", limit=1, status="failed")
+    assert [item["element_name"] for item in failed] == ["r6", "r3", "r0"]
+    window = pages(client, "/api/healing-reports", limit=2, since=START + timedelta(minutes=1),
+                   until=START + timedelta(minutes=3))
+    assert [item["element_name"] for item in window] == ["r5", "r4", "r3", "r2"]
+
+
+def test_reports_without_timestamp_come_last(client):
+    with be_server.Session() as session:
+        session.add_all([HealingReport(element_name=f"n{index}") for index in range(3)])
+        session.flush()
+        # The ORM fills in the column default for None, so clear it the way rows written without one look
+        session.query(HealingReport).filter(HealingReport.element_name.like("n%")).update({"timestamp": None})
+        session.commit()
+    items = pages(client, "/api/healing-reports", limit=2)
+    assert [item["element_name"] for item in items] == [f"r{index}" for index in reversed(range(7))] + [
+        "n2", "n1", "n0"]
+    assert items[-1]["timestamp"] is None
+
+    export = client.get("/api/healing-reports/export").text.splitlines()
+    assert [json.loads(line)["element_name"] for line in export][-3:] == ["n2", "n1", "n0"]
+
+
+def test_selectors_are_paginated_and_filtered(client):
+    items = pages(client, "/api/selectors", limit=2, page_name="home")
+    assert [item["element_name"] for item in items] == ["e0", "e2", "e4"]
+
+
+def test_unchanged_page_is_not_modified(client):
+    response = client.get("/api/selectors", params={"limit": 2})
+    etag = response.headers["etag"]
+    again = client.get("/api/selectors", params={"limit": 2}, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+    other_page = client.get("/api/selectors", params={"limit": 3}, headers={"If-None-Match": etag})
+    assert other_page.status_code == 200
+
+
+@pytest.mark.parametrize("url, bad_cursor", [
+    ("/api/selectors", "not base64!"),
+    ("/api/selectors", cursor([1])),
+    ("/api/selectors", cursor({"id": "1"})),
+    ("/api/healing-reports", cursor({"id": 1})),
+    ("/api/healing-reports", cursor({"timestamp": "yesterday", "id": 1})),
+    ("/api/healing-reports", cursor({"timestamp": 12, "id": 1})),
+])
+def test_bad_cursors_are_rejected(client, url, bad_cursor):
+    response = client.get(url, params={"cursor": bad_cursor})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor"}
+
+
+class FakeWebSocket:
+    """Records sent messages; sends wait while the client is paused, like a slow reader."""
+
+    def __init__(self, port):
+        self.client = SimpleNamespace(host="127.0.0.1", port=port)
+        self.received = []
+        self.closed = False
+        self.ready = asyncio.Event()
+        self.ready.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        await self.ready.wait()
+        self.received.append(message)
+
+    async def close(self):
+        self.closed = True
+
+
+async def settle():
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+async def broadcast_to_slow_client(policy):
+    manager = be_server.ConnectionManager(max_queue_size=2, overflow_policy=policy)
+    fast, slow = FakeWebSocket(1), FakeWebSocket(2)
+    slow.ready.clear()
+    await manager.connect(fast)
+    await manager.connect(slow)
+    # m0 is taken by the slow client's sender and stays in flight; m1 and m2 fill its queue
+    for index in range(4):
+        await manager.broadcast(f"m{index}")
+        await settle()
+    metrics = manager.metrics()
+    slow.ready.set()
+    await settle()
+    for websocket in manager.active_connections:
+        manager.disconnect(websocket)
+    return fast, slow, metrics
+
+
+@pytest.mark.parametrize("policy, slow_received, dropped", [
+    ("drop_oldest", ["m0", "m2", "m3"], 1),
+    ("drop_newest", ["m0", "m1", "m2"], 1),
+])
+def test_overflow_drops_messages_for_the_slow_client_only(policy, slow_received, dropped):
+    fast, slow, metrics = asyncio.run(broadcast_to_slow_client(policy))
+    assert fast.received == ["m0", "m1", "m2", "m3"]
+    assert slow.received == slow_received
+    assert metrics["connections"] == 2
+    assert metrics["total_dropped"] == dropped
+    assert metrics["total_queue_depth"] == 2
+    fast_metrics, slow_metrics = metrics["clients"]
+    assert (fast_metrics["client"], fast_metrics["sent"], fast_metrics["dropped"]) == ("127.0.0.1:1", 4, 0)
+    assert (slow_metrics["sent"], slow_metrics["queue_depth"]) == (0, 2)
+
+
+def test_overflow_disconnects_the_slow_client():
+    fast, slow, metrics = asyncio.run(broadcast_to_slow_client("disconnect"))
+    assert fast.received == ["m0", "m1", "m2", "m3"]
+    assert slow.closed
+    assert metrics["connections"] == 1
+    assert metrics["disconnected"] == 1
+    assert [client["client"] for client in metrics["clients"]] == ["127.0.0.1:1"]
+
+
+def test_stuck_send_times_out_and_disconnects():
+    async def scenario():
+        manager = be_server.ConnectionManager(send_timeout=0.05)
+        stuck = FakeWebSocket(1)
+        stuck.ready.clear()
+        await manager.connect(stuck)
+        await manager.broadcast("m0")
+        await asyncio.sleep(0.2)
+        return manager.metrics()
+
+    metrics = asyncio.run(scenario())
+    assert (metrics["connections"], metrics["disconnected"]) == (0, 1)
+
+
+def test_send_latency_metrics():
+    async def scenario():
+        manager = be_server.ConnectionManager()
+        websocket = FakeWebSocket(1)
+        await manager.connect(websocket)
+        for index in range(3):
+            await manager.broadcast(f"m{index}")
+        await settle()
+        metrics = manager.metrics()
+        manager.disconnect(websocket)
+        return metrics
+
+    client, = asyncio.run(scenario())["clients"]
+    assert client["sent"] == 3
+    assert 0.0 <= client["avg_send_latency_ms"] <= client["max_send_latency_ms"]
+
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError):
+        be_server.ConnectionManager(overflow_policy="block")
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from main.Self_healing.healing_metrics import HealingMetrics, StrategyStats
+
+
+def test_measure_records_attempts_per_strategy_and_element():
+    metrics = HealingMetrics()
+    with metrics.measure("primary", "loginButton") as attempt:
+        attempt.succeeded()
+    with metrics.measure("primary", "loginButton"):
+        pass
+    # An exception is a failed attempt and still propagates
+    with pytest.raises(LookupError):
+        with metrics.measure("fallback:css", "searchBox"):
+            raise LookupError("no such element")
+    with metrics.measure("dynamic") as attempt:
+        attempt.succeeded()
+
+    snapshot = metrics.snapshot()
+    assert {name: (data["attempts"], data["successes"]) for name, data in snapshot["strategies"].items()} == {
+        "primary": (2, 1), "fallback:css": (1, 0), "dynamic": (1, 1)}
+    assert snapshot["strategies"]["primary"]["success_rate"] == 0.5
+    assert set(snapshot["elements"]) == {"loginButton", "searchBox"}
+    assert snapshot["elements"]["searchBox"]["fallback:css"]["attempts"] == 1
+    assert "primary" in metrics.report()
+
+
+def test_percentiles_are_bucket_estimates_capped_by_the_maximum():
+    stats = StrategyStats()
+    assert stats.percentile(0.95) == 0.0
+    for _ in range(9):
+        stats.record(1.5, True)
+    stats.record(300.0, False)
+    # 9 of 10 attempts fall in the (1, 2] ms bucket; the slowest one in (200, 500]
+    assert stats.percentile(0.5) == 2
+    assert stats.percentile(0.95) == 300.0
+    assert stats.to_dict()["avg_ms"] == pytest.approx(31.35)
+
+    # The open-ended bucket reports the largest latency seen
+    stats.record(60_000.0, True)
+    assert stats.percentile(1.0) == 60_000.0
+
+
+def test_merge_and_reset(tmp_path):
+    worker = HealingMetrics()
+    worker.record("database", "loginButton", 12.0, True)
+    controller = HealingMetrics()
+    controller.record("database", "loginButton", 3.0, False)
+    controller.merge_snapshot(json.loads(json.dumps(worker.snapshot())))
+    data = controller.snapshot()["strategies"]["database"]
+    assert (data["attempts"], data["successes"], data["max_ms"]) == (2, 1, 12.0)
+
+    path = tmp_path / "metrics.json"
+    controller.save(str(path))
+    assert json.loads(path.read_text())["elements"]["loginButton"]["database"]["attempts"] == 2
+
+    controller.reset()
+    assert controller.snapshot()["strategies"] == {}
+    assert controller.snapshot()["elements"] == {}
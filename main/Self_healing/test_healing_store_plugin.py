@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from main.Self_healing.locator_store import LocatorStore
+
+pytest_plugins = "pytester"
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+HEALING_TESTS = """
+def test_{name}(healing_store, worker_id):
+    # Seeded before the session; every worker reads it from the snapshot
+    assert healing_store.get_locator("loginButton")["primary_locator"] == "id=login"
+    healing_store.record_heal("{name}", "css=#{name}", [("xpath", "//*[@id='{name}']")])
+    healing_store.record_heal("healed_by_" + worker_id, "id={name}", [])
+    assert healing_store.get_locator("{name}")["primary_locator"] == "css_selector=#{name}"
+"""
+
+
+def test_xdist_workers_heal_into_shards_that_are_merged(pytester, tmp_path, monkeypatch):
+    pytest.importorskip("xdist")
+    db_path = str(tmp_path / "locators.db")
+    seed = LocatorStore(db_path)
+    seed.put("loginButton", "id", "login")
+    seed.close()
+    monkeypatch.setenv("HEALING_DB_PATH", db_path)
+    monkeypatch.setenv("PYTHONPATH", os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")])))
+    pytester.makepyfile(test_search=HEALING_TESTS.format(name="searchBox"),
+                        test_footer=HEALING_TESTS.format(name="footerLink"))
+
+    # loadfile gives each of the two test files its own worker
+    result = pytester.runpytest_subprocess("-p", "xdist", "-n", "2", "--dist", "loadfile",
+                                           "-p", "main.Self_healing.healing_store_plugin")
+
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines([f"*merged 4 healed locators into {db_path}*"])
+    store = LocatorStore(db_path)
+    try:
+        locators = {row[0] for row in store.list_locators()}
+        assert store.get("searchBox")["locator_value"] == "#searchBox"
+        assert store.get("footerLink")["fallbacks"] == [("xpath", "//*[@id='footerLink']")]
+        assert store.get("loginButton")["locator_value"] == "login"
+    finally:
+        store.close()
+    assert {"healed_by_gw0", "healed_by_gw1"} <= locators
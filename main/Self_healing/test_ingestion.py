@@ -0,0 +1,73 @@
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from main.Self_healing.bd_schema import Base, HealingReport
+from main.Self_healing.ingestion import HealingIngestor
+from main.Self_healing.screenshot_store import ScreenshotStore
+
+
+@pytest.fixture
+def session_factory():
+    # One in-memory database shared by the test and the ingestor's worker thread
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def ingest(session_factory, tmp_path, submissions, **options):
+    batches = []
+    ingestor = HealingIngestor(session_factory, ScreenshotStore(str(tmp_path / "screenshots")),
+                               on_committed=lambda reports: batches.append(len(reports)), **options)
+    for fields, png in submissions:
+        ingestor.submit(fields, png)
+    ingestor.close(timeout=10)
+    assert not ingestor.worker.is_alive()
+    return ingestor, batches
+
+
+def stored(session_factory):
+    session = session_factory()
+    try:
+        return [(report.element_name, report.screenshot_path)
+                for report in session.query(HealingReport).order_by(HealingReport.id)]
+    finally:
+        session.close()
+
+
+def test_reports_are_committed_in_batches_and_flushed_on_close(session_factory, tmp_path):
+    submissions = [({"element_name": f"e{index}", "status": "healed"}, None) for index in range(7)]
+    ingestor, batches = ingest(session_factory, tmp_path, submissions, batch_size=3, flush_interval=60)
+    # The last, partial batch is written by close()
+    assert batches == [3, 3, 1]
+    assert ingestor.committed == 7
+    assert [name for name, _ in stored(session_factory)] == [f"e{index}" for index in range(7)]
+
+
+def test_identical_screenshots_are_stored_once(session_factory, tmp_path):
+    png = b"\x89PNG\r\n\x1a\n same page state"
+    ingest(session_factory, tmp_path, [({"element_name": "a"}, png), ({"element_name": "b"}, png)])
+    (_, first), (_, second) = stored(session_factory)
+    assert first == second
+    assert open(first, "rb").read() == png
+    assert sum(len(files) for _, _, files in os.walk(tmp_path / "screenshots")) == 1
+
+
+def test_bad_reports_are_skipped_and_recorded(session_factory, tmp_path):
+    submissions = [
+        ({"element_name": "before"}, None),
+        # Fails when the row is built
+        ({"element_name": "unknown column", "selector": "#x"}, None),
+        # Fails when the batch is committed
+        ({"element_name": "bad timestamp", "timestamp": "yesterday"}, None),
+        ({"element_name": "after"}, None),
+    ]
+    ingestor, batches = ingest(session_factory, tmp_path, submissions, batch_size=10, flush_interval=60)
+    assert len(ingestor.errors) == 2
+    assert ingestor.committed == 2
+    assert batches == [2]
+    assert [name for name, _ in stored(session_factory)] == ["before", "after"]
@@ -0,0 +1,147 @@
+import json
+import sqlite3
+import threading
+
+import pytest
+
+from main.Self_healing.locator_store import (
+    LocatorStore, connect, export_locators, get_locator_store, import_locators)
+
+
+def make_legacy_db(path, ddl, rows):
+    conn = sqlite3.connect(path)
+    conn.execute(ddl)
+    conn.executemany(f"INSERT INTO {ddl.split()[2]} VALUES ({', '.join('?' for _ in rows[0])})", rows)
+    conn.commit()
+    conn.close()
+
+
+def test_migrates_healenium_table(tmp_path):
+    path = str(tmp_path / "locators.db")
+    make_legacy_db(path, "CREATE TABLE locators (element_name TEXT PRIMARY KEY, locator_type TEXT, "
+                         "locator_value TEXT, last_healed TEXT)",
+                   [("submitButton", "css", ".submit-btn", "2024-11-01 10:10:00")])
+
+    store = LocatorStore(path)
+    assert store.get("submitButton") == {
+        "locator_type": "css_selector", "locator_value": ".submit-btn",
+        "last_healed": "2024-11-01 10:10:00", "fallbacks": []}
+    tables = {row[0] for row in store.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    store.close()
+    assert "locators" not in tables and "legacy_locators" in tables
+
+
+def test_migrates_locator_manager_table(tmp_path):
+    path = str(tmp_path / "locators.db")
+    make_legacy_db(path, "CREATE TABLE locators (element_name TEXT PRIMARY KEY, primary_locator TEXT, "
+                         "fallback_locators TEXT)",
+                   [("email", "id=email", json.dumps([["name", "email"], ["css_selector", "[id='email']"]]))])
+
+    store = LocatorStore(path)
+    assert store.get("email")["fallbacks"] == [("name", "email"), ("css_selector", "[id='email']")]
+    store.close()
+
+
+def test_migrates_selectors_once(tmp_path):
+    path = str(tmp_path / "self_healing.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE selectors (id INTEGER PRIMARY KEY, page_name TEXT, element_name TEXT, "
+                 "original_selector TEXT, current_selector TEXT, healing_enabled BOOLEAN, last_updated DATETIME, "
+                 "selector_type TEXT, confidence_score FLOAT)")
+    conn.executemany("INSERT INTO selectors VALUES (?, ?, ?, ?, ?, 1, ?, ?, 0.9)", [
+        (1, "login", "submit", "#login", "#sign-in", "2024-11-01 10:00:00.000000", "CSS"),
+        (2, "login", "submit", "#login", "#submit", "2024-11-02 10:00:00.000000", "CSS"),
+    ])
+    conn.commit()
+    conn.close()
+
+    store = LocatorStore(path)
+    store.put("submit", "css_selector", "#edited", page="login")
+    store.close()
+
+    # Re-opening must not re-import the selectors rows over the edit
+    store = LocatorStore(path)
+    locator = store.get("submit", page="login")
+    store.close()
+    assert locator["locator_value"] == "#edited"
+    assert locator["fallbacks"] == [("css_selector", "#login")]
+
+
+def test_put_keeps_fallbacks_unless_given(tmp_path):
+    store = LocatorStore(str(tmp_path / "locators.db"))
+    store.put("email", "id", "email", [("name", "email")])
+    store.put("email", "css", "#email")
+    assert store.get("email")["fallbacks"] == [("name", "email")]
+    store.put("email", "css", "#email", [])
+    assert store.get("email")["fallbacks"] == []
+    store.delete("email")
+    assert store.get("email") is None
+    store.close()
+
+
+def test_put_without_heal_time_keeps_the_stored_one(tmp_path):
+    store = LocatorStore(str(tmp_path / "locators.db"))
+    store.put("email", "id", "email", last_healed="2024-11-01 10:00:00")
+    store.put("email", "css", "#email")
+    assert store.get("email")["last_healed"] == "2024-11-01 10:00:00"
+    store.put("email", "css", "#email", last_healed="2024-11-02 09:00:00")
+    assert store.get("email")["last_healed"] == "2024-11-02 09:00:00"
+    store.close()
+
+
+def test_create_refuses_duplicates(tmp_path):
+    store = LocatorStore(str(tmp_path / "locators.db"))
+    store.create("email", "id", "email", [("name", "email")])
+    with pytest.raises(sqlite3.IntegrityError):
+        store.create("email", "css", "#email")
+    assert store.get("email") == {"locator_type": "id", "locator_value": "email", "last_healed": None,
+                                  "fallbacks": [("name", "email")]}
+    store.close()
+
+
+def test_shared_store_per_thread_and_file(tmp_path):
+    path = str(tmp_path / "locators.db")
+    store = get_locator_store(path)
+    assert get_locator_store(path) is store
+    store.put("email", "id", "email")
+    # SQLite connections belong to their thread, so another thread gets its own
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append((get_locator_store(path), get_locator_store(path).get("email"))))
+    thread.start()
+    thread.join()
+    other, locator = seen[0]
+    assert other is not store
+    assert locator["locator_value"] == "email"
+
+
+def test_pages_are_separate_keys(tmp_path):
+    store = LocatorStore(str(tmp_path / "locators.db"))
+    store.put("submit", "id", "login-submit", page="login")
+    store.put("submit", "id", "signup-submit", page="signup")
+    assert store.get("submit", page="login")["locator_value"] == "login-submit"
+    assert store.get("submit", page="signup")["locator_value"] == "signup-submit"
+    assert store.get("submit") is None
+    store.close()
+
+
+def test_export_import_round_trip(tmp_path):
+    source = str(tmp_path / "source.db")
+    store = LocatorStore(source)
+    for i in range(1200):
+        store.put(f"element_{i}", "id", f"id_{i}", [("name", f"name_{i}"), ("xpath", f"//*[@id='id_{i}']")],
+                  page=f"page_{i % 7}", last_healed="2024-11-01 10:00:00")
+    store.close()
+
+    csv_path = str(tmp_path / "library.csv")
+    assert export_locators(source, csv_path) == 1200
+    target = str(tmp_path / "target.db")
+    assert import_locators(target, csv_path, batch_size=500) == 1200
+
+    conn = connect(target)
+    assert conn.execute("SELECT COUNT(*) FROM locator_fallbacks").fetchone()[0] == 2400
+    conn.close()
+    store = LocatorStore(target)
+    assert store.get("element_8", page="page_1") == {
+        "locator_type": "id", "locator_value": "id_8", "last_healed": "2024-11-01 10:00:00",
+        "fallbacks": [("name", "name_8"), ("xpath", "//*[@id='id_8']")]}
+    store.close()
@@ -6,44 +6,19 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QComboBox, QGroupBox, QCheckBox, QFileDialog, QMessageBox,
                              QScrollArea)
 from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont, QSyntaxHighlighter, QTextCharFormat, QColor
+from PyQt5.QtGui import QFont
 
+from main.CodeReview.highlight_engine import SCRIPT_ENGINE
+from main.CodeReview.syntax_highlighter import RegexHighlighter
 
-class SyntaxHighlighter(QSyntaxHighlighter):
+
+class SyntaxHighlighter(RegexHighlighter):
     def __init__(self, parent=None):
-        super().__init__(parent)
-        self.highlighting_rules = []
-
-        keyword_format = QTextCharFormat()
-        keyword_format.setForeground(QColor("#569CD6"))  # Blue
-        keywords = [
-            "class", "def", "import", "from", "try", "except", "finally",
-            "if", "else", "elif", "for", "while", "return", "yield",
-            "public", "private", "protected", "static", "void", "const",
-            "function", "var", "let", "const", "async", "await"
-        ]
-        for word in keywords:
-            pattern = f"\\b{word}\\b"
-            self.highlighting_rules.append((pattern, keyword_format))
-
-        string_format = QTextCharFormat()
-        string_format.setForeground(QColor("#CE9178"))  # Orange
-        self.highlighting_rules.append(("\".*\"", string_format))
-        self.highlighting_rules.append(("\'.*\'", string_format))
-
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(QColor("#6A9955"))  # Green
-        self.highlighting_rules.append(("#[^\n]*", comment_format))
-        self.highlighting_rules.append(("//[^\n]*", comment_format))
-
-    def highlightBlock(self, text):
-        for pattern, format in self.highlighting_rules:
-            expression = pattern
-            index = text.find(expression)
-            while index >= 0:
-                length = len(expression)
-                self.setFormat(index, length, format)
-                index = text.find(expression, index + length)
+        super().__init__(SCRIPT_ENGINE, {
+            'keyword': "#569CD6",  # Blue
+            'string': "#CE9178",  # Orange
+            'comment': "#6A9955",  # Green
+        }, parent)
 
 
 class TestScriptGenerator(QMainWindow):
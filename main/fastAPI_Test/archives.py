@@ -0,0 +1,188 @@
+# archives.py
+"""
+Streaming extraction of uploaded project archives.
+
+Only the Python files of an archive are written out, chunk by chunk, and each one is hashed while it
+is written, so the analysis cache can be consulted without reading it again. tar/tar.gz bodies are
+extracted while they are still being received (tarfile's stream mode reads strictly forward); zip
+needs its central directory at the end of the file, so a zip upload is spooled to disk first and
+then extracted member by member. Nothing holds more than a few chunks of the upload in memory.
+
+Member names are confined to the destination directory, and MAX_ARCHIVE_BYTES / MAX_ARCHIVE_FILES
+bound the upload, the extracted bytes and the file count (compressed archives can expand a lot).
+"""
+import asyncio
+import hashlib
+import io
+import os
+import posixpath
+import tarfile
+import zipfile
+from typing import AsyncIterable, Dict, Optional, Tuple
+
+CHUNK_SIZE = 1024 * 1024
+MAX_ARCHIVE_BYTES = int(os.environ.get("ANALYZE_MAX_ARCHIVE_BYTES", 512 * 1024 * 1024))
+MAX_ARCHIVE_FILES = int(os.environ.get("ANALYZE_MAX_ARCHIVE_FILES", 20000))
+
+# Chunks received but not yet extracted; bounds memory while the extractor catches up
+PENDING_CHUNKS = 8
+
+ARCHIVE_FORMATS = {".zip": "zip", ".tar.gz": "tar", ".tgz": "tar", ".tar": "tar"}
+
+# {path inside the archive: (path on disk, sha256 of the content)}
+ExtractedFiles = Dict[str, Tuple[str, str]]
+
+
+class ArchiveError(ValueError):
+    pass
+
+
+def archive_format(filename: str) -> Optional[str]:
+    lowered = filename.lower()
+    for suffix, archive_type in ARCHIVE_FORMATS.items():
+        if lowered.endswith(suffix):
+            return archive_type
+    return None
+
+
+def member_name(name: str) -> Optional[str]:
+    """Normalised relative path of a Python member, or None for anything that is skipped."""
+    name = posixpath.normpath(name.replace("\\", "/"))
+    if not name.endswith(".py") or name.startswith(("/", "../")) or name == ".." or ":" in name:
+        return None
+    return name
+
+
+class Extraction:
+    def __init__(self, dest: str):
+        self.dest = dest
+        self.files = {}
+        self.total_bytes = 0
+
+    def add(self, name: str, source) -> None:
+        """Copy one member from the file-like `source`, hashing it on the way."""
+        name = member_name(name)
+        if name is None:
+            return
+        if len(self.files) >= MAX_ARCHIVE_FILES:
+            raise ArchiveError(f"Archive has more than {MAX_ARCHIVE_FILES} Python files")
+        path = os.path.join(self.dest, *name.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        sha256 = hashlib.sha256()
+        with open(path, "wb") as target:
+            for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                # Counted on the bytes actually written; header sizes can lie
+                self.total_bytes += len(chunk)
+                if self.total_bytes > MAX_ARCHIVE_BYTES:
+                    raise ArchiveError(f"Archive expands to more than {MAX_ARCHIVE_BYTES} bytes")
+                sha256.update(chunk)
+                target.write(chunk)
+        self.files[name] = (path, sha256.hexdigest())
+
+
+def extract_tar(fileobj, dest: str) -> ExtractedFiles:
+    """Extract the Python files of a (possibly gzip/bz2/xz compressed) tar read strictly forward."""
+    extraction = Extraction(dest)
+    try:
+        with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+            for member in archive:
+                if member.isfile():
+                    extraction.add(member.name, archive.extractfile(member))
+    except (tarfile.TarError, EOFError, OSError) as e:
+        raise ArchiveError(f"Invalid tar archive: {e}")
+    return extraction.files
+
+
+def extract_zip(path: str, dest: str) -> ExtractedFiles:
+    extraction = Extraction(dest)
+    try:
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir():
+                    with archive.open(info) as source:
+                        extraction.add(info.filename, source)
+    except (zipfile.BadZipFile, EOFError, OSError) as e:
+        raise ArchiveError(f"Invalid zip archive: {e}")
+    return extraction.files
+
+
+class _StreamReader(io.RawIOBase):
+    """Blocking file object over chunks an event loop feeds in; read from a worker thread."""
+
+    def __init__(self, chunks: asyncio.Queue, feeder: asyncio.Future, loop: asyncio.AbstractEventLoop):
+        self.chunks = chunks
+        self.feeder = feeder
+        self.loop = loop
+        self.buffer = b""
+
+    def readable(self):
+        return True
+
+    async def _next_chunk(self) -> bytes:
+        get = asyncio.ensure_future(self.chunks.get())
+        await asyncio.wait({get, self.feeder}, return_when=asyncio.FIRST_COMPLETED)
+        if get.done():
+            return get.result()
+        get.cancel()
+        if not self.chunks.empty():
+            return self.chunks.get_nowait()
+        # The upload ended (or failed: re-raise the client's disconnect here)
+        self.feeder.result()
+        return b""
+
+    def readinto(self, target) -> int:
+        if not self.buffer:
+            self.buffer = asyncio.run_coroutine_threadsafe(self._next_chunk(), self.loop).result()
+        size = min(len(target), len(self.buffer))
+        target[:size] = self.buffer[:size]
+        self.buffer = self.buffer[size:]
+        return size
+
+
+async def _feed(stream: AsyncIterable[bytes], chunks: asyncio.Queue):
+    received = 0
+    async for chunk in stream:
+        received += len(chunk)
+        if received > MAX_ARCHIVE_BYTES:
+            raise ArchiveError(f"Upload is larger than {MAX_ARCHIVE_BYTES} bytes")
+        if chunk:
+            await chunks.put(chunk)
+
+
+async def extract_stream(stream: AsyncIterable[bytes], archive_type: str, dest: str) -> ExtractedFiles:
+    """
+    Extract an archive body as it arrives.
+
+    Parameters:
+    - stream: The request body, e.g. Starlette's request.stream().
+    - archive_type: "tar" (any compression tarfile understands) or "zip".
+    - dest: Existing directory the Python files are written under.
+
+    Returns:
+    - {path inside the archive: (path on disk, sha256)}; raises ArchiveError on bad input.
+    """
+    if archive_type == "zip":
+        spool_path = os.path.join(dest, ".upload.zip")
+        try:
+            with open(spool_path, "wb") as spool:
+                received = 0
+                async for chunk in stream:
+                    received += len(chunk)
+                    if received > MAX_ARCHIVE_BYTES:
+                        raise ArchiveError(f"Upload is larger than {MAX_ARCHIVE_BYTES} bytes")
+                    await asyncio.to_thread(spool.write, chunk)
+            return await asyncio.to_thread(extract_zip, spool_path, os.path.join(dest, "src"))
+        finally:
+            if os.path.exists(spool_path):
+                os.remove(spool_path)
+
+    loop = asyncio.get_running_loop()
+    chunks = asyncio.Queue(maxsize=PENDING_CHUNKS)
+    feeder = asyncio.ensure_future(_feed(stream, chunks))
+    reader = io.BufferedReader(_StreamReader(chunks, feeder, loop), CHUNK_SIZE)
+    try:
+        return await asyncio.to_thread(extract_tar, reader, os.path.join(dest, "src"))
+    finally:
+        # The extractor may stop before the body ends (error, or padding after the last member)
+        feeder.cancel()
+        await asyncio.gather(feeder, return_exceptions=True)
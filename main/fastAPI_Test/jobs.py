@@ -0,0 +1,215 @@
+# jobs.py
+"""
+In-memory job queue for the analysis API.
+
+An upload becomes a Job: a list of (file, analyzer) units. Each unit holds a slot of one global
+semaphore while it runs, so concurrent uploads share the analyzer capacity instead of queueing
+behind each other, and a job keeps at most max_concurrency units waiting on that semaphore, so a
+large archive cannot queue thousands of units ahead of a later single-file upload. The blocking
+analyzer call (analysis cache + warm worker pool) runs in a thread, never on the event loop.
+
+Each finished analyzer (for archives: each finished file) appends an event to its job; subscribers
+(the SSE endpoint) replay the events so far and then wait for new ones, so a client that connects
+late still sees every result. Finished jobs are dropped JOB_TTL seconds after completion.
+"""
+import asyncio
+import os
+import shutil
+import subprocess
+import time
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+MAX_CONCURRENT_ANALYSES = int(os.environ.get("ANALYZE_MAX_CONCURRENCY", os.cpu_count() or 1))
+JOB_TTL = int(os.environ.get("ANALYZE_JOB_TTL", 3600))
+
+Runner = Callable[..., Dict]
+
+
+class Job:
+    def __init__(self, filename: str, file_path: str, analyzers: List[str], options: Optional[Dict] = None,
+                 work_dir: Optional[str] = None, project: Optional[str] = None, commit: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        # History key and source commit, for the results store
+        self.project = project or filename
+        self.commit = commit
+        self.file_path = file_path
+        self.analyzers = analyzers
+        self.options = options or {}
+        # Removed once every analyzer has finished
+        self.work_dir = work_dir
+        self.status = "queued"
+        self.results = {}
+        self.events = []
+        self.created = datetime.now().isoformat()
+        self.finished_at = None
+        self.changed = asyncio.Condition()
+
+    @property
+    def done(self) -> bool:
+        return self.status == "completed"
+
+    async def publish(self, event: Dict):
+        async with self.changed:
+            self.events.append(event)
+            self.changed.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Dict]:
+        """Every event of the job, from the first one, until the job completes."""
+        index = 0
+        while True:
+            async with self.changed:
+                await self.changed.wait_for(lambda: index < len(self.events) or self.done)
+                pending = self.events[index:]
+                finished = self.done
+            for event in pending:
+                yield event
+            index += len(pending)
+            if finished and index == len(self.events):
+                return
+
+    def units(self) -> List[Tuple[Optional[str], str]]:
+        """(file, analyzer) pairs to run; a single-file job has no file names."""
+        return [(None, analyzer) for analyzer in self.analyzers]
+
+    def runner_args(self, name: Optional[str]) -> Tuple[str, Dict]:
+        return self.file_path, self.options
+
+    async def record(self, name: Optional[str], analyzer: str, result: Dict):
+        self.results[analyzer] = result
+        await self.publish({"analyzer": analyzer, "result": result})
+
+    def file_results(self) -> Dict[str, Dict[str, Dict]]:
+        """{file: {analyzer: result}}"""
+        return {self.filename: self.results}
+
+    def summary(self) -> Dict:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "filename": self.filename,
+            "project": self.project,
+            "commit": self.commit,
+            "timestamp": self.created,
+            "analyzers": self.analyzers,
+            "completed": len(self.results),
+            "results": self.results,
+        }
+
+
+class ArchiveJob(Job):
+    """Every Python file of an uploaded archive through every analyzer; results are keyed by file."""
+
+    def __init__(self, filename: str, files: Dict[str, Tuple[str, str]], analyzers: List[str],
+                 options: Optional[Dict] = None, work_dir: Optional[str] = None, project: Optional[str] = None,
+                 commit: Optional[str] = None):
+        super().__init__(filename, None, analyzers, options, work_dir, project, commit)
+        # {path inside the archive: (path on disk, content hash)}
+        self.files = files
+
+    def units(self):
+        return [(name, analyzer) for name in self.files for analyzer in self.analyzers]
+
+    def runner_args(self, name):
+        file_path, content_hash = self.files[name]
+        return file_path, {**self.options, "content_hash": content_hash}
+
+    async def record(self, name, analyzer, result):
+        file_results = self.results.setdefault(name, {})
+        file_results[analyzer] = result
+        if len(file_results) == len(self.analyzers):
+            await self.publish({"event": "file", "file": name, "results": file_results})
+
+    def file_results(self):
+        return self.results
+
+    def summary(self) -> Dict:
+        return {
+            **super().summary(),
+            "files": len(self.files),
+            "completed": sum(len(results) == len(self.analyzers) for results in self.results.values()),
+        }
+
+
+class JobManager:
+    def __init__(self, runner: Runner, max_concurrency: int = MAX_CONCURRENT_ANALYSES, ttl: int = JOB_TTL,
+                 on_complete: Optional[Callable[[Job], None]] = None):
+        """
+        Parameters:
+        - runner: Blocking runner(analyzer, file_path, **job options) -> result dict; called in a worker thread.
+        - max_concurrency: Analyzer runs in flight across all jobs.
+        - ttl: Seconds a finished job stays retrievable.
+        - on_complete: Blocking callback(job) run in a worker thread once every unit has finished.
+        """
+        self.runner = runner
+        self.on_complete = on_complete
+        self.max_concurrency = max_concurrency
+        self.ttl = ttl
+        self.jobs = {}
+        self._semaphore = None
+        self._tasks = set()
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the server's running loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def submit(self, filename: str, file_path: str, analyzers: List[str], options: Optional[Dict] = None,
+               work_dir: Optional[str] = None) -> Job:
+        """Register a job and start its analyzers in the background; returns immediately."""
+        return self.start(Job(filename, file_path, analyzers, options, work_dir))
+
+    def start(self, job: Job) -> Job:
+        self.expire()
+        self.jobs[job.id] = job
+        task = asyncio.get_running_loop().create_task(self._run(job))
+        # The loop only keeps weak references to tasks
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def expire(self):
+        cutoff = time.monotonic() - self.ttl
+        for job_id in [job_id for job_id, job in self.jobs.items()
+                       if job.finished_at is not None and job.finished_at < cutoff]:
+            del self.jobs[job_id]
+
+    async def _run(self, job: Job):
+        job.status = "running"
+        try:
+            units = iter(job.units())
+            # Bounded workers per job rather than one task per unit, see the module docstring
+            await asyncio.gather(*(self._work(job, units) for _ in range(self.max_concurrency)))
+            if self.on_complete is not None:
+                await asyncio.to_thread(self.on_complete, job)
+        finally:
+            if job.work_dir:
+                await asyncio.to_thread(shutil.rmtree, job.work_dir, True)
+            job.finished_at = time.monotonic()
+            async with job.changed:
+                job.status = "completed"
+                job.changed.notify_all()
+
+    async def _work(self, job: Job, units):
+        for name, analyzer in units:
+            file_path, options = job.runner_args(name)
+            async with self.semaphore:
+                try:
+                    result = await asyncio.to_thread(self.runner, analyzer, file_path, **options)
+                except subprocess.TimeoutExpired:
+                    result = {"error": f"{analyzer} analysis timed out"}
+                except Exception as e:
+                    result = {"error": str(e)}
+            await job.record(name, analyzer, result)
+
+    async def wait(self, job: Job) -> Job:
+        async with job.changed:
+            await job.changed.wait_for(lambda: job.done)
+        return job
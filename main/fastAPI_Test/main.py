@@ -1,16 +1,32 @@
 # main.py
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form
+from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-from typing import List, Dict
-import subprocess
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Dict, Optional
+import asyncio
 import json
+import sqlite3
 from datetime import datetime
 import tempfile
 import os
 import shutil
 
+from main.CodeReview.analysis_cache import file_digest, get_analysis_cache
+from main.CodeReview.analyzer_outputs import ANALYZER_COMMANDS, parse_outputs
+from main.CodeReview.analyzer_pool import get_analyzer_pool
+from main.CodeReview.results_store import get_results_store
+from main.fastAPI_Test.archives import ArchiveError, archive_format, extract_stream
+from main.fastAPI_Test.jobs import ArchiveJob, Job, JobManager
+
 app = FastAPI()
+# Analyzers run on warm worker processes instead of a fresh interpreter per tool
+analyzer_pool = get_analyzer_pool()
+
+ANALYZER_TIMEOUT = 30
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# The desktop tool's command lines and result shapes, so the two share analysis cache entries
+ANALYZER_COMMANDS = {name: ANALYZER_COMMANDS[name] for name in ("pylint", "flake8", "radon", "bandit")}
 
 # Configure CORS with more specific settings
 app.add_middleware(
@@ -22,88 +38,179 @@ app.add_middleware(
 )
 
 
+def run_analyzer(analyzer: str, file_path: str) -> Dict:
+    return parse_outputs(analyzer, analyzer_pool.run(ANALYZER_COMMANDS[analyzer], file_path,
+                                                     timeout=ANALYZER_TIMEOUT))
+
+
+def analyze_file(analyzer: str, file_path: str, content_hash: str, force_refresh: bool = False) -> Dict:
+    """Blocking; the job manager calls it from a worker thread."""
+    # Unchanged uploads are answered from the analysis cache shared with the desktop tool; the
+    # cache is opened on the first analysis, not when the app is imported
+    return get_analysis_cache().fetch(
+        content_hash, analyzer, ANALYZER_COMMANDS[analyzer],
+        lambda: run_analyzer(analyzer, file_path), force_refresh=force_refresh, file_path=file_path)
+
+
+def record_job(job: Job):
+    """Blocking; store a finished job in the results history. History problems never fail a job."""
+    try:
+        # Every finished job is kept for trend queries, in the same history as the desktop tool
+        get_results_store().record_run(job.project, job.file_results(), job.commit, source="api")
+    except sqlite3.Error:
+        pass
+
+
+jobs = JobManager(analyze_file, on_complete=record_job)
+
+
+async def save_upload(file: UploadFile, file_path: str):
+    """Copy the upload to disk chunk by chunk without blocking the event loop."""
+    with open(file_path, 'wb') as buffer:
+        while True:
+            chunk = await file.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            await asyncio.to_thread(buffer.write, chunk)
+
+
+async def submit_upload(file: UploadFile, analyzers: str, force_refresh: bool, project: Optional[str] = None,
+                        commit: Optional[str] = None) -> Job:
+    if not file.filename.endswith('.py'):
+        raise HTTPException(status_code=400, detail="Only Python files are supported")
+    try:
+        analyzer_list = [analyzer for analyzer in json.loads(analyzers) if analyzer in ANALYZER_COMMANDS]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="analyzers must be a JSON list")
+
+    # The job removes the directory once its analyzers have finished
+    temp_dir = tempfile.mkdtemp()
+    try:
+        file_path = os.path.join(temp_dir, os.path.basename(file.filename))
+        await save_upload(file, file_path)
+        content_hash = await asyncio.to_thread(file_digest, file_path)
+    except Exception:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+    return jobs.start(Job(file.filename, file_path, analyzer_list,
+                          {"content_hash": content_hash, "force_refresh": force_refresh}, work_dir=temp_dir,
+                          project=project, commit=commit))
+
+
+def analyzer_names(requested: List[str]) -> List[str]:
+    names = [analyzer for analyzer in requested if analyzer in ANALYZER_COMMANDS]
+    if not names:
+        raise HTTPException(status_code=400, detail=f"Choose analyzers from: {', '.join(ANALYZER_COMMANDS)}")
+    return names
+
+
+def get_job(job_id: str) -> Job:
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return job
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(
+        file: UploadFile = File(...),
+        analyzers: str = Form(...),  # JSON list of analyzer names
+        force_refresh: bool = Form(False),  # Ignore cached results and re-run every analyzer
+        project: Optional[str] = Form(None),  # History key for trend queries; defaults to the file name
+        commit: Optional[str] = Form(None)  # Commit the file came from, e.g. $GITHUB_SHA in CI
+):
+    """Queue an analysis and return at once; follow it on /jobs/{id}/events or poll /jobs/{id}."""
+    job = await submit_upload(file, analyzers, force_refresh, project, commit)
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "events": f"/jobs/{job.id}/events",
+        "result": f"/jobs/{job.id}",
+    }
+
+
+@app.post("/archives", status_code=202)
+async def create_archive_job(
+        request: Request,
+        filename: str = Query(..., description="Archive name; .zip, .tar.gz, .tgz or .tar"),
+        analyzers: List[str] = Query(...),  # Repeat the parameter: ?analyzers=pylint&analyzers=flake8
+        force_refresh: bool = Query(False),
+        project: Optional[str] = Query(None),  # History key for trend queries; defaults to the archive name
+        commit: Optional[str] = Query(None)
+):
+    """
+    Analyze every Python file of a project archive sent as the raw request body.
+
+    The body is extracted while it is received (zip is spooled to disk first), and every
+    (file, analyzer) pair is queued on the shared job manager. Per-file results stream as "file"
+    events on /jobs/{id}/events; /jobs/{id} returns {file: {analyzer: result}}.
+    """
+    archive_type = archive_format(filename)
+    if archive_type is None:
+        raise HTTPException(status_code=400, detail="Only .zip, .tar.gz, .tgz and .tar archives are supported")
+    analyzer_list = analyzer_names(analyzers)
+
+    # The job removes the directory once every file has been analyzed
+    temp_dir = tempfile.mkdtemp()
+    try:
+        files = await extract_stream(request.stream(), archive_type, temp_dir)
+    except ArchiveError as e:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
+
+    job = jobs.start(ArchiveJob(filename, files, analyzer_list, {"force_refresh": force_refresh},
+                                work_dir=temp_dir, project=project, commit=commit))
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "files": len(files),
+        "events": f"/jobs/{job.id}/events",
+        "result": f"/jobs/{job.id}",
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def job_result(job_id: str):
+    return get_job(job_id).summary()
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-sent events: one "result" event per analyzer ("file" per file for archives), then "done"."""
+    job = get_job(job_id)
+
+    async def stream():
+        async for event in job.subscribe():
+            yield f"event: {event.get('event', 'result')}\ndata: {json.dumps(event)}\n\n"
+        yield f"event: done\ndata: {json.dumps(job.summary())}\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @app.post("/analyze")
 async def analyze_code(
         file: UploadFile = File(...),
-        analyzers: str = Form(...)  # Receive analyzers as form data
+        analyzers: str = Form(...),  # Receive analyzers as form data
+        force_refresh: bool = Form(False)  # Ignore cached results and re-run every analyzer
 ):
+    """Synchronous form of /jobs: waits for the job, but only this request waits."""
     try:
-        # Validate file type
-        if not file.filename.endswith('.py'):
-            return JSONResponse(
-                status_code=400,
-                content={"error": "Only Python files are supported"}
-            )
-
-        # Parse analyzers from string to list
-        analyzer_list = json.loads(analyzers)
-
-        # Create temp directory for file
-        with tempfile.TemporaryDirectory() as temp_dir:
-            file_path = os.path.join(temp_dir, file.filename)
-
-            # Save uploaded file
-            with open(file_path, 'wb') as buffer:
-                shutil.copyfileobj(file.file, buffer)
-
-            results = {}
-            for analyzer in analyzer_list:
-                try:
-                    if analyzer == "pylint":
-                        result = subprocess.run(
-                            ["pylint", "--output-format=json", file_path],
-                            capture_output=True,
-                            text=True,
-                            timeout=30
-                        )
-                        results["pylint"] = {"raw": result.stdout or result.stderr}
-
-                    elif analyzer == "flake8":
-                        result = subprocess.run(
-                            ["flake8", file_path],
-                            capture_output=True,
-                            text=True,
-                            timeout=30
-                        )
-                        results["flake8"] = {"raw": result.stdout or result.stderr}
-
-                    elif analyzer == "radon":
-                        cc_result = subprocess.run(
-                            ["radon", "cc", "-j", file_path],
-                            capture_output=True,
-                            text=True,
-                            timeout=30
-                        )
-                        mi_result = subprocess.run(
-                            ["radon", "mi", "-j", file_path],
-                            capture_output=True,
-                            text=True,
-                            timeout=30
-                        )
-                        results["radon"] = {
-                            "raw": f"Complexity:\n{cc_result.stdout}\nMaintainability:\n{mi_result.stdout}"
-                        }
-
-                    elif analyzer == "bandit":
-                        result = subprocess.run(
-                            ["bandit", "-f", "json", "-r", file_path],
-                            capture_output=True,
-                            text=True,
-                            timeout=30
-                        )
-                        results["bandit"] = {"raw": result.stdout or result.stderr}
-
-                except subprocess.TimeoutExpired:
-                    results[analyzer] = {"error": f"{analyzer} analysis timed out"}
-                except Exception as e:
-                    results[analyzer] = {"error": str(e)}
-
+        job = await jobs.wait(await submit_upload(file, analyzers, force_refresh))
         return {
             "timestamp": datetime.now().isoformat(),
-            "filename": file.filename,
-            "results": results
+            "filename": job.filename,
+            "results": job.results
         }
 
+    except HTTPException as e:
+        return JSONResponse(
+            status_code=e.status_code,
+            content={"error": e.detail}
+        )
     except Exception as e:
         return JSONResponse(
             status_code=500,
@@ -111,6 +218,29 @@ async def analyze_code(
         )
 
 
+@app.get("/history/runs")
+async def history_runs(project: str, limit: int = 20):
+    return await asyncio.to_thread(get_results_store().runs, project, limit)
+
+
+@app.get("/history/new-issues")
+async def history_new_issues(project: str):
+    """Issues of the project's latest run that its previous run did not have."""
+    return await asyncio.to_thread(get_results_store().new_issues, project)
+
+
+@app.get("/history/modules")
+async def history_modules(project: str, last_runs: int = 20):
+    """Issue count per module for each of the last runs."""
+    return await asyncio.to_thread(get_results_store().counts_by_module, project, last_runs)
+
+
+@app.get("/history/regressions")
+async def history_regressions(project: str, limit: int = 10):
+    """Files whose issue count grew the most in the latest run."""
+    return await asyncio.to_thread(get_results_store().top_regressions, project, limit)
+
+
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
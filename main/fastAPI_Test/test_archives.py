@@ -0,0 +1,74 @@
+import asyncio
+import hashlib
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from main.fastAPI_Test import archives
+from main.fastAPI_Test.archives import ArchiveError, archive_format, extract_stream
+
+MEMBERS = {
+    "pkg/__init__.py": b"",
+    "pkg/module.py": b"def f():\n    return 1\n" * 1000,
+    "README.md": b"not python",
+    "../escape.py": b"x = 1\n",
+}
+
+
+def tar_gz(members):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def zipped(members):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return buffer.getvalue()
+
+
+async def body(data, chunk_size=1000):
+    for start in range(0, len(data), chunk_size):
+        await asyncio.sleep(0)
+        yield data[start:start + chunk_size]
+
+
+@pytest.mark.parametrize("build, archive_type", [(tar_gz, "tar"), (zipped, "zip")])
+def test_extracts_python_files_with_hashes(tmp_path, build, archive_type):
+    files = asyncio.run(extract_stream(body(build(MEMBERS)), archive_type, str(tmp_path)))
+
+    assert sorted(files) == ["pkg/__init__.py", "pkg/module.py"]
+    path, digest = files["pkg/module.py"]
+    with open(path, "rb") as f:
+        assert f.read() == MEMBERS["pkg/module.py"]
+    assert digest == hashlib.sha256(MEMBERS["pkg/module.py"]).hexdigest()
+    assert not (tmp_path / "escape.py").exists()
+
+
+def test_upload_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(archives, "MAX_ARCHIVE_BYTES", 2000)
+    data = tar_gz({"big.py": os.urandom(1000), "other.py": os.urandom(1000)})
+    with pytest.raises(ArchiveError):
+        asyncio.run(extract_stream(body(data, chunk_size=500), "tar", str(tmp_path)))
+
+
+def test_invalid_archive(tmp_path):
+    with pytest.raises(ArchiveError):
+        asyncio.run(extract_stream(body(b"not a tar file" * 100), "tar", str(tmp_path)))
+    with pytest.raises(ArchiveError):
+        asyncio.run(extract_stream(body(b"not a zip file"), "zip", str(tmp_path)))
+
+
+def test_archive_format():
+    assert archive_format("project.TAR.GZ") == "tar"
+    assert archive_format("project.zip") == "zip"
+    assert archive_format("module.py") is None
@@ -0,0 +1,101 @@
+import asyncio
+import subprocess
+import threading
+import time
+
+from main.fastAPI_Test.jobs import ArchiveJob, JobManager
+
+
+def test_results_stream_as_each_analyzer_finishes(tmp_path):
+    delays = {"slow": 0.3, "fast": 0.0}
+
+    def runner(analyzer, file_path):
+        time.sleep(delays[analyzer])
+        return {"raw": f"{analyzer}:{file_path}"}
+
+    async def scenario():
+        manager = JobManager(runner, max_concurrency=2)
+        job = manager.submit("m.py", "m.py", ["slow", "fast"], work_dir=str(tmp_path))
+        events = [event async for event in job.subscribe()]
+        return job, events
+
+    job, events = asyncio.run(scenario())
+    assert [event["analyzer"] for event in events] == ["fast", "slow"]
+    assert job.summary()["status"] == "completed"
+    assert job.results == {"slow": {"raw": "slow:m.py"}, "fast": {"raw": "fast:m.py"}}
+    assert not tmp_path.exists()
+
+
+def test_semaphore_bounds_concurrency_across_jobs():
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def runner(analyzer, file_path):
+        with lock:
+            running.append(analyzer)
+            peak.append(len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(analyzer)
+        return {"raw": ""}
+
+    async def scenario():
+        manager = JobManager(runner, max_concurrency=2)
+        submitted = [manager.submit(f"{n}.py", f"{n}.py", ["a", "b", "c"]) for n in range(3)]
+        return [await manager.wait(job) for job in submitted]
+
+    finished = asyncio.run(scenario())
+    assert all(len(job.results) == 3 for job in finished)
+    assert max(peak) == 2
+
+
+def test_event_loop_stays_responsive_and_errors_are_reported():
+    def runner(analyzer, file_path, force_refresh=False):
+        if analyzer == "timeout":
+            raise subprocess.TimeoutExpired(analyzer, 1)
+        time.sleep(0.3)
+        return {"raw": str(force_refresh)}
+
+    async def scenario():
+        manager = JobManager(runner, max_concurrency=1)
+        job = manager.submit("m.py", "m.py", ["timeout", "pylint"], {"force_refresh": True})
+        started = time.monotonic()
+        await asyncio.sleep(0.05)
+        # The blocking runner is in a thread, so the loop answered the sleep on time
+        lag = time.monotonic() - started
+        await manager.wait(job)
+        return job, lag
+
+    job, lag = asyncio.run(scenario())
+    assert lag < 0.2
+    assert job.results == {"timeout": {"error": "timeout analysis timed out"}, "pylint": {"raw": "True"}}
+
+
+def test_finished_jobs_expire():
+    async def scenario():
+        manager = JobManager(lambda analyzer, file_path: {"raw": ""}, ttl=0)
+        job = manager.submit("m.py", "m.py", ["a"])
+        await manager.wait(job)
+        manager.expire()
+        return manager.get(job.id)
+
+    assert asyncio.run(scenario()) is None
+
+
+def test_archive_job_streams_one_event_per_file():
+    def runner(analyzer, file_path, content_hash):
+        return {"raw": f"{analyzer}:{content_hash}"}
+
+    async def scenario():
+        manager = JobManager(runner, max_concurrency=2)
+        files = {"a.py": ("/src/a.py", "ha"), "pkg/b.py": ("/src/pkg/b.py", "hb")}
+        job = manager.start(ArchiveJob("project.zip", files, ["pylint", "flake8"]))
+        events = [event async for event in job.subscribe()]
+        return job, events
+
+    job, events = asyncio.run(scenario())
+    assert sorted(event["file"] for event in events) == ["a.py", "pkg/b.py"]
+    assert all(event["event"] == "file" for event in events)
+    assert job.results["pkg/b.py"] == {"pylint": {"raw": "pylint:hb"}, "flake8": {"raw": "flake8:hb"}}
+    assert job.summary()["completed"] == 2
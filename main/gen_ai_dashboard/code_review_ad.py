@@ -1,160 +1,303 @@
 import sys
 import subprocess
-import json
 import os
 import re
+import signal
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, CancelledError, as_completed
 from datetime import datetime
 from typing import Dict, List, Optional
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QLabel, QTextEdit, QFileDialog, QComboBox, QProgressBar,
+    QLabel, QFileDialog, QComboBox, QProgressBar,
     QTreeWidget, QTreeWidgetItem, QGroupBox, QCheckBox, QSpinBox,
-    QTabWidget, QMessageBox, QSplitter, QGridLayout
+    QTabWidget, QMessageBox, QSplitter, QGridLayout, QLineEdit
 )
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
-from PyQt5.QtGui import QFont, QColor, QSyntaxHighlighter, QTextCharFormat
+from PyQt5.QtGui import QFont
+
+from main.CodeReview.analysis_cache import file_digest, get_analysis_cache
+from main.CodeReview.analyzer_outputs import ANALYZER_COMMANDS, parse_outputs
+from main.CodeReview.analyzer_pool import JobCancelled, get_analyzer_pool
+from main.CodeReview.code_preview import LazyCodePreview
+from main.CodeReview.highlight_engine import PYTHON_ENGINE
+from main.CodeReview.project_review import changed_findings, collect_changes
+from main.CodeReview.results_store import get_results_store, git_head
+from main.CodeReview.syntax_highlighter import RegexHighlighter
+
+
+# Per-tool wall-clock limit (seconds); the process is killed when it runs over
+ANALYZER_TIMEOUT = 60
+
+# Line number in a result row: "path:12:", "line": 12 / "line_number": 12, or a leading "12: "
+LINE_REFERENCE = re.compile(r':(\d+):|"(?:line|line_number|lineno)":\s*(\d+)|^(\d+):')
+
+
+class AnalysisCancelled(Exception):
+    pass
 
 
 class CodeAnalyzerWorker(QThread):
     progress = pyqtSignal(int)
+    tool_result = pyqtSignal(str, dict)
     result = pyqtSignal(dict)
     error = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    # Checkbox name -> (result key, runner method)
+    ANALYZERS = {
+        "Pylint": ("pylint", "run_pylint"),
+        "Flake8": ("flake8", "run_flake8"),
+        "Radon": ("radon", "run_radon"),
+        "Bandit": ("bandit", "run_bandit"),
+        "Mypy": ("mypy", "run_mypy"),
+        "Vulture": ("vulture", "run_vulture"),
+    }
+
+    # Shared with the FastAPI service, so both store the same results in the analysis cache
+    ANALYZER_COMMANDS = ANALYZER_COMMANDS
 
     def __init__(self, file_path: str, analysis_types: List[str], options: Dict):
         super().__init__()
         self.file_path = file_path
         self.analysis_types = analysis_types
         self.options = options
+        self.timeout = options.get('timeout', ANALYZER_TIMEOUT)
+        # The analyzers are separate processes, so threads only wait on them; bound them by core count
+        self.max_workers = options.get('max_workers') or os.cpu_count() or 1
+        self._cancel_event = threading.Event()
+        self._processes = set()
+        self._processes_lock = threading.Lock()
+        self._futures = []
+        # Unchanged files are answered from the shared analysis cache unless a refresh is forced
+        self.cache = get_analysis_cache() if options.get('use_cache', True) else None
+        self.force_refresh = options.get('force_refresh', False)
+        # Warm analyzer processes; with use_pool=False every tool is a fresh subprocess
+        self.pool = get_analyzer_pool() if options.get('use_pool', True) else None
+        # Completed runs are kept for trend queries (new issues, regressions)
+        self.history = get_results_store() if options.get('record_history', True) else None
 
     def run(self):
         try:
             results = {}
-            total_steps = len(self.analysis_types)
-            current_step = 0
-
-            for analysis_type in self.analysis_types:
-                if analysis_type == "Pylint":
-                    results['pylint'] = self.run_pylint()
-                elif analysis_type == "Flake8":
-                    results['flake8'] = self.run_flake8()
-                elif analysis_type == "Radon":
-                    results['radon'] = self.run_radon()
-                elif analysis_type == "Bandit":
-                    results['bandit'] = self.run_bandit()
-                elif analysis_type == "Mypy":
-                    results['mypy'] = self.run_mypy()
-                elif analysis_type == "Vulture":
-                    results['vulture'] = self.run_vulture()
-
-                current_step += 1
-                self.progress.emit(int((current_step / total_steps) * 100))
-
-            self.result.emit(results)
+            analyzers = [self.ANALYZERS[name] for name in self.analysis_types if name in self.ANALYZERS]
+            total_steps = len(analyzers)
+            if not total_steps:
+                self.result.emit(results)
+                return
+
+            content_hash = file_digest(self.file_path) if self.cache else None
+
+            # Tools run side by side; results and progress are reported in completion order
+            executor = ThreadPoolExecutor(max_workers=min(self.max_workers, total_steps))
+            try:
+                futures = {executor.submit(self.run_analyzer, key, method, self.file_path, content_hash): key
+                           for key, method in analyzers}
+                self._futures = list(futures)
+                if self._cancel_event.is_set():
+                    self.cancel()
+                for future in as_completed(futures):
+                    key = futures[future]
+                    tool_result = self.future_result(future, key)
+                    if tool_result is None:
+                        continue
+
+                    results[key] = tool_result
+                    self.tool_result.emit(key, tool_result)
+                    self.progress.emit(int((len(results) / total_steps) * 100))
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+            if self._cancel_event.is_set():
+                self.cancelled.emit()
+            else:
+                self.record_history(os.path.abspath(self.file_path), {os.path.basename(self.file_path): results})
+                self.result.emit(results)
 
         except Exception as e:
             self.error.emit(str(e))
 
-    def run_pylint(self) -> Dict:
-        cmd = ["pylint", "--output-format=json", self.file_path]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+    def record_history(self, project: str, file_results: Dict[str, Dict[str, Dict]]):
+        """Store the run in the results history; the analysis itself never fails because of it."""
+        if self.history is None:
+            return
         try:
-            return {'data': json.loads(result.stdout), 'raw': result.stdout}
-        except json.JSONDecodeError:
-            return {'data': None, 'raw': result.stdout}
+            self.history.record_run(project, file_results, git_head(project))
+        except sqlite3.Error:
+            pass
 
-    def run_flake8(self) -> Dict:
-        cmd = ["flake8", "--format=json", self.file_path]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+    def future_result(self, future, key: str) -> Optional[Dict]:
+        """A finished tool's result, with timeouts and crashes turned into error results; None if cancelled."""
         try:
-            return {'data': json.loads(result.stdout), 'raw': result.stdout}
-        except json.JSONDecodeError:
-            return {'data': None, 'raw': result.stdout}
-
-    def run_radon(self) -> Dict:
-        cc_result = subprocess.run(["radon", "cc", "-j", self.file_path], capture_output=True, text=True)
-        mi_result = subprocess.run(["radon", "mi", "-j", self.file_path], capture_output=True, text=True)
-
+            return future.result()
+        except (AnalysisCancelled, CancelledError):
+            return None
+        except subprocess.TimeoutExpired:
+            return {'data': None, 'raw': f"{key} timed out after {self.timeout}s", 'error': 'timeout'}
+        except Exception as e:
+            return {'data': None, 'raw': f"{key} failed: {e}", 'error': str(e)}
+
+    def cancel(self):
+        """Stop the analysis: queued tools never start, running ones are killed."""
+        self._cancel_event.set()
+        for future in self._futures:
+            future.cancel()
+        with self._processes_lock:
+            for process in self._processes:
+                self.kill_process(process)
+
+    @staticmethod
+    def kill_process(process):
+        # Tools may fork helpers that keep the pipes open; on POSIX each tool leads its own process group
+        if os.name == 'posix':
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        else:
+            process.kill()
+
+    def run_analyzer(self, key: str, method: str, file_path: str, content_hash: Optional[str]) -> Dict:
+        if self.cache is None:
+            return getattr(self, method)(file_path)
+        return self.cache.fetch(content_hash, key, self.ANALYZER_COMMANDS[key],
+                                lambda: getattr(self, method)(file_path), force_refresh=self.force_refresh,
+                                file_path=file_path)
+
+    def commands(self, key: str, file_path: str) -> List[List[str]]:
+        return [cmd + [file_path] for cmd in self.ANALYZER_COMMANDS[key]]
+
+    def run_commands(self, key: str, file_path: str) -> List[str]:
+        """stdout of each of the tool's commands, from a warm pool worker when available."""
+        if self.pool is None:
+            return self.run_processes(*self.commands(key, file_path))
         try:
-            return {
-                'complexity': json.loads(cc_result.stdout),
-                'maintainability': json.loads(mi_result.stdout),
-                'raw': f"Complexity:\n{cc_result.stdout}\nMaintainability:\n{mi_result.stdout}"
-            }
-        except json.JSONDecodeError:
-            return {'data': None, 'raw': f"{cc_result.stdout}\n{mi_result.stdout}"}
-
-    def run_bandit(self) -> Dict:
-        cmd = ["bandit", "-f", "json", "-r", self.file_path]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+            return self.pool.run(self.ANALYZER_COMMANDS[key], file_path, self.timeout, self._cancel_event)
+        except JobCancelled:
+            raise AnalysisCancelled()
+
+    def run_processes(self, *cmds) -> List[str]:
+        """Start all cmds at once and return their stdout; raises TimeoutExpired or AnalysisCancelled."""
+        if self._cancel_event.is_set():
+            raise AnalysisCancelled()
+        processes = []
         try:
-            return {'data': json.loads(result.stdout), 'raw': result.stdout}
-        except json.JSONDecodeError:
-            return {'data': None, 'raw': result.stdout}
+            for cmd in cmds:
+                process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                                           start_new_session=(os.name == 'posix'))
+                with self._processes_lock:
+                    self._processes.add(process)
+                processes.append(process)
+                # cancel() may have run between Popen and registration
+                if self._cancel_event.is_set():
+                    self.kill_process(process)
+
+            deadline = time.monotonic() + self.timeout
+            outputs = []
+            for process in processes:
+                stdout, _ = process.communicate(timeout=max(0, deadline - time.monotonic()))
+                outputs.append(stdout)
+        except subprocess.TimeoutExpired:
+            for process in processes:
+                self.kill_process(process)
+                process.communicate()
+            raise
+        finally:
+            with self._processes_lock:
+                self._processes.difference_update(processes)
+
+        if self._cancel_event.is_set():
+            raise AnalysisCancelled()
+        return outputs
+
+    def run_pylint(self, file_path: str) -> Dict:
+        return parse_outputs("pylint", self.run_commands("pylint", file_path))
+
+    def run_flake8(self, file_path: str) -> Dict:
+        return parse_outputs("flake8", self.run_commands("flake8", file_path))
+
+    def run_radon(self, file_path: str) -> Dict:
+        return parse_outputs("radon", self.run_commands("radon", file_path))
+
+    def run_bandit(self, file_path: str) -> Dict:
+        return parse_outputs("bandit", self.run_commands("bandit", file_path))
+
+    def run_mypy(self, file_path: str) -> Dict:
+        return parse_outputs("mypy", self.run_commands("mypy", file_path))
+
+    def run_vulture(self, file_path: str) -> Dict:
+        return parse_outputs("vulture", self.run_commands("vulture", file_path))
+
+
+class ProjectAnalyzerWorker(CodeAnalyzerWorker):
+    """Reviews the Python files changed since base_ref; the report keeps only findings on changed lines."""
+    file_result = pyqtSignal(str, dict)
+
+    def __init__(self, repo_root: str, base_ref: str, analysis_types: List[str], options: Dict):
+        super().__init__(repo_root, analysis_types, options)
+        self.repo_root = repo_root
+        self.base_ref = base_ref
 
-    def run_mypy(self) -> Dict:
-        cmd = ["mypy", "--json", self.file_path]
-        result = subprocess.run(cmd, capture_output=True, text=True)
+    def run(self):
         try:
-            return {'data': json.loads(result.stdout), 'raw': result.stdout}
-        except json.JSONDecodeError:
-            return {'data': None, 'raw': result.stdout}
+            changes = collect_changes(self.repo_root, self.base_ref)
+            analyzers = [self.ANALYZERS[name] for name in self.analysis_types if name in self.ANALYZERS]
+            report = {'repo_root': self.repo_root, 'base_ref': self.base_ref, 'files': {}}
+            total_steps = len(changes) * len(analyzers)
+            if not total_steps:
+                self.result.emit(report)
+                return
+
+            file_results = {path: {} for path in changes}
+            completed = 0
+            # Every (file, tool) pair is one job; the pool bounds how many run at once
+            executor = ThreadPoolExecutor(max_workers=min(self.max_workers, total_steps))
+            try:
+                futures = {}
+                for path in changes:
+                    file_path = os.path.join(self.repo_root, path)
+                    content_hash = file_digest(file_path) if self.cache else None
+                    for key, method in analyzers:
+                        future = executor.submit(self.run_analyzer, key, method, file_path, content_hash)
+                        futures[future] = (path, key)
+                self._futures = list(futures)
+                if self._cancel_event.is_set():
+                    self.cancel()
+                for future in as_completed(futures):
+                    path, key = futures[future]
+                    tool_result = self.future_result(future, key)
+                    if tool_result is None:
+                        continue
+
+                    file_results[path][key] = tool_result
+                    completed += 1
+                    self.progress.emit(int((completed / total_steps) * 100))
+                    if len(file_results[path]) == len(analyzers):
+                        findings = changed_findings(file_results[path], changes[path])
+                        report['files'][path] = findings
+                        self.file_result.emit(path, findings)
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+            if self._cancel_event.is_set():
+                self.cancelled.emit()
+            else:
+                self.record_history(self.repo_root, file_results)
+                self.result.emit(report)
 
-    def run_vulture(self) -> Dict:
-        cmd = ["vulture", self.file_path]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        return {'data': None, 'raw': result.stdout}
+        except Exception as e:
+            self.error.emit(str(e))
 
 
-class PythonSyntaxHighlighter(QSyntaxHighlighter):
+class PythonSyntaxHighlighter(RegexHighlighter):
     def __init__(self, parent=None):
-        super().__init__(parent)
-        self.highlighting_rules = []
-
-        # Keywords
-        keyword_format = QTextCharFormat()
-        keyword_format.setForeground(QColor("#CC7832"))
-        keywords = [
-            'and', 'assert', 'break', 'class', 'continue', 'def',
-            'del', 'elif', 'else', 'except', 'False', 'finally',
-            'for', 'from', 'global', 'if', 'import', 'in',
-            'is', 'lambda', 'None', 'not', 'or', 'pass',
-            'raise', 'return', 'True', 'try', 'while', 'with',
-            'yield'
-        ]
-        self.add_keywords(keywords, keyword_format)
-
-        # String literals
-        string_format = QTextCharFormat()
-        string_format.setForeground(QColor("#6A8759"))
-        self.highlighting_rules.append((
-            r'"[^"\\]*(\\.[^"\\]*)*"',
-            string_format
-        ))
-        self.highlighting_rules.append((
-            r"'[^'\\]*(\\.[^'\\]*)*'",
-            string_format
-        ))
-
-        # Comments
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(QColor("#808080"))
-        self.highlighting_rules.append((
-            r'#[^\n]*',
-            comment_format
-        ))
-
-    def add_keywords(self, keywords, format):
-        for word in keywords:
-            pattern = rf'\b{word}\b'
-            self.highlighting_rules.append((pattern, format))
-
-    def highlightBlock(self, text):
-        for pattern, format in self.highlighting_rules:
-            expression = re.compile(pattern)
-            for match in expression.finditer(text):
-                start = match.start()
-                length = match.end() - start
-                self.setFormat(start, length, format)
+        super().__init__(PYTHON_ENGINE, {
+            'keyword': "#CC7832",
+            'string': "#6A8759",
+            'comment': "#808080",
+        }, parent)
 
 
 class CodeReviewTool(QWidget):
@@ -199,6 +342,26 @@ class CodeReviewTool(QWidget):
         file_group.setLayout(file_layout)
         controls_layout.addWidget(file_group)
 
+        # Project review group: analyze only the files changed since a base ref
+        project_group = QGroupBox("Project Review (git diff)")
+        project_layout = QGridLayout()
+
+        self.repo_label = QLabel("No repository selected")
+        self.select_repo_button = QPushButton("Choose Repository")
+        self.select_repo_button.clicked.connect(self.open_repo_dialog)
+        self.base_ref_input = QLineEdit("main")
+        self.base_ref_input.setPlaceholderText("Base ref, e.g. main or origin/main")
+        self.review_changes_button = QPushButton("Review Changes")
+        self.review_changes_button.clicked.connect(self.run_project_review)
+
+        project_layout.addWidget(self.repo_label, 0, 0)
+        project_layout.addWidget(self.select_repo_button, 0, 1)
+        project_layout.addWidget(QLabel("Base ref:"), 1, 0)
+        project_layout.addWidget(self.base_ref_input, 1, 1)
+        project_layout.addWidget(self.review_changes_button, 2, 0, 1, 2)
+        project_group.setLayout(project_layout)
+        controls_layout.addWidget(project_group)
+
         # Analysis options group
         options_group = QGroupBox("Analysis Options")
         options_layout = QGridLayout()
@@ -208,19 +371,32 @@ class CodeReviewTool(QWidget):
             "Pylint": QCheckBox("Pylint"),
             "Flake8": QCheckBox("Flake8"),
             "Radon": QCheckBox("Radon (Complexity)"),
-            "Bandit": QCheckBox("Bandit (Security)")
+            "Bandit": QCheckBox("Bandit (Security)"),
+            "Mypy": QCheckBox("Mypy (Types)"),
+            "Vulture": QCheckBox("Vulture (Dead Code)")
         }
 
         row = 0
         col = 0
-        for check in self.analyzer_checks.values():
-            check.setChecked(True)
+        for name, check in self.analyzer_checks.items():
+            check.setChecked(name not in ("Mypy", "Vulture"))
             options_layout.addWidget(check, row, col)
             col += 1
             if col > 1:
                 col = 0
                 row += 1
 
+        # Per-tool timeout
+        options_layout.addWidget(QLabel("Timeout per tool (s):"), row + 1, 0)
+        self.timeout_spin = QSpinBox()
+        self.timeout_spin.setRange(5, 600)
+        self.timeout_spin.setValue(ANALYZER_TIMEOUT)
+        options_layout.addWidget(self.timeout_spin, row + 1, 1)
+
+        # Re-run every tool even when the file is unchanged since its cached analysis
+        self.force_refresh_check = QCheckBox("Force refresh (ignore cache)")
+        options_layout.addWidget(self.force_refresh_check, row + 2, 0, 1, 2)
+
         options_group.setLayout(options_layout)
         controls_layout.addWidget(options_group)
 
@@ -236,14 +412,20 @@ class CodeReviewTool(QWidget):
         # Results tree
         self.result_tree = QTreeWidget()
         self.result_tree.setHeaderLabels(["Tool", "Message"])
+        # Double-clicking a finding opens its line in the preview
+        self.result_tree.itemDoubleClicked.connect(self.jump_to_result)
         self.tabs.addTab(self.result_tree, "Results")
 
-        # Code preview
-        self.code_preview = QTextEdit()
-        self.code_preview.setReadOnly(True)
+        # Code preview; only the visible part of the file is loaded and highlighted
+        self.code_preview = LazyCodePreview()
         self.code_preview.setFont(QFont("Consolas", 10))
         self.tabs.addTab(self.code_preview, "Code Preview")
 
+        # Trends from the results history of the file or repository last analyzed
+        self.trend_tree = QTreeWidget()
+        self.trend_tree.setHeaderLabels(["Trend", "Details"])
+        self.tabs.addTab(self.trend_tree, "Trends")
+
         main_layout.addWidget(self.tabs)
 
         # Bottom controls
@@ -263,11 +445,16 @@ class CodeReviewTool(QWidget):
             }
         """)
 
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.clicked.connect(self.cancel_analysis)
+        self.cancel_button.setEnabled(False)
+
         self.save_button = QPushButton("Save Results")
         self.save_button.clicked.connect(self.save_results)
         self.save_button.setEnabled(False)
 
         bottom_layout.addWidget(self.run_button)
+        bottom_layout.addWidget(self.cancel_button)
         bottom_layout.addWidget(self.save_button)
         main_layout.addLayout(bottom_layout)
 
@@ -288,24 +475,46 @@ class CodeReviewTool(QWidget):
             self.file_label.setText(f"Selected: {os.path.basename(file)}")
             self.load_file_preview()
 
-    def load_file_preview(self):
+    def open_repo_dialog(self):
+        directory = QFileDialog.getExistingDirectory(self, "Select repository")
+        if directory:
+            self.repo_root = directory
+            self.repo_label.setText(f"Repository: {os.path.basename(directory)}")
+
+    def load_file_preview(self, path=None):
         try:
-            with open(self.file_path, 'r') as file:
-                content = file.read()
-                self.code_preview.setText(content)
+            self.code_preview.load(path or self.file_path)
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to load file: {str(e)}")
 
+    def jump_to_result(self, item, column):
+        match = LINE_REFERENCE.search(item.text(1))
+        if match is None:
+            return
+        line = int(next(group for group in match.groups() if group))
+
+        # Project review rows sit under file -> tool items; single-file rows under a tool item
+        tool_item = item.parent()
+        file_item = tool_item.parent() if tool_item is not None else None
+        if file_item is not None and hasattr(self, 'repo_root'):
+            path = os.path.join(self.repo_root, file_item.text(0))
+        elif hasattr(self, 'file_path'):
+            path = self.file_path
+        else:
+            return
+        current = self.code_preview.index
+        if current is None or os.path.abspath(current.path) != os.path.abspath(path):
+            self.load_file_preview(path)
+        self.tabs.setCurrentWidget(self.code_preview)
+        self.code_preview.goto_line(line)
+
     def run_analysis(self):
         if not hasattr(self, 'file_path'):
             QMessageBox.warning(self, "File Error", "Please select a Python file first.")
             return
 
         # Get selected analyzers
-        selected_analyzers = [
-            name for name, check in self.analyzer_checks.items()
-            if check.isChecked()
-        ]
+        selected_analyzers = self.selected_analyzers()
 
         if not selected_analyzers:
             QMessageBox.warning(self, "Selection Error", "Please select at least one analyzer.")
@@ -320,37 +529,156 @@ class CodeReviewTool(QWidget):
         self.analyzer_thread = CodeAnalyzerWorker(
             self.file_path,
             selected_analyzers,
-            {}
+            {'timeout': self.timeout_spin.value(), 'force_refresh': self.force_refresh_check.isChecked()}
         )
         self.analyzer_thread.progress.connect(self.update_progress)
+        self.analyzer_thread.tool_result.connect(self.add_tool_result)
         self.analyzer_thread.result.connect(self.handle_results)
         self.analyzer_thread.error.connect(self.handle_error)
+        self.analyzer_thread.cancelled.connect(self.handle_cancelled)
         self.analyzer_thread.start()
         self.run_button.setEnabled(False)
+        self.review_changes_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+
+    def selected_analyzers(self):
+        return [name for name, check in self.analyzer_checks.items() if check.isChecked()]
+
+    def run_project_review(self):
+        if not hasattr(self, 'repo_root'):
+            QMessageBox.warning(self, "Repository Error", "Please select a git repository first.")
+            return
+        base_ref = self.base_ref_input.text().strip()
+        if not base_ref:
+            QMessageBox.warning(self, "Base Ref Error", "Please enter a base ref to diff against.")
+            return
+        if not self.selected_analyzers():
+            QMessageBox.warning(self, "Selection Error", "Please select at least one analyzer.")
+            return
+
+        self.result_tree.clear()
+        self.progress_bar.setValue(0)
+        self.save_button.setEnabled(False)
+
+        self.analyzer_thread = ProjectAnalyzerWorker(
+            self.repo_root,
+            base_ref,
+            self.selected_analyzers(),
+            {'timeout': self.timeout_spin.value(), 'force_refresh': self.force_refresh_check.isChecked()}
+        )
+        self.analyzer_thread.progress.connect(self.update_progress)
+        self.analyzer_thread.file_result.connect(self.add_file_findings)
+        self.analyzer_thread.result.connect(self.handle_project_results)
+        self.analyzer_thread.error.connect(self.handle_error)
+        self.analyzer_thread.cancelled.connect(self.handle_cancelled)
+        self.analyzer_thread.start()
+        self.run_button.setEnabled(False)
+        self.review_changes_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
+
+    def add_file_findings(self, path, findings):
+        """One changed file: its findings on changed lines, grouped by tool."""
+        if not findings:
+            return
+        file_item = QTreeWidgetItem([path])
+        self.result_tree.addTopLevelItem(file_item)
+        for tool, messages in findings.items():
+            tool_item = QTreeWidgetItem(file_item, [tool])
+            for finding in messages:
+                QTreeWidgetItem(tool_item, ['', f"{finding['line']}: {finding['message']}"])
+        file_item.setExpanded(True)
+
+    def handle_project_results(self, report):
+        self.run_button.setEnabled(True)
+        self.review_changes_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        self.save_button.setEnabled(True)
+        self.report_subject = f"{report['repo_root']} (changes since {report['base_ref']})"
+        # Same shape as single-file results so save_results can write it
+        self.current_results = {
+            f"{path} [{tool}]": {'raw': "\n".join(f"{f['line']}: {f['message']}" for f in messages)}
+            for path, findings in report['files'].items() for tool, messages in findings.items()
+        }
+        self.show_trends(report['repo_root'])
+        flagged = sum(1 for findings in report['files'].values() if findings)
+        QMessageBox.information(
+            self, "Complete",
+            f"Reviewed {len(report['files'])} changed files; {flagged} have findings on changed lines."
+        )
+
+    def show_trends(self, project):
+        self.trend_tree.clear()
+        try:
+            store = get_results_store()
+            new_issues = store.new_issues(project)
+            regressions = store.top_regressions(project)
+            module_counts = store.counts_by_module(project, last_runs=10)
+        except sqlite3.Error as e:
+            QTreeWidgetItem(self.trend_tree, ["History unavailable", str(e)])
+            return
+
+        new_item = QTreeWidgetItem(self.trend_tree, [f"New since last run ({len(new_issues)})"])
+        for issue in new_issues:
+            QTreeWidgetItem(new_item, [f"{issue['file']}:{issue['line']}",
+                                       f"[{issue['tool']} {issue['code']}] {issue['message']}"])
+
+        regression_item = QTreeWidgetItem(self.trend_tree, ["Top regressing files"])
+        for regression in regressions:
+            QTreeWidgetItem(regression_item, [regression['file'],
+                                              f"+{regression['delta']} ({regression['previous']} -> {regression['issues']})"])
+
+        # One row per module: its issue counts over the last runs, oldest first
+        runs = list(dict.fromkeys(row['run_id'] for row in module_counts))
+        history = {}
+        for row in module_counts:
+            history.setdefault(row['module'], {})[row['run_id']] = row['issues']
+        module_item = QTreeWidgetItem(self.trend_tree, ["Issues by module (last 10 runs)"])
+        for module, counts in sorted(history.items()):
+            QTreeWidgetItem(module_item, [module, " -> ".join(str(counts.get(run_id, 0)) for run_id in runs)])
+
+        for item in (new_item, regression_item, module_item):
+            item.setExpanded(True)
+
+    def cancel_analysis(self):
+        if self.analyzer_thread and self.analyzer_thread.isRunning():
+            self.cancel_button.setEnabled(False)
+            self.analyzer_thread.cancel()
 
     def update_progress(self, value):
         self.progress_bar.setValue(value)
 
+    def add_tool_result(self, tool, result):
+        """Show one analyzer's output as soon as it finishes."""
+        tool_item = QTreeWidgetItem([f"{tool} (cached)" if result.get('cached') else tool])
+        self.result_tree.addTopLevelItem(tool_item)
+
+        # Add result details
+        result_text = result.get('raw', 'No output')
+        for line in result_text.split('\n'):
+            if line.strip():
+                QTreeWidgetItem(tool_item, ['', line.strip()])
+        tool_item.setExpanded(True)
+
     def handle_results(self, results):
         self.run_button.setEnabled(True)
+        self.review_changes_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
         self.save_button.setEnabled(True)
+        self.report_subject = self.file_path
         self.current_results = results
-
-        for tool, result in results.items():
-            tool_item = QTreeWidgetItem([tool])
-            self.result_tree.addTopLevelItem(tool_item)
-
-            # Add result details
-            result_text = result.get('raw', 'No output')
-            for line in result_text.split('\n'):
-                if line.strip():
-                    QTreeWidgetItem(tool_item, ['', line.strip()])
-
-        self.result_tree.expandAll()
+        self.show_trends(os.path.abspath(self.file_path))
         QMessageBox.information(self, "Complete", "Analysis completed successfully!")
 
+    def handle_cancelled(self):
+        self.run_button.setEnabled(True)
+        self.review_changes_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
+        QMessageBox.information(self, "Cancelled", "Analysis cancelled.")
+
     def handle_error(self, error_msg):
         self.run_button.setEnabled(True)
+        self.review_changes_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
         QMessageBox.critical(self, "Error", f"Analysis failed: {error_msg}")
 
     def save_results(self):
@@ -370,7 +698,7 @@ class CodeReviewTool(QWidget):
                 with open(filename, 'w') as f:
                     f.write(f"Code Review Report\n")
                     f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    f.write(f"File analyzed: {self.file_path}\n\n")
+                    f.write(f"File analyzed: {self.report_subject}\n\n")
 
                     for tool, result in self.current_results.items():
                         f.write(f"\n=== {tool} Analysis ===\n")
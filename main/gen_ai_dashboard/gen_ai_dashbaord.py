@@ -9,13 +9,13 @@ from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont, QColor
 
 # Import all the tool classes
-from pom_generator import POMGenerator
-from api_automation_capabality import APITestGenerator
-from intelligent_script_refactoring_ad import ScriptRefactoringTool
-from code_review_ad import CodeReviewTool
-from chatbot import ChatbotUI
-from environment_health_check_ad import HealthCheckApp
-from code_generator import TestScriptGenerator
+from main.gen_ai_dashboard.pom_generator import POMGenerator
+from main.gen_ai_dashboard.api_automation_capabality import APITestGenerator
+from main.gen_ai_dashboard.intelligent_script_refactoring_ad import ScriptRefactoringTool
+from main.gen_ai_dashboard.code_review_ad import CodeReviewTool
+from main.gen_ai_dashboard.chatbot import ChatbotUI
+from main.gen_ai_dashboard.environment_health_check_ad import HealthCheckApp
+from main.gen_ai_dashboard.code_generator import TestScriptGenerator
 
 
 
@@ -0,0 +1,109 @@
+from lxml import html
+from lxml.cssselect import CSSSelector
+from lxml.etree import XPathError
+from cssselect import SelectorError
+from selenium.common.exceptions import NoSuchElementException, InvalidSelectorException
+
+
+class DomElement:
+    """Minimal WebElement stand-in backed by an lxml node. Two wrappers of the same node compare equal."""
+
+    def __init__(self, node):
+        self.node = node
+
+    def __eq__(self, other):
+        return isinstance(other, DomElement) and other.node is self.node
+
+    def __hash__(self):
+        return id(self.node)
+
+    @property
+    def tag_name(self):
+        return self.node.tag
+
+    @property
+    def text(self):
+        return " ".join(self.node.text_content().split())
+
+    def get_attribute(self, name):
+        return self.node.get(name)
+
+    def is_displayed(self):
+        return True
+
+    def click(self):
+        pass
+
+    def send_keys(self, *keys):
+        pass
+
+    def clear(self):
+        pass
+
+
+class DomDriver:
+    """
+    In-process WebDriver stub over a static HTML snapshot.
+
+    Implements the parts of the Selenium API the healing code uses (find_element(s) with every
+    By strategy, current_url, screenshots, quit) so healing strategies can be replayed without a browser.
+    """
+
+    def __init__(self, page_source, url="about:blank"):
+        self.tree = html.fromstring(page_source)
+        self.current_url = url
+        self.css_cache = {}
+
+    @classmethod
+    def from_file(cls, path, url="about:blank"):
+        with open(path, 'rb') as f:
+            return cls(f.read(), url)
+
+    @property
+    def page_source(self):
+        return html.tostring(self.tree, encoding="unicode")
+
+    def get(self, url):
+        self.current_url = url
+
+    def find_elements(self, by, value):
+        try:
+            if by == "id":
+                nodes = self.tree.xpath("//*[@id=$value]", value=value)
+            elif by == "name":
+                nodes = self.tree.xpath("//*[@name=$value]", value=value)
+            elif by == "class name":
+                nodes = self.tree.xpath(
+                    "//*[contains(concat(' ', normalize-space(@class), ' '), concat(' ', $value, ' '))]", value=value)
+            elif by == "tag name":
+                nodes = self.tree.xpath(f"//{value}")
+            elif by == "link text":
+                nodes = self.tree.xpath("//a[normalize-space(.)=$value]", value=value)
+            elif by == "partial link text":
+                nodes = self.tree.xpath("//a[contains(., $value)]", value=value)
+            elif by == "css selector":
+                if value not in self.css_cache:
+                    self.css_cache[value] = CSSSelector(value)
+                nodes = self.css_cache[value](self.tree)
+            elif by == "xpath":
+                nodes = self.tree.xpath(value)
+            else:
+                raise InvalidSelectorException(f"Unsupported locator strategy: {by}")
+        except (XPathError, SelectorError) as e:
+            raise InvalidSelectorException(f"Invalid {by} selector {value!r}: {e}")
+        return [DomElement(node) for node in nodes if isinstance(node, html.HtmlElement)]
+
+    def find_element(self, by, value):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"Unable to locate element: {{\"method\":\"{by}\",\"selector\":\"{value}\"}}")
+        return elements[0]
+
+    def get_screenshot_as_png(self):
+        return b""
+
+    def get_screenshot_as_base64(self):
+        return ""
+
+    def quit(self):
+        pass
@@ -0,0 +1,254 @@
+"""
+Offline healing benchmark.
+
+Replays every healing strategy in the repo against before/after DOM snapshot pairs using the
+in-process DomDriver instead of a browser, and reports heal rate, false-heal rate and time per heal.
+
+Manifest format (paths are relative to the manifest):
+
+    {
+      "cases": [
+        {
+          "name": "login",
+          "url": "https://acme-test.uipath.com/login",
+          "old": "snapshots/login_v1.html",
+          "new": "snapshots/login_v2.html",
+          "locators": {
+            "login_button": {
+              "by": "id", "value": "loginButton",
+              "alternatives": [["css_selector", "button[type='submit']"]],
+              "expected": ["css_selector", "#signInButton"]
+            }
+          }
+        }
+      ]
+    }
+
+"by" uses the LocatorManager names (id, name, css_selector, xpath, class_name, link_text, ...).
+"expected" locates the correct element in the new snapshot; when omitted the element carrying
+data-heal-id="<locator name>" is used. "alternatives" feed find_element_with_healing.
+
+Needs lxml and cssselect for DomDriver (see requirements.txt) but no browser.
+
+Usage (from the repository root):
+    python -m main.healing_replay.replay_benchmark manifest.json [--strategies heal_locator,locator_manager] [--output results.json]
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import tempfile
+import time
+
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.support.ui import WebDriverWait
+
+from main.healing_replay.dom_driver import DomDriver
+from main.Self_healing.healing_metrics import healing_metrics
+from main.Self_healing.locator_store import LocatorStore
+
+# LocatorManager-style names -> Selenium By values
+BY_VALUES = {
+    "id": "id",
+    "name": "name",
+    "css_selector": "css selector",
+    "xpath": "xpath",
+    "class_name": "class name",
+    "tag_name": "tag name",
+    "link_text": "link text",
+    "partial_link_text": "partial link text",
+}
+
+
+class HealLocatorStrategy:
+    """Healenium heal_locator: primary -> healed locator from DB -> dynamic healing."""
+    name = "heal_locator"
+    TYPES = {"css_selector": "css"}
+
+    def __init__(self, workdir):
+        # Imported on first use: healenium pulls in PyQt5 and opens ./locators.db on import, and
+        # run_strategy has already chdir'ed into the work dir
+        self.module = importlib.import_module("main.Healenium.healenium")
+        self.module.init_db()
+        self.module.init_history_db("locators.db")
+
+    def learn(self, driver, key, spec):
+        self.module.heal_locator(driver, key, self.TYPES.get(spec["by"], spec["by"]), spec["value"])
+
+    def heal(self, driver, key, spec):
+        return self.module.heal_locator(driver, key, self.TYPES.get(spec["by"], spec["by"]), spec["value"])
+
+
+class LocatorManagerStrategy:
+    """LocatorManager.find_element: stored primary -> generated fallbacks, rewritten on success."""
+    name = "locator_manager"
+
+    def __init__(self, workdir):
+        module = importlib.import_module("main.self_healing_test_automation.generate_fall_back_locators")
+        # Skip __init__, which starts Chrome; the DB lives in the benchmark's work dir
+        self.manager = module.LocatorManager.__new__(module.LocatorManager)
+        self.manager.store = LocatorStore(os.path.join(workdir, "locator_manager.db"))
+
+    def _use(self, driver):
+        self.manager.driver = driver
+        self.manager.wait = WebDriverWait(driver, 0)
+
+    def learn(self, driver, key, spec):
+        self._use(driver)
+        self.manager.find_element(key, f"{spec['by']}={spec['value']}")
+
+    def heal(self, driver, key, spec):
+        self._use(driver)
+        return self.manager.find_element(key, f"{spec['by']}={spec['value']}")
+
+
+class FindElementWithHealingStrategy:
+    """SelfHealingLoginTest.find_element_with_healing: fixed list of alternative locators."""
+    name = "find_element_with_healing"
+
+    def __init__(self, workdir):
+        module = importlib.import_module("main.self_healing_test_automation.dynamic_locators")
+        self.test = module.SelfHealingLoginTest.__new__(module.SelfHealingLoginTest)
+        self.test.locator_mapping = {}
+
+    def learn(self, driver, key, spec):
+        locators = [(spec["by"], spec["value"])] + [tuple(a) for a in spec.get("alternatives", [])]
+        self.test.locator_mapping[key] = [(BY_VALUES[by], value) for by, value in locators]
+
+    def heal(self, driver, key, spec):
+        self.test.driver = driver
+        return self.test.find_element_with_healing(key)
+
+
+STRATEGIES = {
+    strategy.name: strategy
+    for strategy in (HealLocatorStrategy, LocatorManagerStrategy, FindElementWithHealingStrategy)
+}
+
+
+def _find_or_none(driver, by, value):
+    try:
+        return driver.find_element(by, value)
+    except NoSuchElementException:
+        return None
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def load_cases(manifest_path):
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    cases = []
+    for case in manifest["cases"]:
+        url = case.get("url", "about:blank")
+        cases.append({
+            "name": case["name"],
+            "old_path": os.path.join(base_dir, case["old"]),
+            "new_path": os.path.join(base_dir, case["new"]),
+            "url": url,
+            "locators": case["locators"],
+        })
+    return cases
+
+
+def run_strategy(strategy_class, cases):
+    """Learn every locator on the old snapshots, then time healing on the new ones."""
+    outcomes = {"unchanged": 0, "healed": 0, "false_heal": 0, "missed": 0, "correct_miss": 0, "error": 0}
+    heal_times_ms = []
+    details = []
+    healing_metrics.reset()
+
+    with tempfile.TemporaryDirectory() as workdir, contextlib.chdir(workdir), \
+            contextlib.redirect_stdout(io.StringIO()):
+        strategy = strategy_class(workdir)
+        for case in cases:
+            old_driver = DomDriver.from_file(case["old_path"], case["url"])
+            new_driver = DomDriver.from_file(case["new_path"], case["url"])
+            for element_name, spec in case["locators"].items():
+                key = f"{case['name']}/{element_name}"
+                try:
+                    strategy.learn(old_driver, key, spec)
+                except Exception:
+                    pass  # Learning only seeds stored state; a failure here shows up in the heal step
+
+                expected_by, expected_value = spec.get("expected", ("css_selector", f"[data-heal-id='{element_name}']"))
+                expected = _find_or_none(new_driver, BY_VALUES[expected_by], expected_value)
+                primary_broken = _find_or_none(new_driver, BY_VALUES[spec["by"]], spec["value"]) != expected
+
+                started = time.perf_counter()
+                try:
+                    found = strategy.heal(new_driver, key, spec)
+                    error = None
+                except NoSuchElementException:
+                    found, error = None, None
+                except Exception as e:
+                    found, error = None, f"{type(e).__name__}: {e}"
+                elapsed_ms = (time.perf_counter() - started) * 1000
+
+                if error:
+                    outcome = "error"
+                elif found is None:
+                    outcome = "missed" if expected is not None else "correct_miss"
+                elif found == expected:
+                    outcome = "healed" if primary_broken else "unchanged"
+                else:
+                    outcome = "false_heal"
+                outcomes[outcome] += 1
+                if primary_broken:
+                    heal_times_ms.append(elapsed_ms)
+                details.append({"element": key, "outcome": outcome, "primary_broken": primary_broken,
+                                "time_ms": elapsed_ms, "error": error})
+
+    broken = sum(1 for detail in details if detail["primary_broken"])
+    return {
+        "elements": len(details),
+        "broken": broken,
+        **outcomes,
+        "heal_rate": outcomes["healed"] / broken if broken else 0.0,
+        "false_heal_rate": outcomes["false_heal"] / broken if broken else 0.0,
+        "avg_heal_ms": sum(heal_times_ms) / len(heal_times_ms) if heal_times_ms else 0.0,
+        "p95_heal_ms": _percentile(heal_times_ms, 0.95),
+        "max_heal_ms": max(heal_times_ms, default=0.0),
+        "inner_strategies": healing_metrics.snapshot()["strategies"],
+        "details": details,
+    }
+
+
+def run_benchmark(manifest_path, strategy_names=None, include_details=False):
+    cases = load_cases(manifest_path)
+    results = {}
+    for name in strategy_names or STRATEGIES:
+        result = run_strategy(STRATEGIES[name], cases)
+        if not include_details:
+            result.pop("details")
+        results[name] = result
+    return {"manifest": os.path.abspath(manifest_path), "strategies": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay healing strategies against DOM snapshot pairs.")
+    parser.add_argument("manifest", help="JSON manifest of snapshot pairs and locators")
+    parser.add_argument("--strategies", help=f"Comma-separated subset of: {', '.join(STRATEGIES)}")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--details", action="store_true", help="Include per-element outcomes")
+    args = parser.parse_args()
+
+    strategy_names = args.strategies.split(",") if args.strategies else None
+    report = json.dumps(run_benchmark(args.manifest, strategy_names, args.details), indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+import os
+
+import pytest
+
+pytest.importorskip("lxml")
+pytest.importorskip("cssselect")
+pytest.importorskip("selenium")
+
+from main.healing_replay.replay_benchmark import run_benchmark  # noqa: E402
+
+SAMPLE_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "samples", "manifest.json")
+
+
+def assert_smoke(strategy):
+    result = run_benchmark(SAMPLE_MANIFEST, [strategy], include_details=True)["strategies"][strategy]
+    outcomes = ("unchanged", "healed", "false_heal", "missed", "correct_miss", "error")
+    assert result["elements"] == 5
+    assert sum(result[outcome] for outcome in outcomes) == 5
+    assert result["error"] == 0, [detail["error"] for detail in result["details"] if detail["error"]]
+    assert result["broken"] > 0
+    assert 0.0 <= result["heal_rate"] <= 1.0
+    assert result["max_heal_ms"] >= result["avg_heal_ms"] >= 0.0
+
+
+@pytest.mark.parametrize("strategy", ["locator_manager", "find_element_with_healing"])
+def test_sample_manifest_smoke(strategy):
+    assert_smoke(strategy)
+
+
+def test_sample_manifest_smoke_heal_locator():
+    # main.Healenium.healenium imports PyQt5 at module level
+    pytest.importorskip("PyQt5")
+    assert_smoke("heal_locator")
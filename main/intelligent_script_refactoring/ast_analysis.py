@@ -0,0 +1,257 @@
+# ast_analysis.py
+"""
+Single-pass static analysis for the script refactoring tools.
+
+CodeAnalysisVisitor walks a module's AST once and collects, per function and class, everything
+CodeAnalyzerWorker reports: cyclomatic complexity, nesting depth, parameter count, class methods
+and instance attributes, imports, and the code smells derived from them. Each node is visited
+exactly once, so analysis time is linear in the size of the tree. Scopes are tracked with a stack,
+so a nested function's branches count towards that function only, not towards every enclosing one.
+
+Complexity follows McCabe as counted by radon: 1 per function, +1 per if/elif, conditional
+expression, for/while loop, except handler, comprehension (and each of its if clauses), match case
+and each extra operand of a boolean operator.
+"""
+import ast
+from typing import Dict, Optional
+
+LONG_METHOD_STATEMENTS = 15
+LARGE_CLASS_METHODS = 10
+MAX_NESTING_DEPTH = 4
+MAX_PARAMETERS = 5
+# God class: weighted methods per class (sum of method complexity) or instance attribute count
+GOD_CLASS_COMPLEXITY = 47
+GOD_CLASS_ATTRIBUTES = 15
+
+class _FunctionScope:
+    def __init__(self, node, qualname: str, class_scope: Optional["_ClassScope"]):
+        self.node = node
+        self.qualname = qualname
+        self.class_scope = class_scope
+        self.complexity = 1
+        self.depth = 0
+        self.max_depth = 0
+        args = node.args
+        names = [arg.arg for arg in args.posonlyargs + args.args + args.kwonlyargs]
+        names += [arg.arg for arg in (args.vararg, args.kwarg) if arg is not None]
+        # The receiver of a method is not part of its parameter list
+        self.self_name = names[0] if class_scope is not None and names and not _is_static(node) else None
+        self.parameters = len(names) - (1 if self.self_name else 0)
+
+
+class _ClassScope:
+    def __init__(self, node, qualname: str):
+        self.node = node
+        self.qualname = qualname
+        self.methods = 0
+        self.complexity = 0
+        self.attributes = set()
+
+
+def _is_static(node) -> bool:
+    return any(isinstance(decorator, ast.Name) and decorator.id == "staticmethod"
+               for decorator in node.decorator_list)
+
+
+class CodeAnalysisVisitor(ast.NodeVisitor):
+    def __init__(self):
+        self.functions = []
+        self.classes = []
+        self.imports = []
+        self.smells = []
+        # Innermost last; entries are _FunctionScope or _ClassScope
+        self.scopes = []
+
+    # Scopes
+
+    def _qualname(self, name: str) -> str:
+        return f"{self.scopes[-1].qualname}.{name}" if self.scopes else name
+
+    def _smell(self, smell_type: str, name: str, line: int, detail: str = ""):
+        smell = {'type': smell_type, 'name': name, 'line': line}
+        if detail:
+            smell['detail'] = detail
+        self.smells.append(smell)
+
+    def visit_FunctionDef(self, node):
+        parent = self.scopes[-1] if self.scopes else None
+        class_scope = parent if isinstance(parent, _ClassScope) else None
+        scope = _FunctionScope(node, self._qualname(node.name), class_scope)
+        if class_scope is not None:
+            class_scope.methods += 1
+
+        # Decorators and defaults belong to the enclosing scope
+        for expression in node.decorator_list + node.args.defaults + [d for d in node.args.kw_defaults if d]:
+            self.visit(expression)
+        self.scopes.append(scope)
+        for statement in node.body:
+            self.visit(statement)
+        self.scopes.pop()
+
+        if class_scope is not None:
+            class_scope.complexity += scope.complexity
+        self.functions.append({
+            'name': node.name,
+            'qualname': scope.qualname,
+            'complexity': scope.complexity,
+            'lines': node.lineno,
+            'end_line': getattr(node, 'end_lineno', node.lineno),
+            'parameters': scope.parameters,
+            'max_depth': scope.max_depth,
+        })
+        if len(node.body) > LONG_METHOD_STATEMENTS:
+            self._smell('long_method', node.name, node.lineno, f"{len(node.body)} statements")
+        if scope.max_depth > MAX_NESTING_DEPTH:
+            self._smell('deep_nesting', node.name, node.lineno, f"nesting depth {scope.max_depth}")
+        if scope.parameters > MAX_PARAMETERS:
+            self._smell('long_parameter_list', node.name, node.lineno, f"{scope.parameters} parameters")
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_ClassDef(self, node):
+        for expression in node.decorator_list + node.bases + [keyword.value for keyword in node.keywords]:
+            self.visit(expression)
+        scope = _ClassScope(node, self._qualname(node.name))
+        self.scopes.append(scope)
+        for statement in node.body:
+            self.visit(statement)
+        self.scopes.pop()
+
+        self.classes.append({
+            'name': node.name,
+            'qualname': scope.qualname,
+            'line': node.lineno,
+            'methods': scope.methods,
+            'attributes': len(scope.attributes),
+            'complexity': scope.complexity,
+        })
+        if scope.methods > LARGE_CLASS_METHODS:
+            self._smell('large_class', node.name, node.lineno, f"{scope.methods} methods")
+        if scope.complexity > GOD_CLASS_COMPLEXITY or len(scope.attributes) > GOD_CLASS_ATTRIBUTES:
+            self._smell('god_class', node.name, node.lineno,
+                        f"complexity {scope.complexity}, {len(scope.attributes)} attributes")
+
+    # Complexity and nesting
+
+    def _function(self) -> Optional[_FunctionScope]:
+        scope = self.scopes[-1] if self.scopes else None
+        return scope if isinstance(scope, _FunctionScope) else None
+
+    def _add_complexity(self, amount: int = 1):
+        scope = self._function()
+        if scope is not None:
+            scope.complexity += amount
+
+    def _visit_nested(self, statements):
+        """Visit the statements of a block one level deeper than the current one."""
+        if not statements:
+            return
+        scope = self._function()
+        if scope is not None:
+            scope.depth += 1
+            scope.max_depth = max(scope.max_depth, scope.depth)
+        for statement in statements:
+            self.visit(statement)
+        if scope is not None:
+            scope.depth -= 1
+
+    def visit_If(self, node):
+        self._add_complexity()
+        self.visit(node.test)
+        self._visit_nested(node.body)
+        if len(node.orelse) == 1 and isinstance(node.orelse[0], ast.If):
+            # elif continues the same chain at the same depth
+            self.visit(node.orelse[0])
+        else:
+            self._visit_nested(node.orelse)
+
+    def _visit_loop(self, node):
+        self._add_complexity()
+        for field in ('target', 'iter', 'test'):
+            if hasattr(node, field):
+                self.visit(getattr(node, field))
+        self._visit_nested(node.body)
+        self._visit_nested(node.orelse)
+
+    visit_For = visit_AsyncFor = visit_While = _visit_loop
+
+    def _visit_with(self, node):
+        for item in node.items:
+            self.visit(item)
+        self._visit_nested(node.body)
+
+    visit_With = visit_AsyncWith = _visit_with
+
+    def _visit_try(self, node):
+        self._visit_nested(node.body)
+        for handler in node.handlers:
+            self._add_complexity()
+            if handler.type is not None:
+                self.visit(handler.type)
+            self._visit_nested(handler.body)
+        self._visit_nested(node.orelse)
+        self._visit_nested(node.finalbody)
+
+    visit_Try = visit_TryStar = _visit_try
+
+    def visit_Match(self, node):
+        self.visit(node.subject)
+        for case in node.cases:
+            self._add_complexity()
+            self.visit(case.pattern)
+            if case.guard is not None:
+                self.visit(case.guard)
+            self._visit_nested(case.body)
+
+    def visit_IfExp(self, node):
+        self._add_complexity()
+        self.generic_visit(node)
+
+    def visit_BoolOp(self, node):
+        self._add_complexity(len(node.values) - 1)
+        self.generic_visit(node)
+
+    def visit_comprehension(self, node):
+        self._add_complexity(1 + len(node.ifs))
+        self.generic_visit(node)
+
+    # Classes' instance attributes and imports
+
+    def visit_Attribute(self, node):
+        scope = self._function()
+        if (scope is not None and scope.self_name and isinstance(node.ctx, ast.Store)
+                and isinstance(node.value, ast.Name) and node.value.id == scope.self_name):
+            scope.class_scope.attributes.add(node.attr)
+        self.generic_visit(node)
+
+    def visit_Import(self, node):
+        self.imports.extend(alias.name for alias in node.names)
+
+    def visit_ImportFrom(self, node):
+        prefix = "." * node.level + (f"{node.module}." if node.module else "")
+        self.imports.extend(prefix + alias.name for alias in node.names)
+
+
+def analyze_tree(tree: ast.AST) -> Dict:
+    """
+    Analyze a parsed module in one pass.
+
+    Returns:
+    - {'complexity': {'functions': [...], 'classes': [...], 'imports': [...]}, 'code_smells': [...]}
+      in the shape CodeAnalyzerWorker reports; functions and classes are listed in source order.
+    """
+    visitor = CodeAnalysisVisitor()
+    visitor.visit(tree)
+    # Scopes are recorded as they close (inner before outer); report them in source order
+    return {
+        'complexity': {
+            'functions': sorted(visitor.functions, key=lambda function: function['lines']),
+            'classes': sorted(visitor.classes, key=lambda cls: cls['line']),
+            'imports': visitor.imports,
+        },
+        'code_smells': sorted(visitor.smells, key=lambda smell: smell['line']),
+    }
+
+
+def analyze_source(source: str, filename: str = "<unknown>") -> Dict:
+    return analyze_tree(ast.parse(source, filename))
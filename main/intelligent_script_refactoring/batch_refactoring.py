@@ -0,0 +1,361 @@
+# batch_refactoring.py
+"""
+Project-wide refactoring: one set of refactorings over every Python file under a directory.
+
+plan() transforms the files in a pool of worker processes and changes nothing on disk; the
+resulting BatchPlan renders a unified diff for review and apply() writes the changed files. A file
+whose refactored text no longer compiles is reported as an error instead of a change.
+Workers read the file themselves and send back only what changed, so the parent never holds
+more than the changed files.
+
+The source-level refactorings edit the text rather than re-generating it from the AST, so comments
+and formatting outside the edited statements survive:
+- Remove Unused Imports: drops module-level imports whose bound name is never loaded, named in a
+  string annotation or listed in __all__; __future__ and star imports, imports marked "# noqa" and
+  __init__.py files (re-exports) are left alone.
+- Convert to Context Manager: gives classes that define close() but neither __enter__ nor
+  __exit__ an __enter__/__exit__ pair that delegates to close().
+- Sort Imports / Format with Black: isort and black, imported in the worker when first used.
+
+Refactorings run in REFACTORING_ORDER whatever order they were chosen in, so black formats the
+output of the others.
+"""
+import ast
+import difflib
+import importlib.util
+import multiprocessing
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+ENCODING = "utf-8"
+
+# Directories never descended into
+EXCLUDED_DIRS = {".git", ".hg", ".svn", "__pycache__", ".mypy_cache", ".pytest_cache", ".tox", ".nox",
+                 "venv", ".venv", "env", "build", "dist", "node_modules"}
+
+# "# noqa" or "# noqa: F401, ..." on any line of an import statement
+NOQA = re.compile(r"#\s*noqa\b", re.IGNORECASE)
+
+# Files sent to a worker at a time; amortises pickling round trips over many small files
+CHUNK_SIZE = 16
+
+
+class BatchRefactoringError(RuntimeError):
+    pass
+
+
+# Refactorings
+
+def _bound_name(alias: ast.alias, from_import: bool) -> str:
+    if alias.asname:
+        return alias.asname
+    # "import a.b.c" binds "a"
+    return alias.name if from_import else alias.name.split(".")[0]
+
+
+def _annotation(node: ast.AST) -> Optional[ast.AST]:
+    if isinstance(node, (ast.arg, ast.AnnAssign)):
+        return node.annotation
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        return node.returns
+    return None
+
+
+def _string_annotation_names(annotation: ast.AST) -> set:
+    """Names in the forward references of an annotation: "Path", List["Path"], "os.PathLike"."""
+    names = set()
+    for node in ast.walk(annotation):
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            try:
+                expression = ast.parse(node.value.strip(), mode="eval")
+            except SyntaxError:
+                continue
+            names.update(name.id for name in ast.walk(expression) if isinstance(name, ast.Name))
+    return names
+
+
+def _used_names(tree: ast.Module) -> set:
+    used = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            used.add(node.id)
+        elif _annotation(node) is not None:
+            used.update(_string_annotation_names(_annotation(node)))
+    for node in tree.body:
+        # Names exported through __all__ count as used
+        if (isinstance(node, ast.Assign) and any(isinstance(t, ast.Name) and t.id == "__all__" for t in node.targets)
+                and isinstance(node.value, (ast.List, ast.Tuple))):
+            used.update(e.value for e in node.value.elts if isinstance(e, ast.Constant) and isinstance(e.value, str))
+    return used
+
+
+def remove_unused_imports(source: str, filename: str = "<unknown>") -> str:
+    if os.path.basename(filename) == "__init__.py":
+        return source
+    tree = ast.parse(source, filename)
+    used = _used_names(tree)
+    lines = source.splitlines(keepends=True)
+    # Bottom-up, so earlier line numbers stay valid
+    for node in reversed(tree.body):
+        if not isinstance(node, (ast.Import, ast.ImportFrom)):
+            continue
+        from_import = isinstance(node, ast.ImportFrom)
+        if from_import and node.module == "__future__":
+            continue
+        kept = [alias for alias in node.names if alias.name == "*" or _bound_name(alias, from_import) in used]
+        if len(kept) == len(node.names):
+            continue
+        first, last = node.lineno - 1, node.end_lineno - 1
+        if any(NOQA.search(line) for line in lines[first:last + 1]):
+            continue
+        head = lines[first][:node.col_offset]
+        rest = lines[last][node.end_col_offset:].strip().lstrip(";").strip()
+        if head.strip() or rest and not rest.startswith("#"):
+            # Shares its line with another statement ("import os; x = 1"); leave it alone
+            continue
+        if kept:
+            node.names = kept
+            comment = "  " + rest if rest else ""
+            newline = "\r\n" if lines[last].endswith("\r\n") else "\n"
+            lines[first:last + 1] = [head + ast.unparse(node) + comment + newline]
+        else:
+            del lines[first:last + 1]
+    return "".join(lines)
+
+
+def add_context_manager(source: str, filename: str = "<unknown>") -> str:
+    tree = ast.parse(source, filename)
+    lines = source.splitlines(keepends=True)
+    classes = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.ClassDef):
+            continue
+        methods = {m.name for m in node.body if isinstance(m, (ast.FunctionDef, ast.AsyncFunctionDef))}
+        if "close" in methods and not methods & {"__enter__", "__exit__"}:
+            classes.append(node)
+    # Bottom-up; of two classes ending on the same line the outer one goes first, so the inner
+    # class's methods end up directly below its body
+    for node in sorted(classes, key=lambda cls: (-cls.end_lineno, cls.col_offset)):
+        # The body's own indentation text, so tab-indented classes stay tab-indented
+        body_line = lines[node.body[0].lineno - 1]
+        indent = body_line[:len(body_line) - len(body_line.lstrip())]
+        class_line = lines[node.lineno - 1]
+        step = indent[len(class_line) - len(class_line.lstrip()):] or "    "
+        newline = "\r\n" if lines[0].endswith("\r\n") else "\n"
+        methods = [
+            "", f"{indent}def __enter__(self):", f"{indent}{step}return self",
+            "", f"{indent}def __exit__(self, exc_type, exc_val, exc_tb):", f"{indent}{step}self.close()",
+            f"{indent}{step}return False",
+        ]
+        end = node.end_lineno
+        if not lines[end - 1].endswith("\n"):
+            lines[end - 1] += newline
+        lines[end:end] = [line + newline for line in methods]
+    return "".join(lines)
+
+
+def sort_imports(source: str, filename: str = "<unknown>") -> str:
+    import isort
+    return isort.code(source)
+
+
+def format_with_black(source: str, filename: str = "<unknown>") -> str:
+    import black
+    return black.format_str(source, mode=black.FileMode())
+
+
+REFACTORINGS: Dict[str, Tuple[Callable[[str, str], str], Optional[str]]] = {
+    # name: (function, module it needs)
+    "Remove Unused Imports": (remove_unused_imports, None),
+    "Convert to Context Manager": (add_context_manager, None),
+    "Sort Imports": (sort_imports, "isort"),
+    "Format with Black": (format_with_black, "black"),
+}
+REFACTORING_ORDER = list(REFACTORINGS)
+
+
+def refactor_source(source: str, refactorings: Iterable[str], filename: str = "<unknown>") -> str:
+    chosen = set(refactorings)
+    for name in REFACTORING_ORDER:
+        if name in chosen:
+            source = REFACTORINGS[name][0](source, filename)
+    return source
+
+
+def check_refactorings(refactorings: Iterable[str]):
+    """Raise BatchRefactoringError for unknown refactorings or ones whose tool is not installed."""
+    for name in refactorings:
+        if name not in REFACTORINGS:
+            raise BatchRefactoringError(f"Unknown refactoring: {name}")
+        module = REFACTORINGS[name][1]
+        if module and importlib.util.find_spec(module) is None:
+            raise BatchRefactoringError(f"{name} needs {module}, which is not installed")
+
+
+# Planning
+
+def find_python_files(root: str) -> List[str]:
+    found = []
+    for directory, subdirs, files in os.walk(root):
+        subdirs[:] = sorted(d for d in subdirs if d not in EXCLUDED_DIRS and not d.endswith(".egg-info"))
+        found.extend(os.path.join(directory, name) for name in sorted(files) if name.endswith(".py"))
+    return found
+
+
+def _stat_key(path: str) -> Tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _refactor_file(job):
+    """Worker: (path, refactorings) -> (path, stat key, original, refactored, error); texts only if changed."""
+    path, refactorings = job
+    try:
+        key = _stat_key(path)
+        # newline="" keeps the file's line endings
+        with open(path, "r", encoding=ENCODING, newline="") as file:
+            original = file.read()
+        refactored = refactor_source(original, refactorings, path)
+    except Exception as e:
+        return path, None, None, None, f"{type(e).__name__}: {e}"
+    if refactored == original:
+        return path, key, None, None, None
+    try:
+        compile(refactored, path, "exec")
+    except (SyntaxError, ValueError) as e:
+        return path, None, None, None, f"Refactoring produced invalid code: {type(e).__name__}: {e}"
+    return path, key, original, refactored, None
+
+
+class FileChange:
+    def __init__(self, path: str, original: str, refactored: str, stat_key: Tuple[int, int]):
+        self.path = path
+        self.original = original
+        self.refactored = refactored
+        self.stat_key = stat_key
+
+    def diff(self, root: str = "") -> str:
+        name = os.path.relpath(self.path, root).replace(os.sep, "/") if root else self.path
+        return "".join(difflib.unified_diff(
+            self.original.splitlines(keepends=True), self.refactored.splitlines(keepends=True),
+            fromfile=f"a/{name}", tofile=f"b/{name}"))
+
+
+class BatchPlan:
+    def __init__(self, root: str, refactorings: List[str]):
+        self.root = root
+        self.refactorings = refactorings
+        self.files = 0
+        self.changes: List[FileChange] = []
+        # (path, message) for files that could not be read or parsed
+        self.errors: List[Tuple[str, str]] = []
+
+    def diff(self) -> str:
+        return "".join(change.diff(self.root) for change in self.changes)
+
+    def apply(self, journal=None) -> List[str]:
+        """
+        Write every change, or none of them.
+
+        All new contents are written to temporary files next to their targets first; nothing is
+        replaced if any target changed since the plan was made or any temporary file could not be
+        written. The targets are then swapped in with os.replace (atomic per file); if a swap fails,
+        the files already replaced are restored. Returns the paths written.
+
+        With a RefactoringJournal, the batch is recorded as one undoable operation before the first
+        file is replaced, so a crash half-way is rolled back when the journal is next opened.
+        """
+        for change in self.changes:
+            try:
+                changed = _stat_key(change.path) != change.stat_key
+            except FileNotFoundError as e:
+                raise BatchRefactoringError(f"{change.path} was deleted since the preview; preview again") from e
+            if changed:
+                raise BatchRefactoringError(f"{change.path} changed since the preview; preview again")
+
+        staged = []
+        try:
+            for change in self.changes:
+                try:
+                    staged.append((change, _write_temp(change.path, change.refactored)))
+                except OSError as e:
+                    raise BatchRefactoringError(f"Failed to stage {change.path}, none changed: {e}") from e
+            operation_id = journal.begin(", ".join(self.refactorings), {
+                change.path: (change.original, change.refactored) for change in self.changes}) if journal else None
+            replaced = []
+            try:
+                for change, temp_path in staged:
+                    os.replace(temp_path, change.path)
+                    replaced.append(change)
+            except OSError as e:
+                for change in replaced:
+                    os.replace(_write_temp(change.path, change.original), change.path)
+                if journal:
+                    journal.discard(operation_id)
+                raise BatchRefactoringError(f"Failed to write {len(self.changes)} files, none changed: {e}") from e
+            if journal:
+                journal.commit(operation_id)
+        finally:
+            for _, temp_path in staged:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+        return [change.path for change in self.changes]
+
+
+def _write_temp(path: str, text: str) -> str:
+    directory, name = os.path.split(path)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory or ".")
+    try:
+        with os.fdopen(fd, "w", encoding=ENCODING, newline="") as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        shutil.copymode(path, temp_path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return temp_path
+
+
+def plan(root: str, refactorings: Iterable[str], workers: Optional[int] = None,
+         progress: Optional[Callable[[int, int], None]] = None) -> BatchPlan:
+    """
+    Refactor every Python file under root in memory.
+
+    Parameters:
+    - refactorings: Names from REFACTORINGS; applied in REFACTORING_ORDER.
+    - workers: Worker processes (default: one per CPU); 1 runs in this process.
+    - progress: Called with (files done, total files).
+
+    Returns:
+    - A BatchPlan holding the files that would change and the ones that failed.
+    """
+    refactorings = list(refactorings)
+    check_refactorings(refactorings)
+    refactorings = [name for name in REFACTORING_ORDER if name in refactorings]
+    batch = BatchPlan(root, refactorings)
+    paths = find_python_files(root)
+    batch.files = len(paths)
+    jobs = [(path, refactorings) for path in paths]
+    workers = min(workers or os.cpu_count() or 1, max(1, len(jobs) // CHUNK_SIZE))
+
+    def collect(results):
+        for done, (path, key, original, refactored, error) in enumerate(results, 1):
+            if error:
+                batch.errors.append((path, error))
+            elif refactored is not None:
+                batch.changes.append(FileChange(path, original, refactored, key))
+            if progress:
+                progress(done, len(jobs))
+
+    if workers <= 1:
+        collect(map(_refactor_file, jobs))
+    else:
+        # fork() from a process that already runs Qt threads is unsafe
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            collect(executor.map(_refactor_file, jobs, chunksize=CHUNK_SIZE))
+    return batch
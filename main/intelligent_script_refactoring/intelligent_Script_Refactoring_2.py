@@ -3,13 +3,13 @@ import sys
 import subprocess
 import tempfile
 import os
-from typing import List, Dict
+import re
 import astunparse
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
     QLabel, QTextEdit, QFileDialog, QListWidget, QMessageBox,
     QProgressBar, QSpinBox, QComboBox, QGroupBox, QGridLayout,
-    QSplitter, QTreeWidget, QTreeWidgetItem, QCheckBox
+    QSplitter, QTreeWidget, QTreeWidgetItem, QCheckBox, QDialog, QPlainTextEdit
 )
 from PyQt5.QtCore import Qt, QThread, pyqtSignal
 from PyQt5.QtGui import QFont, QIcon
@@ -20,6 +20,16 @@ from rope.base.project import Project
 from rope.refactor.rename import Rename
 from rope.refactor.extract import ExtractMethod
 
+from main.CodeReview.code_preview import LazyCodePreview
+from main.CodeReview.parse_cache import get_parse_cache
+from main.intelligent_script_refactoring.ast_analysis import analyze_tree
+from main.intelligent_script_refactoring.batch_refactoring import REFACTORING_ORDER, plan
+from main.intelligent_script_refactoring.refactoring_journal import get_journal
+from main.intelligent_script_refactoring.rope_projects import find_project_root
+
+# Line a result row points at: "path:12:..." (pylint) or "... at line 12" (code smells)
+LINE_REFERENCE = re.compile(r':(\d+):|\bline (\d+)')
+
 
 class CodeAnalyzerWorker(QThread):
     finished = pyqtSignal(dict)
@@ -39,16 +49,12 @@ class CodeAnalyzerWorker(QThread):
             results['pylint'] = result.stdout
             self.progress.emit(33)
 
-            # Run additional static analysis
-            with open(self.file_path, 'r') as file:
-                tree = ast.parse(file.read())
-
-            # Analyze code complexity
-            results['complexity'] = self.analyze_complexity(tree)
+            # Run additional static analysis; an unchanged file is not parsed again
+            tree = get_parse_cache().tree(self.file_path)
             self.progress.emit(66)
 
-            # Find code smells
-            results['code_smells'] = self.detect_code_smells(tree)
+            # Complexity, classes, imports and code smells in one pass over the tree
+            results.update(analyze_tree(tree))
             self.progress.emit(100)
 
         except Exception as e:
@@ -56,69 +62,30 @@ class CodeAnalyzerWorker(QThread):
 
         self.finished.emit(results)
 
-    def analyze_complexity(self, tree) -> Dict:
-        complexity_info = {
-            'functions': [],
-            'classes': [],
-            'imports': []
-        }
-
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                complexity = self.calculate_cyclomatic_complexity(node)
-                complexity_info['functions'].append({
-                    'name': node.name,
-                    'complexity': complexity,
-                    'lines': node.lineno
-                })
-            elif isinstance(node, ast.ClassDef):
-                complexity_info['classes'].append({
-                    'name': node.name,
-                    'methods': len([n for n in node.body if isinstance(n, ast.FunctionDef)])
-                })
-            elif isinstance(node, (ast.Import, ast.ImportFrom)):
-                complexity_info['imports'].append(str(node.names[0].name))
-
-        return complexity_info
-
-    def calculate_cyclomatic_complexity(self, node) -> int:
-        complexity = 1
-        for child in ast.walk(node):
-            if isinstance(child, (ast.If, ast.While, ast.For, ast.And, ast.Or)):
-                complexity += 1
-        return complexity
-
-    def detect_code_smells(self, tree) -> List[Dict]:
-        smells = []
-
-        for node in ast.walk(tree):
-            # Long method detection
-            if isinstance(node, ast.FunctionDef):
-                if len(node.body) > 15:
-                    smells.append({
-                        'type': 'long_method',
-                        'name': node.name,
-                        'line': node.lineno
-                    })
-
-            # Large class detection
-            elif isinstance(node, ast.ClassDef):
-                method_count = len([n for n in node.body if isinstance(n, ast.FunctionDef)])
-                if method_count > 10:
-                    smells.append({
-                        'type': 'large_class',
-                        'name': node.name,
-                        'line': node.lineno
-                    })
-
-        return smells
+
+class BatchRefactoringWorker(QThread):
+    # Emits the BatchPlan, or the error message if planning failed
+    finished = pyqtSignal(object)
+    progress = pyqtSignal(int)
+
+    def __init__(self, root, refactorings):
+        super().__init__()
+        self.root = root
+        self.refactorings = refactorings
+
+    def run(self):
+        try:
+            batch = plan(self.root, self.refactorings,
+                         progress=lambda done, total: self.progress.emit(done * 100 // total))
+        except Exception as e:
+            batch = str(e)
+        self.finished.emit(batch)
 
 
 class ScriptRefactoringTool(QWidget):
     def __init__(self):
         super().__init__()
         self.analyzer_thread = None
-        self.refactoring_history = []
         self.initUI()
 
     def initUI(self):
@@ -218,11 +185,43 @@ class ScriptRefactoringTool(QWidget):
             }
         """)
 
+        # Undo and redo go through the project's refactoring history
+        history_layout = QHBoxLayout()
+        self.undo_button = QPushButton("Undo")
+        self.undo_button.clicked.connect(self.undo_last_refactoring)
+        self.redo_button = QPushButton("Redo")
+        self.redo_button.clicked.connect(self.redo_refactoring)
+        history_layout.addWidget(self.undo_button)
+        history_layout.addWidget(self.redo_button)
+        self.update_history_buttons()
+
         refactor_layout.addWidget(self.refactoring_type)
         refactor_layout.addWidget(self.refactor_button)
+        refactor_layout.addLayout(history_layout)
         refactor_group.setLayout(refactor_layout)
         left_panel.addWidget(refactor_group)
 
+        # Batch refactoring over a whole folder
+        batch_group = QGroupBox("Batch Refactoring")
+        batch_layout = QVBoxLayout()
+
+        self.batch_dir_label = QLabel("No folder selected")
+        self.select_dir_button = QPushButton("Choose Folder")
+        self.select_dir_button.clicked.connect(self.open_dir_dialog)
+        batch_layout.addWidget(self.batch_dir_label)
+        batch_layout.addWidget(self.select_dir_button)
+
+        self.batch_checks = {}
+        for name in REFACTORING_ORDER:
+            self.batch_checks[name] = QCheckBox(name)
+            batch_layout.addWidget(self.batch_checks[name])
+
+        self.batch_button = QPushButton("Preview Batch Changes")
+        self.batch_button.clicked.connect(self.preview_batch_refactoring)
+        batch_layout.addWidget(self.batch_button)
+        batch_group.setLayout(batch_layout)
+        left_panel.addWidget(batch_group)
+
         # Add left panel to main layout
         main_layout.addLayout(left_panel, stretch=1)
 
@@ -233,11 +232,11 @@ class ScriptRefactoringTool(QWidget):
         self.results_tree = QTreeWidget()
         self.results_tree.setHeaderLabels(["Analysis Results"])
         self.results_tree.setFont(QFont("Consolas", 10))
+        self.results_tree.itemDoubleClicked.connect(self.jump_to_result)
         right_panel.addWidget(self.results_tree)
 
-        # Code preview
-        self.code_preview = QTextEdit()
-        self.code_preview.setReadOnly(True)
+        # Code preview; only the visible part of the file is loaded and highlighted
+        self.code_preview = LazyCodePreview()
         self.code_preview.setFont(QFont("Consolas", 10))
         self.code_preview.setStyleSheet("""
             QTextEdit {
@@ -267,15 +266,20 @@ class ScriptRefactoringTool(QWidget):
             self.file_path = file
             self.file_label.setText(f"Selected: {os.path.basename(file)}")
             self.load_file_preview()
+            self.update_history_buttons()
 
     def load_file_preview(self):
         try:
-            with open(self.file_path, 'r') as file:
-                content = file.read()
-                self.code_preview.setText(content)
+            self.code_preview.load(self.file_path)
         except Exception as e:
             QMessageBox.warning(self, "Error", f"Failed to load file: {str(e)}")
 
+    def jump_to_result(self, item, column):
+        """Show the line a result row refers to ("path:12:..." or "... at line 12")."""
+        match = LINE_REFERENCE.search(item.text(0))
+        if match and hasattr(self, 'file_path'):
+            self.code_preview.goto_line(int(match.group(1) or match.group(2)))
+
     def analyze_code(self):
         if not hasattr(self, 'file_path'):
             QMessageBox.warning(self, "File Error", "Please select a Python file first.")
@@ -323,6 +327,8 @@ class ScriptRefactoringTool(QWidget):
 
         for smell in results['code_smells']:
             smell_text = f"{smell['type']} in {smell['name']} at line {smell['line']}"
+            if 'detail' in smell:
+                smell_text += f" ({smell['detail']})"
             QTreeWidgetItem(smells_item, [smell_text])
 
         self.results_tree.expandAll()
@@ -349,32 +355,157 @@ class ScriptRefactoringTool(QWidget):
                                     f"Refactoring type '{refactoring_type}' is not yet implemented.")
                 return
 
-            # Create backup
-            backup_path = f"{self.file_path}.bak"
-            with open(backup_path, 'w') as file:
-                file.write(source_code)
-
-            # Save refactored code
-            with open(self.file_path, 'w') as file:
-                file.write(refactored_code)
+            # Save refactored code; the project's refactoring history can undo it
+            self.journal_for(self.file_path).write(refactoring_type, {self.file_path: refactored_code})
 
             # Update preview
-            self.code_preview.setText(refactored_code)
+            self.code_preview.load(self.file_path)
+            self.update_history_buttons()
 
-            # Add to history
-            self.refactoring_history.append({
-                'type': refactoring_type,
-                'backup': backup_path
-            })
-
-            QMessageBox.information(self, "Success",
-                                    f"Applied {refactoring_type} successfully.\nBackup saved as {backup_path}")
+            QMessageBox.information(self, "Success", f"Applied {refactoring_type} successfully.")
 
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to apply refactoring: {str(e)}")
 
+    def open_dir_dialog(self):
+        directory = QFileDialog.getExistingDirectory(self, "Select project folder")
+        if directory:
+            self.batch_root = directory
+            self.batch_dir_label.setText(f"Selected: {directory}")
+            self.update_history_buttons()
+
+    def preview_batch_refactoring(self):
+        if not hasattr(self, 'batch_root'):
+            QMessageBox.warning(self, "Folder Error", "Please select a folder first.")
+            return
+        refactorings = [name for name, check in self.batch_checks.items() if check.isChecked()]
+        if not refactorings:
+            QMessageBox.warning(self, "Batch Refactoring", "Please select at least one refactoring.")
+            return
+
+        self.progress_bar.setValue(0)
+        self.batch_button.setEnabled(False)
+
+        # Files are transformed in worker processes; nothing is written until the diff is accepted
+        self.batch_thread = BatchRefactoringWorker(self.batch_root, refactorings)
+        self.batch_thread.progress.connect(self.update_progress)
+        self.batch_thread.finished.connect(self.handle_batch_plan)
+        self.batch_thread.start()
+
+    def handle_batch_plan(self, batch):
+        self.batch_button.setEnabled(True)
+        if isinstance(batch, str):
+            QMessageBox.critical(self, "Error", f"Batch refactoring failed: {batch}")
+            return
+
+        self.results_tree.clear()
+        changes_item = QTreeWidgetItem([f"Batch Refactoring: {len(batch.changes)} of {batch.files} files change"])
+        self.results_tree.addTopLevelItem(changes_item)
+        for change in batch.changes:
+            QTreeWidgetItem(changes_item, [os.path.relpath(change.path, batch.root)])
+        if batch.errors:
+            errors_item = QTreeWidgetItem([f"Skipped Files ({len(batch.errors)})"])
+            self.results_tree.addTopLevelItem(errors_item)
+            for path, error in batch.errors:
+                QTreeWidgetItem(errors_item, [f"{os.path.relpath(path, batch.root)}: {error}"])
+        self.results_tree.expandAll()
+
+        if not batch.changes:
+            QMessageBox.information(self, "Batch Refactoring", "No files need changes.")
+            return
+        if not self.show_batch_diff(batch):
+            return
+
+        try:
+            written = batch.apply(self.journal_for(batch.root))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to apply batch refactoring: {str(e)}")
+            return
+        self.update_history_buttons()
+
+        if hasattr(self, 'file_path') and os.path.abspath(self.file_path) in map(os.path.abspath, written):
+            self.code_preview.load(self.file_path)
+        QMessageBox.information(self, "Success", f"Refactored {len(written)} files.")
+
+    def show_batch_diff(self, batch) -> bool:
+        """Show the unified diff of a batch; True if the user chose to apply it."""
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Batch Refactoring Preview")
+        dialog.setModal(True)
+        dialog.resize(900, 700)
+
+        layout = QVBoxLayout()
+        diff_view = QPlainTextEdit()
+        diff_view.setReadOnly(True)
+        diff_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        diff_view.setFont(QFont("Consolas", 10))
+        diff_view.setPlainText(batch.diff())
+        layout.addWidget(diff_view)
+
+        button_layout = QHBoxLayout()
+        apply_button = QPushButton(f"Apply to {len(batch.changes)} Files")
+        apply_button.clicked.connect(dialog.accept)
+        cancel_button = QPushButton("Cancel")
+        cancel_button.clicked.connect(dialog.reject)
+        button_layout.addWidget(apply_button)
+        button_layout.addWidget(cancel_button)
+        layout.addLayout(button_layout)
+
+        dialog.setLayout(layout)
+        return dialog.exec_() == QDialog.Accepted
+
+    def journal_for(self, path):
+        """Refactoring history of the project path belongs to."""
+        journal = get_journal(find_project_root(path))
+        if journal.recovered:
+            # Operations a crash left half-done, settled when the history was opened
+            settled = "\n".join(f"{refactoring_type}: {'completed' if kept else 'rolled back'}"
+                                for refactoring_type, kept in journal.recovered)
+            journal.recovered = []
+            QMessageBox.information(self, "Refactoring History", f"Recovered interrupted refactorings:\n{settled}")
+        return journal
+
+    def current_journal(self):
+        path = getattr(self, 'file_path', None) or getattr(self, 'batch_root', None)
+        return self.journal_for(path) if path else None
+
+    def update_history_buttons(self):
+        journal = self.current_journal()
+        self.undo_button.setEnabled(bool(journal and journal.can_undo()))
+        self.redo_button.setEnabled(bool(journal and journal.can_redo()))
+
+    def undo_last_refactoring(self):
+        self.step_history(undo=True)
+
+    def redo_refactoring(self):
+        self.step_history(undo=False)
+
+    def step_history(self, undo: bool):
+        action = "undo" if undo else "redo"
+        journal = self.current_journal()
+        try:
+            operation = (journal.undo() if undo else journal.redo()) if journal else None
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to {action} refactoring: {str(e)}")
+            return
+        if operation is None:
+            QMessageBox.warning(self, "Warning", f"No refactoring to {action}.")
+            return
+
+        if hasattr(self, 'file_path') and os.path.abspath(self.file_path) in operation['files']:
+            self.code_preview.load(self.file_path)
+
+        history_item = QTreeWidgetItem([f"{action.capitalize()} Operation"])
+        history_item.addChild(QTreeWidgetItem([f"{'Reverted' if undo else 'Reapplied'}: {operation['type']}"]))
+        for path in operation['files']:
+            history_item.addChild(QTreeWidgetItem([os.path.relpath(path, journal.root)]))
+        self.results_tree.insertTopLevelItem(0, history_item)
+        self.results_tree.expandItem(history_item)
+        self.update_history_buttons()
+
     def remove_unused_imports(self, source_code):
-        tree = ast.parse(source_code)
+        # The transformer edits the tree, so it gets its own
+        tree = get_parse_cache().parse_source(source_code, fresh=True)
         transformer = UnusedImportTransformer()
         transformed = transformer.visit(tree)
         return astunparse.unparse(transformed)
@@ -0,0 +1,306 @@
+# refactoring_journal.py
+"""
+Undo/redo history of refactorings, one file per project.
+
+Every refactoring is one operation in <root>/.refactoring_history (SQLite). An operation can touch
+any number of files. For each file it stores a line diff that works in both directions: for every
+changed block, the lines before and after. The diff is zlib-compressed, so the history grows with
+the size of the changes, not the size of the files. Operations are undone newest first and redone
+in order; recording a new operation drops the ones that were undone.
+
+Files are only changed through the journal when they are in the state it expects (by SHA-1), so
+undoing an operation whose files were edited since raises JournalConflict instead of merging.
+
+Crash safety: an operation is stored as 'pending' before any file is written and marked 'done'
+afterwards. When the history is opened, recover() settles pending operations. If every file
+already has its new contents, the operation is kept. Otherwise the files that were written are
+put back and the operation is dropped.
+"""
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional, Tuple
+
+HISTORY_FILE = ".refactoring_history"
+MAX_OPERATIONS = int(os.environ.get("REFACTORING_MAX_OPERATIONS", 500))
+ENCODING = "utf-8"
+
+
+class JournalError(RuntimeError):
+    pass
+
+
+class JournalConflict(JournalError):
+    """A file is not in the state the operation expects; it was edited outside the journal."""
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(text.encode(ENCODING)).hexdigest()
+
+
+def make_patch(before: str, after: str) -> bytes:
+    """Compressed [[i1, i2, j1, j2, before lines, after lines], ...] for the changed blocks."""
+    a, b = before.splitlines(keepends=True), after.splitlines(keepends=True)
+    blocks = [[i1, i2, j1, j2, a[i1:i2], b[j1:j2]]
+              for tag, i1, i2, j1, j2 in SequenceMatcher(None, a, b, autojunk=False).get_opcodes()
+              if tag != "equal"]
+    return zlib.compress(json.dumps(blocks).encode(ENCODING))
+
+
+def apply_patch(text: str, patch: bytes, reverse: bool = False) -> str:
+    """after -> before with reverse=True, before -> after otherwise."""
+    lines = text.splitlines(keepends=True)
+    # Last block first, so the offsets of earlier ones stay valid
+    for i1, i2, j1, j2, old, new in reversed(json.loads(zlib.decompress(patch))):
+        if reverse:
+            lines[j1:j2] = old
+        else:
+            lines[i1:i2] = new
+    return "".join(lines)
+
+
+def read_text(path: str) -> str:
+    # newline="" keeps the file's line endings
+    with open(path, "r", encoding=ENCODING, newline="") as file:
+        return file.read()
+
+
+def write_atomic(path: str, text: str):
+    """Replace path with text; a crash leaves either the old or the new contents."""
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding=ENCODING, newline="") as file:
+            file.write(text)
+            file.flush()
+            os.fsync(file.fileno())
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class RefactoringJournal:
+    def __init__(self, root: str, max_operations: int = MAX_OPERATIONS):
+        self.root = os.path.abspath(root)
+        self.db_path = os.path.join(self.root, HISTORY_FILE)
+        self.max_operations = max_operations
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS operations (
+                    id INTEGER PRIMARY KEY,
+                    type TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    state TEXT NOT NULL CHECK (state IN ('pending', 'done', 'undone'))
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS file_changes (
+                    operation_id INTEGER NOT NULL REFERENCES operations (id) ON DELETE CASCADE,
+                    path TEXT NOT NULL,
+                    before_hash TEXT NOT NULL,
+                    after_hash TEXT NOT NULL,
+                    patch BLOB NOT NULL
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_file_changes_operation "
+                              "ON file_changes (operation_id)")
+        # Operations settled by recover() when the history was opened: [(type, kept)]
+        self.recovered = self.recover()
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+
+    def _absolute(self, path: str) -> str:
+        return os.path.join(self.root, *path.split("/"))
+
+    # Recording
+
+    def begin(self, refactoring_type: str, changes: Dict[str, Tuple[str, str]]) -> int:
+        """
+        Store a pending operation before its files are written.
+
+        Parameters:
+        - changes: {path: (contents before, contents after)}; unchanged files are left out.
+
+        Returns:
+        - The operation id, for commit() or discard().
+        """
+        rows = [(self._relative(path), text_hash(before), text_hash(after), make_patch(before, after))
+                for path, (before, after) in changes.items() if before != after]
+        with self.lock, self.conn:
+            # A new operation ends the redo branch
+            self.conn.execute("DELETE FROM operations WHERE state = 'undone'")
+            operation_id = self.conn.execute(
+                "INSERT INTO operations (type, created_at, state) VALUES (?, ?, 'pending')",
+                (refactoring_type, time.time())).lastrowid
+            self.conn.executemany(
+                "INSERT INTO file_changes (operation_id, path, before_hash, after_hash, patch) VALUES (?, ?, ?, ?, ?)",
+                ((operation_id, *row) for row in rows))
+        return operation_id
+
+    def commit(self, operation_id: int):
+        with self.lock, self.conn:
+            self.conn.execute("UPDATE operations SET state = 'done' WHERE id = ?", (operation_id,))
+            self._prune()
+
+    def discard(self, operation_id: int):
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM operations WHERE id = ?", (operation_id,))
+
+    def record(self, refactoring_type: str, changes: Dict[str, Tuple[str, str]]) -> int:
+        """Record changes that were already written to disk by someone else (e.g. rope)."""
+        operation_id = self.begin(refactoring_type, changes)
+        self.commit(operation_id)
+        return operation_id
+
+    def write(self, refactoring_type: str, changes: Dict[str, str]) -> int:
+        """Write {path: new contents} as one operation; if a write fails, the others are put back."""
+        with self.lock:
+            befores = {path: read_text(path) for path in changes}
+            operation_id = self.begin(refactoring_type, {path: (befores[path], after)
+                                                         for path, after in changes.items()})
+            written = []
+            try:
+                for path, after in changes.items():
+                    write_atomic(path, after)
+                    written.append(path)
+            except BaseException:
+                for path in written:
+                    write_atomic(path, befores[path])
+                self.discard(operation_id)
+                raise
+            self.commit(operation_id)
+        return operation_id
+
+    def _prune(self):
+        self.conn.execute(
+            "DELETE FROM operations WHERE state = 'done' AND id NOT IN "
+            "(SELECT id FROM operations WHERE state = 'done' ORDER BY id DESC LIMIT ?)", (self.max_operations,))
+
+    # Undo and redo
+
+    def _changes(self, operation_id: int) -> List[Tuple[str, str, str, bytes]]:
+        return self.conn.execute(
+            "SELECT path, before_hash, after_hash, patch FROM file_changes WHERE operation_id = ?",
+            (operation_id,)).fetchall()
+
+    def _move(self, operation_id: int, reverse: bool):
+        """Take every file of the operation from after to before (reverse) or back; all or nothing."""
+        results = {}
+        for path, before_hash, after_hash, patch in self._changes(operation_id):
+            absolute = self._absolute(path)
+            expected, target = (after_hash, before_hash) if reverse else (before_hash, after_hash)
+            current = read_text(absolute) if os.path.exists(absolute) else None
+            if current is None or text_hash(current) != expected:
+                raise JournalConflict(f"{path} was changed outside the refactoring history")
+            result = apply_patch(current, patch, reverse)
+            if text_hash(result) != target:
+                raise JournalError(f"History entry for {path} is damaged")
+            results[absolute] = (current, result)
+
+        written = []
+        try:
+            for path, (_, result) in results.items():
+                write_atomic(path, result)
+                written.append(path)
+        except BaseException:
+            for path in written:
+                write_atomic(path, results[path][0])
+            raise
+        return list(results)
+
+    def _step(self, state: str, order: str, new_state: str, reverse: bool) -> Optional[Dict]:
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT id, type FROM operations WHERE state = ? ORDER BY id {order} LIMIT 1", (state,)).fetchone()
+            if row is None:
+                return None
+            operation_id, refactoring_type = row
+            files = self._move(operation_id, reverse)
+            with self.conn:
+                self.conn.execute("UPDATE operations SET state = ? WHERE id = ?", (new_state, operation_id))
+        return {'id': operation_id, 'type': refactoring_type, 'files': files}
+
+    def undo(self) -> Optional[Dict]:
+        """Revert the newest done operation; returns {'id', 'type', 'files'} or None if there is none."""
+        return self._step('done', 'DESC', 'undone', reverse=True)
+
+    def redo(self) -> Optional[Dict]:
+        """Re-apply the oldest undone operation."""
+        return self._step('undone', 'ASC', 'done', reverse=False)
+
+    def can_undo(self) -> bool:
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM operations WHERE state = 'done' LIMIT 1").fetchone() is not None
+
+    def can_redo(self) -> bool:
+        with self.lock:
+            return self.conn.execute("SELECT 1 FROM operations WHERE state = 'undone' LIMIT 1").fetchone() is not None
+
+    def operations(self) -> List[Dict]:
+        """Done and undone operations, newest first."""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT o.id, o.type, o.created_at, o.state, GROUP_CONCAT(c.path, '\n'), "
+                "COALESCE(SUM(LENGTH(c.patch)), 0) FROM operations o LEFT JOIN file_changes c "
+                "ON c.operation_id = o.id WHERE o.state != 'pending' GROUP BY o.id ORDER BY o.id DESC").fetchall()
+        return [{'id': operation_id, 'type': refactoring_type, 'timestamp': created_at, 'state': state,
+                 'files': paths.split("\n") if paths else [], 'stored_bytes': stored}
+                for operation_id, refactoring_type, created_at, state, paths, stored in rows]
+
+    # Crash recovery
+
+    def recover(self) -> List[Tuple[str, bool]]:
+        """Settle operations left pending by a crash; returns [(type, kept)]."""
+        settled = []
+        with self.lock:
+            pending = self.conn.execute("SELECT id, type FROM operations WHERE state = 'pending' ORDER BY id").fetchall()
+            for operation_id, refactoring_type in pending:
+                changes = self._changes(operation_id)
+                states = []
+                for path, before_hash, after_hash, _ in changes:
+                    absolute = self._absolute(path)
+                    current = text_hash(read_text(absolute)) if os.path.exists(absolute) else None
+                    states.append(current == after_hash)
+                if all(states):
+                    self.commit(operation_id)
+                    settled.append((refactoring_type, True))
+                    continue
+                # Put back what was already written; files edited since are left alone
+                for (path, _, after_hash, patch), written in zip(changes, states):
+                    if written:
+                        absolute = self._absolute(path)
+                        write_atomic(absolute, apply_patch(read_text(absolute), patch, reverse=True))
+                self.discard(operation_id)
+                settled.append((refactoring_type, False))
+        return settled
+
+    def close(self):
+        self.conn.close()
+
+
+_journals: Dict[str, RefactoringJournal] = {}
+_journals_lock = threading.Lock()
+
+
+def get_journal(root: str) -> RefactoringJournal:
+    """Process-wide journal of the project at root."""
+    root = os.path.abspath(root)
+    with _journals_lock:
+        if root not in _journals:
+            _journals[root] = RefactoringJournal(root)
+        return _journals[root]
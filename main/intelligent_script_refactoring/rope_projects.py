@@ -0,0 +1,122 @@
+# rope_projects.py
+"""
+Long-lived rope projects, one per project root.
+
+Opening a rope Project and letting it parse and analyze the code is most of the cost of a rope
+refactoring. RopeProjects keeps one Project per root for the life of the process, so that work is
+shared by every operation on files under that root. The root is the nearest directory above the
+file that holds .git, pyproject.toml, setup.py or setup.cfg, else the file's own directory.
+
+- open() validates the project before each operation. Rope re-checks the modification times of
+  the modules it has cached, so files edited outside rope are re-read and the rest is reused.
+- The object DB (what rope's object analysis inferred about calls and return values) is saved to
+  <root>/.ropeproject by sync() and close(). When the project is opened in a later session it is
+  read back and checked against the files.
+
+Rope is not thread-safe, so open() holds the project's lock for the length of the operation.
+
+perform() applies a refactoring's changes and returns the old and new text of every file they
+touched, for the refactoring history.
+"""
+import atexit
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Tuple
+
+from rope.base import libutils
+from rope.base.project import Project
+from rope.base.resources import File
+
+from main.intelligent_script_refactoring.refactoring_journal import read_text
+
+ROOT_MARKERS = (".git", "pyproject.toml", "setup.py", "setup.cfg")
+
+ROPE_PREFS = {
+    'save_objectdb': True,
+    'validate_objectdb': True,
+    # Analyzing every module a refactoring saves makes a rename touching many files several times
+    # slower; rope still analyzes modules on demand and validate_objectdb drops stale entries
+    'automatic_soa': False,
+    # The refactoring tool keeps its own history
+    'save_history': False,
+}
+
+
+def find_project_root(path: str) -> str:
+    """Project root of a file or folder."""
+    path = os.path.abspath(path)
+    directory = path if os.path.isdir(path) else os.path.dirname(path)
+    current = directory
+    while True:
+        if any(os.path.exists(os.path.join(current, marker)) for marker in ROOT_MARKERS):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return directory
+        current = parent
+
+
+def perform(project: Project, changes) -> Dict[str, Tuple[str, str]]:
+    """Apply rope changes; returns {path: (before, after)} for every existing file they change."""
+    paths = [resource.real_path for resource in changes.get_changed_resources()]
+    before = {path: read_text(path) for path in paths if os.path.exists(path)}
+    project.do(changes)
+    return {path: (text, read_text(path)) for path, text in before.items()}
+
+
+class RopeProjects:
+    def __init__(self, **prefs):
+        """prefs override ROPE_PREFS for every project opened, e.g. save_objectdb=False."""
+        self.prefs = dict(ROPE_PREFS, **prefs)
+        # root -> (project, lock)
+        self.projects: Dict[str, Tuple[Project, threading.RLock]] = {}
+        self.lock = threading.Lock()
+
+    def _get(self, file_path: str) -> Tuple[Project, threading.RLock]:
+        root = find_project_root(file_path)
+        with self.lock:
+            if root not in self.projects:
+                self.projects[root] = (Project(root, **self.prefs), threading.RLock())
+            return self.projects[root]
+
+    @contextmanager
+    def open(self, file_path: str) -> Iterator[Tuple[Project, File]]:
+        """Project and resource for file_path, validated and locked for one operation."""
+        project, lock = self._get(file_path)
+        with lock:
+            project.validate()
+            yield project, libutils.path_to_resource(project, os.path.abspath(file_path))
+
+    def roots(self):
+        with self.lock:
+            return list(self.projects)
+
+    def sync(self):
+        """Write every project's object DB to disk."""
+        with self.lock:
+            projects = list(self.projects.values())
+        for project, lock in projects:
+            with lock:
+                project.sync()
+
+    def close(self):
+        with self.lock:
+            projects, self.projects = list(self.projects.values()), {}
+        for project, lock in projects:
+            with lock:
+                project.close()
+
+
+_shared_projects = None
+_shared_projects_lock = threading.Lock()
+
+
+def get_rope_projects() -> RopeProjects:
+    """Process-wide projects; object DBs are written when the process exits."""
+    global _shared_projects
+    with _shared_projects_lock:
+        if _shared_projects is None:
+            _shared_projects = RopeProjects()
+            atexit.register(_shared_projects.close)
+        return _shared_projects
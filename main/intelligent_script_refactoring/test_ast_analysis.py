@@ -0,0 +1,78 @@
+import textwrap
+
+from main.intelligent_script_refactoring.ast_analysis import analyze_source
+
+
+def analyze(source):
+    return analyze_source(textwrap.dedent(source))
+
+
+def functions(result):
+    return {function['qualname']: function for function in result['complexity']['functions']}
+
+
+def smell_types(result):
+    return [(smell['type'], smell['name']) for smell in result['code_smells']]
+
+
+def test_nested_function_complexity_is_scoped():
+    result = analyze("""
+        def outer(items):
+            def inner(item):
+                if item and item.ok:
+                    return 1
+                return 0
+            for item in items:
+                inner(item)
+            return [i for i in items if i]
+    """)
+    found = functions(result)
+    # inner: 1 + if + and
+    assert found['outer.inner']['complexity'] == 3
+    # outer: 1 + for + comprehension + its if; inner's branches are not counted again
+    assert found['outer']['complexity'] == 4
+    assert [function['name'] for function in result['complexity']['functions']] == ['outer', 'inner']
+
+
+def test_elif_chain_does_not_deepen_nesting():
+    result = analyze("""
+        def classify(n):
+            if n < 0:
+                return 'negative'
+            elif n == 0:
+                return 'zero'
+            elif n < 10:
+                return 'small'
+            else:
+                return 'large'
+    """)
+    function = functions(result)['classify']
+    assert function['complexity'] == 4
+    assert function['max_depth'] == 1
+
+
+def test_deep_nesting_and_long_parameter_list():
+    result = analyze("""
+        def deep(a, b, c, d, e, f):
+            for x in a:
+                while b:
+                    with c:
+                        try:
+                            if d:
+                                return e
+                        except ValueError:
+                            pass
+    """)
+    assert functions(result)['deep']['max_depth'] == 5
+    assert smell_types(result) == [('deep_nesting', 'deep'), ('long_parameter_list', 'deep')]
+
+
+def test_class_metrics_and_smells():
+    methods = "\n".join(f"    def m{i}(self):\n        self.a{i} = {i}\n" for i in range(16))
+    result = analyze("import os\nfrom . import sibling\nfrom .pkg import mod\n\nclass Big:\n" + methods)
+    cls = result['complexity']['classes'][0]
+    assert (cls['name'], cls['methods'], cls['attributes']) == ('Big', 16, 16)
+    assert smell_types(result) == [('large_class', 'Big'), ('god_class', 'Big')]
+    assert result['complexity']['imports'] == ['os', '.sibling', '.pkg.mod']
+    # self is not a parameter of a method
+    assert functions(result)['Big.m0']['parameters'] == 0
@@ -0,0 +1,152 @@
+import os
+import textwrap
+
+import pytest
+
+from main.intelligent_script_refactoring import batch_refactoring
+from main.intelligent_script_refactoring.batch_refactoring import (
+    REFACTORINGS, BatchRefactoringError, add_context_manager, find_python_files, plan, remove_unused_imports)
+
+
+def dedent(source):
+    return textwrap.dedent(source).lstrip()
+
+
+def test_remove_unused_imports_keeps_comments_and_used_names():
+    source = dedent("""
+        from __future__ import annotations
+        # Standard library
+        import os.path
+        import sys, json  # used: json
+        from typing import Dict, List
+        from helpers import *
+        import exported
+        import unused
+
+        __all__ = ["exported"]
+
+
+        def load(path: str) -> Dict:
+            # Read the file
+            return json.loads(os.path.join(path))
+    """)
+    assert remove_unused_imports(source) == dedent("""
+        from __future__ import annotations
+        # Standard library
+        import os.path
+        import json  # used: json
+        from typing import Dict
+        from helpers import *
+        import exported
+
+        __all__ = ["exported"]
+
+
+        def load(path: str) -> Dict:
+            # Read the file
+            return json.loads(os.path.join(path))
+    """)
+    # Package __init__ files re-export their imports
+    assert remove_unused_imports("import unused\n", "pkg/__init__.py") == "import unused\n"
+
+
+def test_remove_unused_imports_keeps_noqa_and_string_annotations():
+    source = dedent("""
+        import plugins  # noqa: F401 (registers the plugins)
+        from typing import (  # NOQA
+            Any,
+        )
+        from pathlib import Path
+        from typing import List
+        import os
+        import unused
+
+
+        def paths(root: "Path") -> "List[os.PathLike]":
+            values: List["Path"] = []
+            return values
+    """)
+    assert remove_unused_imports(source) == source.replace("import unused\n", "")
+
+
+def test_add_context_manager_to_classes_with_close():
+    source = dedent("""
+        class Connection:
+            def close(self):
+                pass
+
+
+        class Managed:
+            def close(self):
+                pass
+
+            def __enter__(self):
+                return self
+    """)
+    refactored = add_context_manager(source)
+    namespace = {}
+    exec(compile(refactored, "<test>", "exec"), namespace)
+    assert hasattr(namespace['Connection'], '__exit__')
+    assert not hasattr(namespace['Managed'], '__exit__')
+    with namespace['Connection']() as connection:
+        assert isinstance(connection, namespace['Connection'])
+
+    tabbed = "class Connection:\n\tdef close(self):\n\t\tpass\n"
+    assert add_context_manager(tabbed) == tabbed + (
+        "\n\tdef __enter__(self):\n\t\treturn self\n"
+        "\n\tdef __exit__(self, exc_type, exc_val, exc_tb):\n\t\tself.close()\n\t\treturn False\n")
+
+
+def test_plan_diff_and_apply(tmp_path):
+    # Enough files for the process pool to be used
+    for index in range(40):
+        package = tmp_path / f"pkg{index % 4}"
+        package.mkdir(exist_ok=True)
+        (package / f"mod{index}.py").write_text("import os\nimport sys\n\nprint(sys.argv)\n")
+    (tmp_path / "clean.py").write_text("import sys\nprint(sys.argv)\n")
+    (tmp_path / "broken.py").write_text("def broken(:\n")
+    (tmp_path / ".venv").mkdir()
+    (tmp_path / ".venv" / "site.py").write_text("import os\n")
+
+    assert len(find_python_files(str(tmp_path))) == 42
+    batch = plan(str(tmp_path), ["Remove Unused Imports"], workers=2)
+    assert batch.files == 42
+    assert len(batch.changes) == 40
+    assert [os.path.basename(path) for path, _ in batch.errors] == ["broken.py"]
+    diff = batch.diff()
+    assert "--- a/pkg0/mod0.py\n+++ b/pkg0/mod0.py\n" in diff
+    assert "\n-import os\n" in diff
+    # Nothing is written before apply()
+    assert (tmp_path / "pkg0" / "mod0.py").read_text().startswith("import os\n")
+
+    assert len(batch.apply()) == 40
+    assert (tmp_path / "pkg0" / "mod0.py").read_text() == "import sys\n\nprint(sys.argv)\n"
+    assert sorted(name for name in os.listdir(tmp_path / "pkg0") if name.endswith(".tmp")) == []
+
+
+def test_apply_refuses_files_changed_since_preview(tmp_path):
+    target = tmp_path / "mod.py"
+    target.write_text("import os\n")
+    batch = plan(str(tmp_path), ["Remove Unused Imports"])
+    target.write_text("import os\nprint(os.sep)\n")
+    os.utime(target, ns=(0, 0))
+    with pytest.raises(BatchRefactoringError):
+        batch.apply()
+    assert target.read_text() == "import os\nprint(os.sep)\n"
+
+    with pytest.raises(BatchRefactoringError):
+        plan(str(tmp_path), ["Rename Everything"])
+
+
+def test_invalid_results_and_deleted_files_are_errors(tmp_path, monkeypatch):
+    monkeypatch.setitem(REFACTORINGS, "Break", (lambda source, filename: source + "def (:\n", None))
+    monkeypatch.setattr(batch_refactoring, "REFACTORING_ORDER", [*batch_refactoring.REFACTORING_ORDER, "Break"])
+    (tmp_path / "mod.py").write_text("import os\n")
+    batch = plan(str(tmp_path), ["Break"])
+    assert batch.changes == []
+    assert batch.errors[0][1].startswith("Refactoring produced invalid code: SyntaxError")
+
+    batch = plan(str(tmp_path), ["Remove Unused Imports"])
+    os.remove(tmp_path / "mod.py")
+    with pytest.raises(BatchRefactoringError, match="deleted"):
+        batch.apply()
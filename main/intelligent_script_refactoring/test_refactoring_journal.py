@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+from main.intelligent_script_refactoring.batch_refactoring import plan
+from main.intelligent_script_refactoring.refactoring_journal import (
+    HISTORY_FILE, JournalConflict, RefactoringJournal, apply_patch, make_patch)
+
+
+@pytest.fixture
+def journal(tmp_path):
+    journal = RefactoringJournal(str(tmp_path))
+    yield journal
+    journal.close()
+
+
+def test_patch_round_trip():
+    before = "".join(f"line {i}\r\n" for i in range(1000))
+    after = before.replace("line 10\r\n", "").replace("line 500", "changed 500") + "tail"
+    patch = make_patch(before, after)
+    assert apply_patch(before, patch) == after
+    assert apply_patch(after, patch, reverse=True) == before
+    # Proportional to the change, not to the 12 KB file
+    assert len(patch) < 200
+
+
+def test_multi_step_undo_and_redo_across_files(tmp_path, journal):
+    a, b = str(tmp_path / "a.py"), str(tmp_path / "b.py")
+    for path in (a, b):
+        with open(path, "w") as file:
+            file.write("import os\nx = 1\n")
+
+    journal.write("Rename", {a: "import os\ny = 1\n", b: "import os\ny = 2\n"})
+    journal.write("Remove Unused Imports", {a: "y = 1\n"})
+    assert [operation['type'] for operation in journal.operations()] == ["Remove Unused Imports", "Rename"]
+
+    assert journal.undo()['type'] == "Remove Unused Imports"
+    assert journal.undo()['files'] == [a, b]
+    assert open(a).read() == open(b).read() == "import os\nx = 1\n"
+    assert journal.undo() is None
+
+    assert journal.redo()['type'] == "Rename"
+    assert open(b).read() == "import os\ny = 2\n"
+    # A new operation drops what is left to redo
+    journal.write("Format with Black", {b: "import os\n\ny = 2\n"})
+    assert not journal.can_redo()
+
+    with open(b, "w") as file:
+        file.write("edited by hand\n")
+    with pytest.raises(JournalConflict):
+        journal.undo()
+    assert open(b).read() == "edited by hand\n"
+    assert os.path.exists(tmp_path / HISTORY_FILE)
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".bak")]
+
+
+def test_recover_rolls_back_interrupted_operations(tmp_path):
+    a, b, c = tmp_path / "a.py", tmp_path / "b.py", tmp_path / "c.py"
+    for path in (a, b, c):
+        path.write_text(f"old {path.stem}\n")
+    journal = RefactoringJournal(str(tmp_path))
+    # Crash after the first of two files was written
+    journal.begin("Batch", {str(a): ("old a\n", "new a\n"), str(b): ("old b\n", "new b\n")})
+    a.write_text("new a\n")
+    # Crash after every file was written, before the operation was marked done
+    journal.begin("Single", {str(c): ("old c\n", "new c\n")})
+    c.write_text("new c\n")
+    journal.close()
+
+    journal = RefactoringJournal(str(tmp_path))
+    assert journal.recovered == [("Batch", False), ("Single", True)]
+    assert (a.read_text(), b.read_text()) == ("old a\n", "old b\n")
+    assert journal.undo()['type'] == "Single"
+    assert c.read_text() == "old c\n"
+    assert not journal.can_undo()
+    journal.close()
+
+
+def test_batch_apply_is_one_undoable_operation(tmp_path, journal):
+    for index in range(3):
+        (tmp_path / f"mod{index}.py").write_text("import os\nimport sys\nprint(sys.argv)\n")
+    plan(str(tmp_path), ["Remove Unused Imports"]).apply(journal)
+    assert (tmp_path / "mod0.py").read_text() == "import sys\nprint(sys.argv)\n"
+
+    operation = journal.undo()
+    assert operation['type'] == "Remove Unused Imports"
+    assert len(operation['files']) == 3
+    assert (tmp_path / "mod2.py").read_text() == "import os\nimport sys\nprint(sys.argv)\n"
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+pytest.importorskip("rope")
+
+from rope.refactor.rename import Rename  # noqa: E402
+
+from main.intelligent_script_refactoring.refactoring_journal import RefactoringJournal  # noqa: E402
+from main.intelligent_script_refactoring.rope_projects import RopeProjects, find_project_root, perform  # noqa: E402
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def rename(projects, path, name, new_name):
+    with projects.open(str(path)) as (project, resource):
+        offset = resource.read().index(name)
+        project.do(Rename(project, resource, offset).get_changes(new_name))
+
+
+def test_find_project_root(tmp_path):
+    write(tmp_path / "pyproject.toml", "")
+    write(tmp_path / "pkg" / "sub" / "mod.py", "")
+    assert find_project_root(str(tmp_path / "pkg" / "sub" / "mod.py")) == str(tmp_path)
+
+
+def test_project_is_reused_and_sees_external_edits(tmp_path):
+    write(tmp_path / "setup.py", "")
+    write(tmp_path / "lib.py", "def helper():\n    return 1\n")
+    write(tmp_path / "app.py", "from lib import helper\n\nprint(helper())\n")
+    projects = RopeProjects()
+    try:
+        rename(projects, tmp_path / "lib.py", "helper", "compute")
+        assert (tmp_path / "app.py").read_text() == "from lib import compute\n\nprint(compute())\n"
+
+        # Edited outside rope between operations
+        write(tmp_path / "app.py", "from lib import compute\n\nvalue = compute()\nprint(value)\n")
+        rename(projects, tmp_path / "app.py", "value", "result")
+        assert (tmp_path / "app.py").read_text() == "from lib import compute\n\nresult = compute()\nprint(result)\n"
+        assert projects.roots() == [str(tmp_path)]
+    finally:
+        projects.close()
+    # The object DB is kept for the next session
+    assert os.path.isdir(tmp_path / ".ropeproject")
+    assert projects.roots() == []
+
+
+def test_perform_returns_every_changed_file_for_the_journal(tmp_path):
+    write(tmp_path / "setup.py", "")
+    (tmp_path / "lib.py").write_bytes(b"def helper():\r\n    return 1\r\n")
+    write(tmp_path / "app.py", "from lib import helper\n\nprint(helper())\n")
+    projects = RopeProjects(save_objectdb=False)
+    journal = RefactoringJournal(str(tmp_path))
+    try:
+        with projects.open(str(tmp_path / "lib.py")) as (project, resource):
+            offset = resource.read().index("helper")
+            changed = perform(project, Rename(project, resource, offset).get_changes("compute"))
+        assert sorted(os.path.basename(path) for path in changed) == ["app.py", "lib.py"]
+        journal.record("Rename Symbol", changed)
+
+        assert len(journal.undo()['files']) == 2
+        assert (tmp_path / "lib.py").read_bytes() == b"def helper():\r\n    return 1\r\n"
+        assert (tmp_path / "app.py").read_text() == "from lib import helper\n\nprint(helper())\n"
+    finally:
+        journal.close()
+        projects.close()
@@ -1,4 +1,4 @@
-from db_operations import DBManager
+from main.self_healing_test_automation.db_operations import DBManager
 
 # Initialize the DB manager
 db_manager = DBManager("locators.db")
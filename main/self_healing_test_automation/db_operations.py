@@ -1,5 +1,4 @@
-import sqlite3
-import json
+from main.Self_healing.locator_store import LocatorStore, split_locator
 
 
 class DBManager:
@@ -7,25 +6,14 @@ class DBManager:
         """
         Initialize the connection to the SQLite database.
 
+        The locators live in the unified schema shared with Healenium and the pytest healing store
+        (see main/Self_healing/locator_store.py); a legacy locators table is migrated on open.
+
         Parameters:
         - db_path: Path to the SQLite database file.
         """
         self.db_path = db_path
-        self.conn = sqlite3.connect(self.db_path)
-        self.ensure_table_schema()
-
-    def ensure_table_schema(self):
-        """
-        Ensure the locators table schema exists.
-        """
-        with self.conn:
-            self.conn.execute("""
-                CREATE TABLE IF NOT EXISTS locators (
-                    element_name TEXT PRIMARY KEY,
-                    primary_locator TEXT,
-                    fallback_locators TEXT
-                )
-            """)
+        self.store = LocatorStore(self.db_path)
 
     def create_locator(self, element_name, primary_locator, fallback_locators):
         """
@@ -35,13 +23,12 @@ class DBManager:
         - element_name: The name of the element.
         - primary_locator: The primary locator (e.g., "id=email").
         - fallback_locators: A list of fallback locators.
+
+        Raises:
+        - sqlite3.IntegrityError if the element already has a locator; use update_locator() instead.
         """
-        fallback_locators_json = json.dumps(fallback_locators)
-        with self.conn:
-            self.conn.execute("""
-                INSERT INTO locators (element_name, primary_locator, fallback_locators)
-                VALUES (?, ?, ?)
-            """, (element_name, primary_locator, fallback_locators_json))
+        locator_type, locator_value = split_locator(primary_locator)
+        self.store.create(element_name, locator_type, locator_value, fallback_locators)
         print(f"Locator '{element_name}' created in the database.")
 
     def get_locator(self, element_name):
@@ -54,14 +41,10 @@ class DBManager:
         Returns:
         - A dictionary with primary and fallback locators if found, else None.
         """
-        cursor = self.conn.execute("""
-            SELECT primary_locator, fallback_locators FROM locators WHERE element_name = ?
-        """, (element_name,))
-        row = cursor.fetchone()
+        row = self.store.get(element_name)
         if row:
-            primary_locator = row[0]
-            fallback_locators = json.loads(row[1])
-            return {"primary_locator": primary_locator, "fallback_locators": fallback_locators}
+            primary_locator = f"{row['locator_type']}={row['locator_value']}"
+            return {"primary_locator": primary_locator, "fallback_locators": row["fallbacks"]}
         print(f"Locator '{element_name}' not found in the database.")
         return None
 
@@ -74,20 +57,15 @@ class DBManager:
         - primary_locator: The new primary locator.
         - fallback_locators: The new fallback locators list.
         """
-        updates = []
-        params = []
+        row = self.store.get(element_name)
+        if row is None:
+            print(f"Locator '{element_name}' not found in the database.")
+            return
         if primary_locator:
-            updates.append("primary_locator = ?")
-            params.append(primary_locator)
-        if fallback_locators:
-            updates.append("fallback_locators = ?")
-            params.append(json.dumps(fallback_locators))
-        params.append(element_name)
-
-        with self.conn:
-            self.conn.execute(f"""
-                UPDATE locators SET {', '.join(updates)} WHERE element_name = ?
-            """, params)
+            locator_type, locator_value = split_locator(primary_locator)
+        else:
+            locator_type, locator_value = row["locator_type"], row["locator_value"]
+        self.store.put(element_name, locator_type, locator_value, fallback_locators or None)
         print(f"Locator '{element_name}' updated in the database.")
 
     def delete_locator(self, element_name):
@@ -97,12 +75,11 @@ class DBManager:
         Parameters:
         - element_name: The name of the element to delete.
         """
-        with self.conn:
-            self.conn.execute("DELETE FROM locators WHERE element_name = ?", (element_name,))
+        self.store.delete(element_name)
         print(f"Locator '{element_name}' has been deleted from the database.")
 
     def close(self):
         """
         Close the database connection.
         """
-        self.conn.close()
+        self.store.close()
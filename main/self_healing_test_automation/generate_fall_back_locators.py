@@ -1,5 +1,3 @@
-import sqlite3
-import json
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
@@ -7,36 +5,25 @@ from selenium.common.exceptions import NoSuchElementException, TimeoutException,
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from main.Self_healing.healing_metrics import healing_metrics
+from main.Self_healing.locator_store import LocatorStore, split_locator
+from main.self_healing_test_automation.xpath_to_css import xpath_to_css
+
 
 class LocatorManager:
     def __init__(self, db_path="locators.db", driver_path=None):
         # Initialize database and WebDriver
-        self.conn = sqlite3.connect(db_path)
-        self.ensure_table_schema()
+        self.store = LocatorStore(db_path)
         service = Service(driver_path) if driver_path else None
         self.driver = webdriver.Chrome(service=service)
         self.wait = WebDriverWait(self.driver, 10)
 
-    def ensure_table_schema(self):
-        with self.conn:
-            self.conn.execute("""
-                CREATE TABLE IF NOT EXISTS locators (
-                    element_name TEXT PRIMARY KEY,
-                    primary_locator TEXT,
-                    fallback_locators TEXT
-                )
-            """)
-
     def add_locators(self, element_name, primary_locator, fallback_locators):
         """
         Adds or updates primary and fallback locators in the database.
         """
-        fallback_locators_json = json.dumps(fallback_locators)
-        with self.conn:
-            self.conn.execute("""
-                INSERT OR REPLACE INTO locators (element_name, primary_locator, fallback_locators)
-                VALUES (?, ?, ?)
-            """, (element_name, primary_locator, fallback_locators_json))
+        locator_type, locator_value = split_locator(primary_locator)
+        self.store.put(element_name, locator_type, locator_value, fallback_locators)
         print(f"Locator for '{element_name}' added/updated in database.")
 
     def generate_fallback_locators(self, primary_by, primary_value):
@@ -59,32 +46,10 @@ class LocatorManager:
         elif primary_by == "css_selector":
             fallback_locators.append(("xpath", f"//{primary_value}"))
         elif primary_by == "xpath":
-            # Handle specific XPath patterns
-            if primary_value.startswith("//*[@id="):
-                # XPath with ID attribute -> CSS with ID selector
-                id_value = primary_value.split("'")[1]  # Extract ID value
-                fallback_locators.append(("css_selector", f"[id='{id_value}']"))
-
-            elif primary_value.startswith("//*[contains(@class,"):
-                # XPath contains class -> CSS partial match
-                class_value = primary_value.split("'")[1]
-                fallback_locators.append(("css_selector", f"[class*='{class_value}']"))
-
-            elif primary_value.startswith("//*[contains(@"):
-                # General attribute contains match -> CSS attribute partial match
-                attr_name = primary_value.split("@")[1].split(",")[0]
-                attr_value = primary_value.split("'")[1]
-                fallback_locators.append(("css_selector", f"[{attr_name}*='{attr_value}']"))
-
-            elif primary_value.startswith("//") and "[*[contains(text()" not in primary_value:
-                # Direct tag and attribute match -> CSS equivalent
-                tag, attr = primary_value.replace("//*", "").replace("[@", "[").split("[", 1)
-                css_selector = f"{tag}[{attr}"
+            # Parsed once per distinct XPath (memoized); None when CSS cannot express it
+            css_selector = xpath_to_css(primary_value)
+            if css_selector is not None:
                 fallback_locators.append(("css_selector", css_selector))
-                print("css")
-
-            # # Always keep original XPath as a fallback
-            # fallback_locators.append(("xpath", primary_value))
 
         return fallback_locators
 
@@ -95,16 +60,16 @@ class LocatorManager:
         primary_by, primary_value = primary_locator.split("=", 1)
 
         # Check if element is in the database
-        cursor = self.conn.execute("SELECT primary_locator, fallback_locators FROM locators WHERE element_name = ?",
-                                   (element_name,))
-        row = cursor.fetchone()
+        row = self.store.get(element_name)
 
         # If the element is not in the database, attempt the primary locator and add to database on success
         if not row:
             try:
                 # Try locating element with the provided primary locator for the first time
-                element = self.wait.until(
-                    EC.presence_of_element_located((getattr(By, primary_by.upper()), primary_value)))
+                with healing_metrics.measure("primary", element_name) as attempt:
+                    element = self.wait.until(
+                        EC.presence_of_element_located((getattr(By, primary_by.upper()), primary_value)))
+                    attempt.succeeded()
                 print(f"Element '{element_name}' found using primary locator on first attempt.")
 
                 # Generate fallback locators and add both primary and fallback locators to the database
@@ -118,27 +83,31 @@ class LocatorManager:
                     f"Element '{element_name}' could not be located and no stored locators exist in the database.")
 
         # If element exists in database, attempt primary locator from database
-        db_primary_locator = row[0]
-        db_primary_by, db_primary_value = db_primary_locator.split("=", 1)
+        db_primary_by, db_primary_value = row["locator_type"], row["locator_value"]
+        db_primary_locator = f"{db_primary_by}={db_primary_value}"
 
         try:
-            element = self.wait.until(
-                EC.presence_of_element_located((getattr(By, db_primary_by.upper()), db_primary_value)))
+            with healing_metrics.measure("db_primary", element_name) as attempt:
+                element = self.wait.until(
+                    EC.presence_of_element_located((getattr(By, db_primary_by.upper()), db_primary_value)))
+                attempt.succeeded()
             print(f"Element '{element_name}' found using database primary locator: {db_primary_locator}")
             return element
         except TimeoutException:
             print(f"Database primary locator for '{element_name}' failed. Trying fallback locators...")
 
         # Attempt fallback locators only if they are stored in the database
-        fallback_locators = json.loads(row[1]) if row[1] else []
+        fallback_locators = row["fallbacks"]
         if not fallback_locators:
             print(f"No fallback locators available for '{element_name}' in database.")
             raise NoSuchElementException(f"Element '{element_name}' could not be located with any stored locators.")
 
         for fallback_by, fallback_value in fallback_locators:
             try:
-                element = self.wait.until(
-                    EC.presence_of_element_located((getattr(By, fallback_by.upper()), fallback_value)))
+                with healing_metrics.measure(f"fallback:{fallback_by}", element_name) as attempt:
+                    element = self.wait.until(
+                        EC.presence_of_element_located((getattr(By, fallback_by.upper()), fallback_value)))
+                    attempt.succeeded()
                 print(f"Element '{element_name}' found using fallback locator: ({fallback_by}={fallback_value}).")
 
                 # Update the database: set this fallback as the new primary locator, regenerate fallbacks
@@ -168,3 +137,5 @@ if __name__ == "__main__":
         print(e)
 
     locator_manager.driver.quit()
+    locator_manager.store.close()
+    print(healing_metrics.report())
@@ -0,0 +1,69 @@
+import json
+import sqlite3
+
+import pytest
+
+from main.Self_healing.locator_store import LocatorStore
+from main.self_healing_test_automation.xpath_to_css import xpath_to_css, convert_locator_table
+
+
+@pytest.mark.parametrize("xpath, css", [
+    ("//*[@id='email']", "#email"),
+    ("//*[@id='1st']", "[id='1st']"),
+    ("//input[@type='password']", "input[type='password']"),
+    ("//*[contains(@class, 'btn btn-primary')]", "[class*='btn btn-primary']"),
+    ("//a[starts-with(@href, 'https')]", "a[href^='https']"),
+    ("//a[ends-with(@href, '.pdf')]", "a[href$='.pdf']"),
+    ("//button[@type='submit' and @disabled]", "button[type='submit'][disabled]"),
+    ("//input[not(@disabled)]", "input:not([disabled])"),
+    ("//input[@name!='q']", "input[name]:not([name='q'])"),
+    ("//ul/li[2]", "ul > li:nth-of-type(2)"),
+    ("//ul//li[last()]", "ul li:last-of-type"),
+    ("/html/body/div", "html > body > div"),
+    ("/div", "div:root"),
+    ("/body/div", "body:root > div"),
+    ("/*[@id='app']/div", "#app:root > div"),
+    ("//*[@data-target='#bs-example-navbar-collapse-1' and @data-toggle='collapse']",
+     "[data-target='#bs-example-navbar-collapse-1'][data-toggle='collapse']"),
+    ("//div[@title=\"it's\"]", "div[title=\"it's\"]"),
+])
+def test_supported_xpaths(xpath, css):
+    assert xpath_to_css(xpath) == css
+
+
+@pytest.mark.parametrize("xpath", [
+    "//*[contains(text(), 'Register')]",
+    "//button[text()='Login']",
+    "//*//*[text()='Home']",
+    "//div[@id='a' or @id='b']",
+    "//*[2]",
+    "//div/..",
+    "//div/following-sibling::span",
+    "(//div)[1]",
+])
+def test_unsupported_xpaths_return_none(xpath):
+    assert xpath_to_css(xpath) is None
+
+
+def test_convert_locator_table(tmp_path):
+    db_path = str(tmp_path / "locators.db")
+    # Legacy LocatorManager table; opening the store migrates it first
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE locators (element_name TEXT PRIMARY KEY, primary_locator TEXT, fallback_locators TEXT)")
+    conn.executemany("INSERT INTO locators VALUES (?, ?, ?)", [
+        ("email", "xpath=//*[@id='email']", json.dumps([["name", "email"]])),
+        ("register", "xpath=//*[contains(text(), 'Register')]", "[]"),
+        ("password", "id=password", "[]"),
+    ])
+    conn.commit()
+    conn.close()
+
+    assert convert_locator_table(db_path) == 1
+
+    store = LocatorStore(db_path)
+    email, register, password = store.get("email"), store.get("register"), store.get("password")
+    store.close()
+    assert (email["locator_type"], email["locator_value"]) == ("css_selector", "#email")
+    assert email["fallbacks"] == [("xpath", "//*[@id='email']"), ("name", "email")]
+    assert (register["locator_type"], register["locator_value"]) == ("xpath", "//*[contains(text(), 'Register')]")
+    assert (password["locator_type"], password["locator_value"]) == ("id", "password")
@@ -0,0 +1,224 @@
+import re
+from functools import lru_cache
+
+from main.Self_healing.locator_store import LocatorStore, bulk_write
+
+# Supported XPath subset (anything else has no CSS equivalent and translates to None):
+#   /a/b, //a//b, *, child:: axis
+#   [@attr], [@attr='v'], [@attr!='v'], [contains(@attr,'v')], [starts-with(@attr,'v')],
+#   [ends-with(@attr,'v')], [not(...)], [... and ...], [n] and [last()] as the first predicate of a named step
+
+TOKEN_PATTERN = re.compile(r"""
+    \s*(?:
+        (?P<string>'[^']*'|"[^"]*")
+      | (?P<number>\d+)
+      | (?P<op>//|/|\[|\]|\(|\)|@|,|!=|=|\*)
+      | (?P<name>[A-Za-z_][\w.-]*(?:::)?)
+    )""", re.VERBOSE)
+
+CSS_IDENTIFIER = re.compile(r"^-?[A-Za-z_][\w-]*$")
+
+CACHE_SIZE = 4096
+
+
+class UnsupportedXPath(ValueError):
+    """Raised for XPath constructs that have no equivalent CSS selector."""
+
+
+def _tokenize(xpath):
+    tokens = []
+    position = 0
+    xpath = xpath.strip()
+    while position < len(xpath):
+        match = TOKEN_PATTERN.match(xpath, position)
+        if not match or match.end() == position:
+            raise UnsupportedXPath(f"Unexpected character at {position}: {xpath[position:]!r}")
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+        position = match.end()
+    return tokens
+
+
+def _css_string(value):
+    quote = '"' if "'" in value else "'"
+    return quote + value.replace("\\", "\\\\").replace(quote, "\\" + quote) + quote
+
+
+class _XPathToCss:
+    def __init__(self, xpath):
+        self.tokens = _tokenize(xpath)
+        self.position = 0
+
+    def peek(self, offset=0):
+        index = self.position + offset
+        return self.tokens[index] if index < len(self.tokens) else (None, None)
+
+    def take(self, expected=None):
+        kind, value = self.peek()
+        if kind is None or (expected is not None and value != expected):
+            raise UnsupportedXPath(f"Expected {expected!r}, got {value!r}")
+        self.position += 1
+        return value
+
+    def translate(self):
+        kind, value = self.peek()
+        if value == "//":
+            self.take()
+            parts = [self.step()]
+        elif value == "/":
+            # An absolute path starts at the document element
+            self.take()
+            parts = [self.step(root=True)]
+        else:
+            parts = [self.step()]
+
+        while self.peek()[0] is not None:
+            separator = self.take()
+            if separator == "/":
+                parts.append(">")
+            elif separator != "//":
+                raise UnsupportedXPath(f"Unexpected {separator!r}")
+            parts.append(self.step())
+        return " ".join(parts)
+
+    def step(self, root=False):
+        kind, value = self.peek()
+        if value == "*":
+            self.take()
+            tag = "*"
+        elif kind == "name" and not value.endswith("::") and self.peek(1)[1] != "(":
+            tag = self.take()
+        elif value == "child::":
+            self.take()
+            return self.step(root)
+        else:
+            raise UnsupportedXPath(f"Unsupported step {value!r}")
+
+        selectors = []
+        first_predicate = True
+        while self.peek()[1] == "[":
+            self.take("[")
+            kind, value = self.peek()
+            if first_predicate and kind == "number" and self.peek(1)[1] == "]":
+                if tag == "*":
+                    raise UnsupportedXPath("Positional predicate needs an element name")
+                selectors.append(f":nth-of-type({self.take()})")
+            elif first_predicate and value == "last" and self.peek(1)[1] == "(":
+                if tag == "*":
+                    raise UnsupportedXPath("Positional predicate needs an element name")
+                self.take()
+                self.take("(")
+                self.take(")")
+                selectors.append(":last-of-type")
+            else:
+                selectors.append(self.and_expr())
+            self.take("]")
+            first_predicate = False
+
+        # The :root qualifier is redundant for /html, the document element
+        if root and tag != "html":
+            selectors.append(":root")
+        if tag == "*" and selectors:
+            tag = ""
+        return tag + "".join(selectors)
+
+    def and_expr(self):
+        css = self.condition()
+        while self.peek()[1] == "and":
+            self.take()
+            css += self.condition()
+        if self.peek()[1] == "or":
+            raise UnsupportedXPath("'or' has no single-selector CSS equivalent")
+        return css
+
+    def condition(self):
+        kind, value = self.peek()
+        if value == "(":
+            self.take()
+            css = self.and_expr()
+            self.take(")")
+            return css
+        if value == "not" and self.peek(1)[1] == "(":
+            self.take()
+            self.take("(")
+            css = self.and_expr()
+            self.take(")")
+            return f":not({css})"
+        if value == "@":
+            attribute = self.attribute()
+            operator = self.peek()[1]
+            if operator in ("=", "!="):
+                self.take()
+                literal = self.literal()
+                if operator == "=" and attribute == "id" and CSS_IDENTIFIER.match(literal):
+                    return f"#{literal}"
+                css = f"[{attribute}={_css_string(literal)}]"
+                # @a!='v' also requires the attribute to be there
+                return css if operator == "=" else f"[{attribute}]:not({css})"
+            return f"[{attribute}]"
+        if kind == "name" and value in ("contains", "starts-with", "ends-with") and self.peek(1)[1] == "(":
+            self.take()
+            self.take("(")
+            if self.peek()[1] != "@":
+                raise UnsupportedXPath(f"{value}() is only supported on attributes")
+            attribute = self.attribute()
+            self.take(",")
+            literal = self.literal()
+            self.take(")")
+            operator = {"contains": "*=", "starts-with": "^=", "ends-with": "$="}[value]
+            return f"[{attribute}{operator}{_css_string(literal)}]"
+        raise UnsupportedXPath(f"Unsupported predicate starting at {value!r}")
+
+    def attribute(self):
+        self.take("@")
+        kind, value = self.peek()
+        if kind != "name" or value.endswith("::"):
+            raise UnsupportedXPath("Expected attribute name")
+        return self.take()
+
+    def literal(self):
+        kind, value = self.peek()
+        if kind != "string":
+            raise UnsupportedXPath("Expected string literal")
+        self.take()
+        return value[1:-1]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def xpath_to_css(xpath):
+    """
+    Translate an XPath locator into an equivalent CSS selector.
+
+    Returns:
+    - The CSS selector, or None when the XPath uses something CSS cannot express (text(), axes, 'or', ...).
+    """
+    try:
+        return _XPathToCss(xpath).translate()
+    except UnsupportedXPath:
+        return None
+
+
+def convert_locator_table(db_path="locators.db"):
+    """
+    Bulk-convert every XPath primary locator in the shared locator store to CSS.
+
+    The CSS selector becomes the primary locator and the original XPath is kept as the first
+    fallback. Rows whose XPath has no CSS equivalent are left untouched.
+
+    Returns:
+    - The number of rows converted.
+    """
+    store = LocatorStore(db_path)
+    updates = []
+    for page, element_name, locator_type, xpath, last_healed, fallbacks in store.export_rows():
+        if locator_type != "xpath":
+            continue
+        css = xpath_to_css(xpath)
+        if css is None:
+            continue
+        fallbacks = [("xpath", xpath)] + [f for f in fallbacks if f != ("css_selector", css) and f != ("xpath", xpath)]
+        updates.append((page, element_name, "css_selector", css, last_healed, fallbacks))
+
+    bulk_write(store.conn, updates)
+    store.close()
+    return len(updates)
@@ -16,6 +16,8 @@ import pandas as pd
 import matplotlib.pyplot as plt
 from io import StringIO
 
+from main.CodeReview.parse_cache import get_parse_cache
+
 
 class TestCoverageAnalyzer(QMainWindow):
     def __init__(self):
@@ -226,8 +228,8 @@ class TestCoverageAnalyzer(QMainWindow):
                     if file.endswith('.py'):
                         file_path = os.path.join(root, file)
                         try:
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                code = f.read()
+                            # Unchanged files are neither re-read nor re-parsed
+                            code = get_parse_cache().source(file_path)
 
                             # Initialize with default values
                             results[file_path] = {
@@ -239,7 +241,7 @@ class TestCoverageAnalyzer(QMainWindow):
                             # Update with actual values if available
                             if code.strip():  # Check if file is not empty
                                 results[file_path].update({
-                                    'complexity': radon.cc_visit(code),
+                                    'complexity': radon.cc_visit_ast(get_parse_cache().parse_source(code)),
                                     'loc': len(code.splitlines()),
                                     'functions': self.extract_functions(code)
                                 })
@@ -267,8 +269,7 @@ class TestCoverageAnalyzer(QMainWindow):
                     if file.endswith('.py'):
                         file_path = os.path.join(root, file)
                         try:
-                            with open(file_path, 'r', encoding='utf-8') as f:
-                                code = f.read()
+                            code = get_parse_cache().source(file_path)
 
                             # Initialize with default values
                             results[file_path] = {
@@ -302,7 +303,7 @@ class TestCoverageAnalyzer(QMainWindow):
     def extract_functions(self, code: str) -> List[str]:
         """Extract function names from code"""
         try:
-            tree = ast.parse(code)
+            tree = get_parse_cache().parse_source(code)
             return [node.name for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)]
         except:
             return []
@@ -310,7 +311,7 @@ class TestCoverageAnalyzer(QMainWindow):
     def count_tests(self, code: str) -> int:
         """Count number of test functions"""
         try:
-            tree = ast.parse(code)
+            tree = get_parse_cache().parse_source(code)
             return len([node for node in ast.walk(tree)
                         if isinstance(node, ast.FunctionDef)
                         and node.name.startswith('test_')])
@@ -320,7 +321,7 @@ class TestCoverageAnalyzer(QMainWindow):
     def count_assertions(self, code: str) -> int:
         """Count number of assertions in test code"""
         try:
-            tree = ast.parse(code)
+            tree = get_parse_cache().parse_source(code)
             return len([node for node in ast.walk(tree)
                         if isinstance(node, ast.Assert) or
                         (isinstance(node, ast.Call) and
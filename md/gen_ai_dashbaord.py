@@ -6,9 +6,9 @@ from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QFont
 
 # Import the tools from provided files
-from pom_generator_final import EnhancedPOMGenerator
-from intelligent_script_refactoring_ad import ScriptRefactoringTool
-from code_review_ad import CodeReviewTool
+from md.pom_generator_final import EnhancedPOMGenerator
+from md.intelligent_script_refactoring_ad import ScriptRefactoringTool
+from md.code_review_ad import CodeReviewTool
 
 
 class VerticalTabBar(QWidget):